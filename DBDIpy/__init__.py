@@ -1,6 +1,19 @@
+from DBDIpy.adduct_network import AdductNetwork
 from DBDIpy.align_spectra import align_spectra
+from DBDIpy.align_spectra_experimental import align_spectra_b
+from DBDIpy.annotation_index import AnnotationIndex
+from DBDIpy.correlate_xic import correlate_xic, correlate_xic_blocks, correlate_xic_sparse
+from DBDIpy.correlation_index import CorrelationIndex
+from DBDIpy.export_to_feather import export_to_feather
+from DBDIpy.export_to_mgf import export_to_mgf
 from DBDIpy.export_to_spectra import export_to_spectra
 from DBDIpy.identify_adducts import identify_adducts
 from DBDIpy.impute_intensities import impute_intensities
+from DBDIpy.peak_list import PeakList
 from DBDIpy.plot_adducts import plot_adducts 
 from DBDIpy.propose_adducts import propose_adducts
+from DBDIpy.read_feather import read_feather
+from DBDIpy.read_mgf import read_mgf
+from DBDIpy.result_cache import ResultCache
+from DBDIpy.sparse_spectra import SparseSpectra
+from DBDIpy.spectra_aligner import SpectraAligner
@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+
+
+class AdductNetwork:
+
+    """Graph of putative ion species with features as nodes and annotated pairs as edges.
+    Edges are stored once as arrays and as a symmetric scipy.sparse adjacency matrix, and
+    a boolean feature x motive table records which motives every feature carries as base.
+    Grouping the ion species of one compound is a connected-component search on the
+    adjacency matrix, and selecting features with a set of motives is a single row-wise
+    reduction, instead of chained np.intersect1d over the result DataFrames.
+    identify_adducts(network = True) returns an AdductNetwork.
+
+    Parameters
+    ----------
+    base : array-like of int
+           Positions of the base features of all edges.
+
+    match : array-like of int
+            Positions of the matched features of all edges.
+
+    motive : array-like of int
+             Position of the motive of every edge in motives.
+
+    motives : list of str
+              Names of the adduct rules, e.g. ["O", "O2", "H2O"].
+
+    n_features : int
+                 Number of nodes, i.e. features of the correlated table.
+
+    corr : array-like, optional
+           Correlation coefficient of every edge.
+
+    index : pd.Index, optional
+            Labels of the features. Default is a RangeIndex.
+
+    Examples
+    --------
+    >>> network = identify_adducts(specs_imputed, masses = masses, network = True)
+    >>> network.with_motives(["O", "O2", "O3"])
+    array([55, 99])
+    >>> network.component(55)
+
+    """
+
+    def __init__(self, base, match, motive, motives, n_features, corr = None, index = None):
+
+        import scipy.sparse
+
+        if isinstance(n_features, bool) or not isinstance(n_features, (int, np.integer)) or n_features < 0:
+            raise ValueError("Argument n_features should be a non-negative integer.")
+
+        self.base = np.asarray(base, dtype = np.int64).ravel()
+        self.match = np.asarray(match, dtype = np.int64).ravel()
+        self.motive = np.asarray(motive, dtype = np.int64).ravel()
+        self.motives = [str(m) for m in motives]
+        self.corr = np.full(self.base.size, np.nan) if corr is None else np.asarray(corr, dtype = np.float64).ravel()
+        self.index = pd.RangeIndex(n_features) if index is None else pd.Index(index)
+
+        if not self.base.size == self.match.size == self.motive.size == self.corr.size:
+            raise ValueError("Incompatible dimensions of edge arrays.")
+
+        if self.index.size != n_features:
+            raise ValueError("Incompatible dimensions of index and number of features.")
+
+        for nodes in (self.base, self.match):
+            if nodes.size and (nodes.min() < 0 or nodes.max() >= n_features):
+                raise IndexError("Edge positions are out of range for n_features.")
+
+        if self.motive.size and (self.motive.min() < 0 or self.motive.max() >= len(self.motives)):
+            raise IndexError("Edge motives are out of range for motives.")
+
+        self.n_features = int(n_features)
+
+        ##symmetric adjacency, number of edges between two features
+        ones = np.ones(2 * self.base.size, dtype = np.int64)
+        self.adjacency = scipy.sparse.csr_matrix((ones, (np.concatenate([self.base, self.match]),
+                                                         np.concatenate([self.match, self.base]))),
+                                                 shape = (self.n_features, self.n_features))
+
+        ##motives carried by every feature as base
+        self._has = np.zeros((self.n_features, len(self.motives)), dtype = bool)
+        self._has[self.base, self.motive] = True
+
+        self.adducts = None                                                                  ##result dictionary of identify_adducts()
+        self._labels = None
+
+    def __repr__(self):
+        return (f"AdductNetwork({self.n_features} features, {self.n_edges} edges, "
+                f"motives = {self.motives})")
+
+    def __len__(self):
+        return self.n_features
+
+    @property
+    def n_edges(self):
+        """Number of annotated pairs."""
+        return self.base.size
+
+    @classmethod
+    def from_adducts(cls, adducts, index):
+
+        """Builds the network from the dictionary returned by identify_adducts().
+        index holds the labels of the correlated features, e.g. df.index, to resolve match_index.
+
+        """
+
+        if not isinstance(adducts, dict):
+            raise TypeError("Argument for adducts should be a dictionary of DataFrames from identify_adducts().")
+
+        index = pd.Index(index)
+        motives = list(adducts.keys())
+        base = [np.asarray(adducts[m]["base_index"], dtype = np.int64) for m in motives]
+        match = [index.get_indexer(adducts[m]["match_index"]) for m in motives]
+        motive = [np.full(len(adducts[m]), a, dtype = np.int64) for a, m in enumerate(motives)]
+        corr = [np.asarray(adducts[m]["corr"], dtype = np.float64) for m in motives]
+
+        if any((m < 0).any() for m in match):
+            raise ValueError("Labels of match_index are missing from index.")
+
+        concat = lambda x: np.concatenate(x) if x else np.empty(0)
+
+        network = cls(concat(base), concat(match), concat(motive), motives, index.size,
+                      corr = concat(corr), index = index)
+        network.adducts = adducts
+
+        return network
+
+    def _motive_positions(self, motives):
+
+        """Validates motive names."""
+
+        if isinstance(motives, str):
+            motives = [motives]
+
+        missing = [m for m in motives if m not in self.motives]
+        if missing:
+            raise KeyError(f"Unknown motives {missing}. Choose from {self.motives}.")
+
+        return [self.motives.index(m) for m in motives]
+
+    def with_motives(self, motives):
+
+        """Positions of the features carrying all given motives as base, e.g. ["O", "O2", "O3"]."""
+
+        cols = self._motive_positions(motives)
+
+        return np.flatnonzero(self._has[:, cols].all(axis = 1))
+
+    @property
+    def component_labels(self):
+        """Connected component of every feature. Computed once on first access."""
+        if self._labels is None:
+            from scipy.sparse.csgraph import connected_components
+            self._labels = connected_components(self.adjacency, directed = False)[1]
+        return self._labels
+
+    def components(self, min_size = 2):
+
+        """Positions of the features of every connected component of at least min_size features.
+        Components are ordered by decreasing size, ties by their first feature.
+
+        """
+
+        labels = self.component_labels
+        order = np.argsort(labels, kind = "stable")
+        sizes = np.bincount(labels)
+        groups = np.split(order, np.cumsum(sizes)[:-1])
+
+        rank = sorted(np.flatnonzero(sizes >= min_size), key = lambda c: (-sizes[c], groups[c][0]))
+
+        return [groups[c] for c in rank]
+
+    def component(self, ID):
+
+        """Positions of all features connected to the feature at position ID, including itself."""
+
+        if isinstance(ID, (bool, np.bool_)) or not isinstance(ID, (int, np.integer)):
+            raise TypeError("ID should be the integer position of a feature.")
+
+        if not 0 <= ID < self.n_features:
+            raise IndexError(f"ID {ID} is out of range for {self.n_features} features.")
+
+        labels = self.component_labels
+
+        return np.flatnonzero(labels == labels[ID])
+
+    def neighbours(self, ID):
+
+        """Positions of the features directly paired with the feature at position ID."""
+
+        if not 0 <= ID < self.n_features:
+            raise IndexError(f"ID {ID} is out of range for {self.n_features} features.")
+
+        return np.sort(self.adjacency.indices[self.adjacency.indptr[ID]:self.adjacency.indptr[ID + 1]])
+
+    def to_frame(self):
+
+        """Edge list as pd.DataFrame with base and match positions and labels, motive and corr."""
+
+        return pd.DataFrame({"base_index": self.base,
+                             "base_label": self.index[self.base],
+                             "match_index": self.match,
+                             "match_label": self.index[self.match],
+                             "motive": np.asarray(self.motives, dtype = object)[self.motive],
+                             "corr": self.corr})
@@ -1,17 +1,58 @@
-def align_spectra(spec, ppm_window = 2):
+def align_spectra(spec, ppm_window = 2, engine = "numpy", dtype = "float64", sparse = False, n_jobs = 1,
+                  mz_window = None, merge = True):
     
     """Feature building from a list of spectra.
     Aligns detected peaks in a list of matchms.Spectra objects into two-dimensional tabular data.
     Utilizes data loaded by matchms.importing module and connects to matchMS (pre-)processing workflows.
-    #test
+    
     Parameters
     ----------    
-    spec : list of matchms.Spectra
+    spec : list or iterable of matchms.Spectra or DBDIpy.PeakList
            Spectra imported by matchms from mass spectrometric experiments 
-           (MS1) of instance matchms.Spectrum.
+           (MS1) of instance matchms.Spectrum. Generators, e.g. from 
+           matchms.importing.load_from_mgf(), are consumed scan by scan 
+           with the "numpy" engine. A PeakList from DBDIpy.read_mgf() is
+           aligned from its peak arrays directly.
     
     ppm_window : float, optional
                  Window for mass alignment in ppm. Default is 2 ppm.
+                 The window scales with the mass of a feature (m/z x ppm_window x 1e-6).
+                 DBDIpy versions <= 1.2 used ppm_window x 1e-6 as an absolute window in Da, 
+                 which is far tighter above 1 Da, so the same ppm_window now yields fewer features.
+    
+    engine : str, {"numpy", "pandas"}, optional
+             Alignment backend. "numpy" (default) merges the peaks of each scan into 
+             a sorted m/z array of features in one vectorized pass using np.searchsorted.
+             "pandas" is the original peak-by-peak implementation which is kept for reference 
+             and applies the same matching rules and windows. Every peak goes to the closest 
+             feature and a feature hit by several peaks of a scan keeps the closest peak; 
+             DBDIpy versions <= 1.2 used "pandas" only and kept the last matching peak.
+    
+    dtype : str, {"float64", "float32"}, optional
+            Data type of the intensity columns. "float32" halves the memory footprint 
+            of the feature table. Mean m/z values are always stored as float64.
+    
+    sparse : bool, optional
+             Return a DBDIpy.SparseSpectra object holding detected intensities as a 
+             scipy.sparse matrix plus a vector of mean m/z values instead of a dense DataFrame. 
+             Recommended for wide runs. Default is False.
+    
+    n_jobs : int, optional
+             Number of worker processes for the "numpy" engine. With n_jobs > 1, the m/z axis 
+             is split into slabs holding similar numbers of peaks which are aligned independently. 
+             Slabs are cut at gaps between peak masses wider than the alignment window, so the 
+             result equals the serial alignment; without such gaps fewer slabs are used. 
+             -1 uses all available cores. Default is 1.
+    
+    mz_window : float, optional
+                Absolute window for mass alignment in Da. Overrides ppm_window if given.
+                mz_window = 2e-6 reproduces the window of DBDIpy versions <= 1.2.
+    
+    merge : bool, optional
+            Collapse neighbouring features whose mean m/z values drifted into each 
+            other's window after alignment, as long as they were never detected in 
+            the same scan. Default is True. DBDIpy versions <= 1.2 did not merge features; 
+            merge = False together with mz_window = 2e-6 reproduces their feature windows.
     
     Returns
     -------
@@ -19,68 +60,401 @@ def align_spectra(spec, ppm_window = 2):
     The first column contains mean m/z values of peaks across all scans followed by 
     column-wise arranged signal intensities.
     Absence of a signal in a scan results in filling the table with nan instead.
+    With sparse = True, a DBDIpy.SparseSpectra object is returned.
     
     See Also
     --------
     matchms.importing : For information about reading mass spectrometric data into Python.
+    DBDIpy.SpectraAligner : For incremental alignment with snapshots of the feature table.
     
     """
     
+    import itertools
+    import os
     import matchms
+    import numpy as np
+    from DBDIpy.peak_list import PeakList
+    
+    
+    if isinstance(spec, PeakList) and engine == "pandas":
+        spec = spec.to_spectra()                                                             ##reference engine reads matchms.Spectrum
+    
+    if isinstance(spec, PeakList):
+        first = None
+    elif isinstance(spec, (list, tuple)):
+        first = spec[0] if len(spec) > 0 else None
+    else:                                                                                    ##peek into generators without consuming them
+        spec = iter(spec)
+        first = next(spec, None)
+        spec = itertools.chain([first], spec)
+    
+    if not isinstance(spec, PeakList) and not isinstance(first, matchms.Spectrum):
+        raise TypeError("Argument for spec should be an iterable of matchms.Spectrum or a DBDIpy.PeakList.")
+        
+    if isinstance(ppm_window, bool) or not isinstance(ppm_window, (int, float)):
+        raise TypeError("Argument for ppm_window should be numeric.")
+        
+    if np.dtype(dtype) not in (np.float32, np.float64):
+        raise ValueError("Invalid dtype. Choose from 'float32' or 'float64'.")
+        
+    if mz_window is not None and (isinstance(mz_window, bool) or not isinstance(mz_window, (int, float))):
+        raise TypeError("Argument for mz_window should be numeric.")
+        
+    if isinstance(n_jobs, bool) or not isinstance(n_jobs, int) or n_jobs == 0 or n_jobs < -1:
+        raise ValueError("Argument n_jobs should be a positive integer or -1.")
+        
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+        
+    if engine == "numpy" and n_jobs > 1:
+        return _align_parallel(spec, ppm_window, dtype, sparse, n_jobs, mz_window, merge)
+    
+    if engine == "numpy":
+        return _align_numpy(spec, ppm_window, dtype, sparse, mz_window, merge)
+    
+    if n_jobs > 1:
+        raise ValueError("Parallel alignment is only available for engine = 'numpy'.")
+    
+    if engine == "pandas":
+        from DBDIpy.sparse_spectra import SparseSpectra
+        aldf = _align_pandas(list(spec), ppm_window, mz_window, dtype)
+        if merge and _merge_candidates(aldf["mean"].to_numpy(), ppm_window, mz_window).size > 0:
+            aligned = _merge_features(SparseSpectra.from_frame(aldf), ppm_window, mz_window)
+            return aligned if sparse else aligned.to_frame()
+        if sparse:
+            return SparseSpectra.from_frame(aldf)
+        return aldf
+    
+    raise ValueError("Invalid alignment engine. Choose from 'numpy' or 'pandas'.")
+
+
+def _window(mz, ppm_window, mz_window):
+    
+    """Alignment window in Da for features at mass mz."""
+    
+    import numpy as np
+    
+    if mz_window is not None:
+        return np.full(np.shape(mz), float(mz_window))
+    
+    return np.asarray(mz, dtype = np.float64) * ppm_window * 1e-6
+
+
+def _match_peaks(means, mz, tol):
+    
+    """Assigns the peaks of one scan to the closest feature within tol.
+    means has to be sorted ascending, tol is a scalar or an array of windows 
+    for every feature in means. Returns the position of the matched feature 
+    in means for every peak or -1 if no feature lies within the window. If several 
+    peaks hit the same feature, only the closest one is kept as a match.
+    
+    """
+    
+    import numpy as np
+    
+    hit = np.full(len(mz), -1, dtype = np.int64)
+    
+    if len(means) == 0 or len(mz) == 0:
+        return hit
+    
+    pos = np.searchsorted(means, mz)                                                         ##insertion points of all peaks at once
+    left = np.clip(pos - 1, 0, len(means) - 1)
+    right = np.clip(pos, 0, len(means) - 1)
+    
+    dleft = np.abs(mz - means[left])
+    dright = np.abs(means[right] - mz)
+    
+    best = np.where(dright < dleft, right, left)                                             ##ties resolve to the lower mass
+    dist = np.minimum(dleft, dright)
+    
+    inwin = dist <= (tol[best] if np.ndim(tol) > 0 else tol)                                ##window of the closest feature
+    
+    ##keep the closest peak if several peaks claim the same feature
+    cand = np.flatnonzero(inwin)
+    if cand.size > 1:
+        order = cand[np.lexsort((dist[cand], best[cand]))]
+        first = np.ones(order.size, dtype = bool)
+        first[1:] = best[order][1:] != best[order][:-1]
+        cand = order[first]
+    
+    hit[cand] = best[cand]
+    
+    return hit
+
+
+def _merge_candidates(mz, ppm_window, mz_window):
+    
+    """Positions i of neighbouring features i, i+1 with means within the window."""
+    
+    import numpy as np
+    
+    if len(mz) < 2:
+        return np.empty(0, dtype = np.int64)
+    
+    return np.flatnonzero(np.diff(mz) <= _window(mz[1:], ppm_window, mz_window))
+
+
+def _merge_features(aligned, ppm_window, mz_window):
+    
+    """Collapses neighbouring features of a SparseSpectra whose means lie within the window.
+    Runs of neighbouring features are merged greedily in order of mass as long as the merged 
+    features were never detected in the same scan. The mean m/z of merged features is weighted 
+    by the number of detected peaks.
+    
+    """
+    
+    import numpy as np
+    import scipy.sparse
+    from DBDIpy.sparse_spectra import SparseSpectra
+    
+    close = _merge_candidates(aligned.mz, ppm_window, mz_window)
+    if close.size == 0:
+        return aligned
+    
+    mz, X = aligned.mz, aligned.intensities
+    weights = np.diff(X.indptr).astype(np.float64)                                           ##number of peaks of every feature
+    label = np.arange(mz.size)
+    
+    cur = -1
+    for i in close:
+        if label[i] != cur:                                                                  ##start a new group at feature i
+            cur = label[i]
+            scans = X.indices[X.indptr[i]:X.indptr[i+1]]
+            wsum, wmz = weights[i], weights[i] * mz[i]
+        nxt = X.indices[X.indptr[i+1]:X.indptr[i+2]]
+        mean = wmz / wsum
+        if abs(mz[i+1] - mean) <= _window(mean, ppm_window, mz_window) and np.intersect1d(scans, nxt).size == 0:
+            label[i+1] = cur
+            scans = np.union1d(scans, nxt)
+            wsum, wmz = wsum + weights[i+1], wmz + weights[i+1] * mz[i+1]
+    
+    ##rebuild the feature table with one row per group
+    row_of = (np.cumsum(label == np.arange(mz.size)) - 1)[label]
+    n_feat = row_of[-1] + 1
+    coo = X.tocoo()
+    intensities = scipy.sparse.csr_matrix((coo.data, (row_of[coo.row], coo.col)), shape = (n_feat, X.shape[1]))
+    means = np.bincount(row_of, weights = weights * mz) / np.bincount(row_of, weights = weights)
+    
+    return SparseSpectra(means, intensities, columns = aligned.columns)
+
+
+def _align_numpy(spec, ppm_window, dtype, sparse, mz_window, merge):
+    
+    """Sorted-array alignment engine of align_spectra().
+    Features are kept as sorted arrays of mean m/z together with running sums and counts 
+    of matched masses by a DBDIpy.SpectraAligner which consumes the spectra one by one 
+    and writes intensities into a preallocated matrix. The DataFrame is built once at the end.
+    
+    """
+    
+    from DBDIpy.spectra_aligner import SpectraAligner
+    
+    aligner = SpectraAligner(ppm_window = ppm_window, dtype = dtype, sparse = sparse, mz_window = mz_window)
+    aligner.extend(spec)
+    
+    if merge and _merge_candidates(aligner.mz, ppm_window, mz_window).size > 0:
+        aligned = _merge_features(aligner.to_sparse(), ppm_window, mz_window)
+        return aligned if sparse else aligned.to_frame()
+    
+    if sparse:
+        return aligner.to_sparse()
+    
+    return aligner.to_frame()
+
+
+def _slab_cuts(mz, n_slabs, ppm_window, mz_window):
+    
+    """Cut points of the m/z axis for _align_parallel() at gaps no feature can bridge.
+    The mean of a feature always lies between its lowest and highest matched peak, so neither 
+    _match_peaks() nor _merge_features() can join peaks on both sides of a gap between 
+    neighbouring peak masses a < b with b - a larger than the window at b. For every quantile 
+    of the peak masses the closest such gap is chosen, searching no further than the 
+    neighbouring quantiles. Fewer than n_slabs - 1 cuts are returned if gaps are missing.
+    
+    """
+    
+    import numpy as np
+    
+    if mz.size == 0 or n_slabs < 2:
+        return np.empty(0)
+    
+    sample = np.sort(mz[::max(1, mz.size // 100000)])                                        ##quantiles of a strided sample
+    targets = np.quantile(sample, np.linspace(0, 1, n_slabs + 1))
+    targets[0], targets[-1] = mz.min(), mz.max()
+    
+    cuts = []
+    for k in range(1, n_slabs):
+        t, lower, upper = targets[k], targets[k - 1], targets[k + 1]
+        delta = 100 * float(_window(t, ppm_window, mz_window))
+        while True:
+            lo, hi = max(t - delta, lower), min(t + delta, upper)
+            near = np.sort(mz[(mz >= lo) & (mz <= hi)])
+            gap = np.flatnonzero(np.diff(near) > _window(near[1:], ppm_window, mz_window))
+            if gap.size > 0:
+                mid = (near[gap] + near[gap + 1]) / 2
+                cuts.append(mid[np.argmin(np.abs(mid - t))])
+                break
+            if lo == lower and hi == upper:                                                  ##no gap between the neighbouring quantiles
+                break
+            delta *= 4
+    
+    return np.unique(cuts)
+
+
+def _align_slab(names, n_peaks, n_scans, ppm_window, dtype, mz_window, lo, hi):
+    
+    """Aligns the peaks with m/z in [lo, hi) of a PeakList held in shared memory."""
+    
+    import numpy as np
+    import scipy.sparse
+    from multiprocessing import shared_memory
+    from DBDIpy.spectra_aligner import SpectraAligner
+    
+    shm = [shared_memory.SharedMemory(name = name) for name in names]
+    try:
+        mz = np.ndarray(n_peaks, dtype = np.float64, buffer = shm[0].buf)
+        intensities = np.ndarray(n_peaks, dtype = np.float64, buffer = shm[1].buf)
+        offsets = np.ndarray(n_scans + 1, dtype = np.int64, buffer = shm[2].buf)
+        
+        sel = np.flatnonzero((mz >= lo) & (mz < hi))                                         ##peaks of the slab in scan order
+        bounds = np.searchsorted(sel, offsets)
+        
+        aligner = SpectraAligner(ppm_window = ppm_window, dtype = dtype, sparse = True, mz_window = mz_window)
+        for s in range(n_scans):
+            peaks = sel[bounds[s]:bounds[s + 1]]
+            aligner.add_peaks(mz[peaks], intensities[peaks])
+        del mz, intensities, offsets
+    finally:
+        for block in shm:
+            block.close()
+    
+    slab = aligner.to_sparse()
+    
+    return slab.mz, scipy.sparse.csr_matrix(slab.intensities)
+
+
+def _align_parallel(spec, ppm_window, dtype, sparse, n_jobs, mz_window, merge):
+    
+    """Parallel alignment engine of align_spectra().
+    Features can only match peaks within ppm_window, so the m/z axis is split into 
+    independent slabs which are aligned in a process pool. Slabs are cut at gaps between 
+    peak masses wider than the window (see _slab_cuts()), so no feature crosses a slab edge 
+    and the result equals the serial alignment. Spectra are packed into a DBDIpy.PeakList 
+    whose arrays are placed in shared memory once; every worker selects its own slab from 
+    them, so no copies of the peaks are pickled. Slabs are stitched in order of mass.
+    
+    """
+    
+    import numpy as np
+    import scipy.sparse
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+    from DBDIpy.peak_list import PeakList
+    from DBDIpy.sparse_spectra import SparseSpectra
+    
+    if not isinstance(spec, PeakList):
+        spec = PeakList.from_spectra(spec)
+    
+    cuts = _slab_cuts(spec.mz, n_jobs, ppm_window, mz_window)
+    bounds = np.concatenate([[-np.inf], cuts, [np.inf]])
+    
+    shm = []
+    try:
+        for values in (spec.mz, spec.intensities, spec.offsets):
+            block = shared_memory.SharedMemory(create = True, size = max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype = values.dtype, buffer = block.buf)[:] = values
+            shm.append(block)
+        names = [block.name for block in shm]
+        
+        jobs = [(names, spec.n_peaks, spec.n_scans, ppm_window, dtype, mz_window, bounds[j], bounds[j + 1])
+                for j in range(bounds.size - 1)]
+        with ProcessPoolExecutor(max_workers = min(n_jobs, len(jobs))) as pool:
+            res = list(pool.map(_align_slab, *zip(*jobs)))
+    finally:
+        for block in shm:
+            block.close()
+            block.unlink()
+    
+    ##stitch slabs in order of mass
+    mz = np.concatenate([r[0] for r in res])
+    intensities = scipy.sparse.vstack([r[1] for r in res], format = "csr")
+    aligned = SparseSpectra(mz, intensities.astype(dtype))
+    
+    if merge:
+        aligned = _merge_features(aligned, ppm_window, mz_window)
+    
+    if sparse:
+        return aligned
+    
+    return aligned.to_frame()
+
+
+def _align_pandas(spec, ppm_window, mz_window, dtype = "float64"):
+    
+    """Original peak-by-peak implementation of align_spectra().
+    New rows are created as numeric nan rows so that all columns keep a float dtype.
+    Peaks are matched with the rules of _match_peaks(): every peak is compared to the closest 
+    feature of the previous scans within the window of that feature, and a feature claimed 
+    by several peaks of a scan keeps the closest one. Rows of aldf and massdf share their 
+    positions, so the mean m/z of a feature is the mean of all its matched masses.
+    
+    """
+    
     from tqdm import tqdm
     import pandas as pd
     import numpy as np
     
     
-    if not isinstance(spec[0], matchms.Spectrum):
-        raise TypeError("Argument for spec should be a list of matchms.Spectrum.")
-        
-    aldf = pd.DataFrame({"mean": spec[0].peaks.mz, "scan1": spec[0].peaks.intensities})
+    order = np.argsort(np.asarray(spec[0].peaks.mz, dtype = np.float64), kind = "stable")
+    aldf = pd.DataFrame({"mean": np.asarray(spec[0].peaks.mz, dtype = np.float64)[order], 
+                         "scan1": np.asarray(spec[0].peaks.intensities, dtype = dtype)[order]})
     aldf = aldf.reset_index(drop = True)
     
-    massdf = pd.DataFrame({"scan1": spec[0].peaks.mz})
+    massdf = pd.DataFrame({"scan1": aldf["mean"].to_numpy()})
     
     for s in tqdm(range(1, len(spec)), desc = 'progress'):                                                            ## s iterates over number oof spectra
                                                                                                                       ## p iterates over number of peaks in spectrum
-        spec_s = pd.DataFrame({"mz_s": spec[s].peaks.mz, "scan_s": spec[s].peaks.intensities})   
-                     ## peak is help df to locate values
-        spec_s = spec_s.reset_index(drop = True)                                                                      ##hard intensity cutoff: RMOVE!!!
+        spec_s = pd.DataFrame({"mz_s": spec[s].peaks.mz, "scan_s": np.asarray(spec[s].peaks.intensities, dtype = dtype)})   
+        spec_s = spec_s.reset_index(drop = True)
 
-        aldf[f"scan{s+1}"] = np.nan
+        aldf[f"scan{s+1}"] = np.full(aldf.shape[0], np.nan, dtype = dtype)
         massdf[f"scan{s+1}"] = np.nan
         
+        claims = {}                                                                                                   ##row of a feature -> (distance, peak) of its closest peak
+        new = []                                                                                                      ##peaks starting new features
+        
         for p in range(spec_s.shape[0]):
-                                                                                                                      ##peak is subset of possible matches in aldf
-            peak = aldf.loc[(aldf["mean"] >= spec_s.loc[p, "mz_s"] - ppm_window * 1e-6) & (aldf["mean"] <= spec_s.loc[p, "mz_s"] + ppm_window * 1e-6)]
+            dist = (aldf["mean"] - spec_s.loc[p, "mz_s"]).abs()                                                       ##features of the previous scans, sorted by mass
+            row = dist.idxmin() if dist.shape[0] > 0 else None                                                       ##closest feature, ties to the lower mass
             
-            if peak.shape[0] == 0:                                                                                    ##case 1: add a new ferature
-                aldf = pd.concat([aldf, pd.DataFrame(columns = aldf.columns, index = range(0,1))])                    ##add empty new row
-                aldf = aldf.sort_values('mean')                                                                       ##reorder column
-                aldf = aldf.reset_index(drop = True)                                                                  ##reset indices!
-                aldf.loc[aldf.shape[0]-1, "mean"] = spec_s.loc[p, "mz_s"]                                             ##add m/z
-                aldf.iloc[aldf.shape[0]-1, aldf.shape[1]-1] = spec_s.loc[p, "scan_s"]                                 ##add intensity in 
-                
-                massdf = pd.concat([massdf, pd.DataFrame(columns = massdf.columns, index = range(0,1))])              ##add empty new row to mass data frame                                                         
-                massdf = massdf.reset_index(drop = True)                                                              ##reset indices!
-                massdf.iloc[massdf.shape[0]-1,  massdf.shape[1]-1] = spec_s.loc[p, "mz_s"]                            ##add m/z
-                      
-            if peak.shape[0] == 1:                                                                                    ##case 2: existing feature
-                 aldf.iloc[aldf["mean"].values == peak.iloc[0,0], aldf.shape[1] - 1] = spec_s.loc[p, "scan_s"]        ##add intensity
-                 massdf.iloc[massdf["scan1"].values == peak.iloc[0,0], massdf.shape[1]-1] = spec_s.loc[p, "mz_s"]     ##add mass to mass df
-
-            if peak.shape[0] > 1:                                                                                     ##case3: unambiguous features
-                peak = peak.iloc[(peak['mean'] - spec_s.loc[p, "mz_s"]).abs().argsort()[:1]]                          ##find closest matching feature
-                aldf.iloc[aldf["mean"].values == peak.iloc[0,0], aldf.shape[1] - 1] = spec_s.loc[p, "scan_s"]         ##add intensity
-                massdf.iloc[massdf["scan1"].values == peak.iloc[0,0], massdf.shape[1]-1] = spec_s.loc[p, "mz_s"]      ##add mass to mass df          
-                
-        aldf = aldf.sort_values('mean')                                                                               ##reorder column
-        aldf = aldf.reset_index(drop = True) 
+            if row is None or dist[row] > _window(aldf.loc[row, "mean"], ppm_window, mz_window):                     ##case 1: add a new feature
+                new.append(p)
+            elif row not in claims or dist[row] < claims[row][0]:                                                     ##case 2: closest peak of an existing feature so far
+                if row in claims:
+                    new.append(claims[row][1])                                                                        ##the farther peak starts a new feature
+                claims[row] = (dist[row], p)
+            else:                                                                                                     ##case 3: feature claimed by a closer peak
+                new.append(p)
         
-        massdf["mean"] = massdf.mean(axis = 1, skipna = True)                                                         ##calculate mean mz for every feature                   
-        massdf = massdf.sort_values('mean')                                                                           ##reorder column
-        massdf = massdf.reset_index(drop = True) 
+        for row, (d, p) in claims.items():
+            aldf.iloc[row, aldf.shape[1] - 1] = spec_s.loc[p, "scan_s"]                                               ##add intensity
+            massdf.iloc[row, massdf.shape[1] - 1] = spec_s.loc[p, "mz_s"]                                             ##add mass to mass df
         
-        aldf["mean"] = massdf["mean"]                                                                                 ##replace "static" mass with mean mass
+        if len(new) > 0:
+            new = sorted(new)
+            rows = pd.DataFrame(np.nan, columns = aldf.columns, index = range(len(new))).astype(aldf.dtypes)          ##add empty new rows
+            rows["mean"] = spec_s.loc[new, "mz_s"].to_numpy()
+            rows.iloc[:, -1] = spec_s.loc[new, "scan_s"].to_numpy()
+            aldf = pd.concat([aldf, rows]).reset_index(drop = True)
+            
+            rows = pd.DataFrame(np.nan, columns = massdf.columns, index = range(len(new)))
+            rows.iloc[:, -1] = spec_s.loc[new, "mz_s"].to_numpy()
+            massdf = pd.concat([massdf, rows]).reset_index(drop = True)
+        
+        aldf["mean"] = massdf.mean(axis = 1, skipna = True).to_numpy()                                                ##mean of all matched masses of every feature
+        order = np.argsort(aldf["mean"].to_numpy(), kind = "stable")                                                  ##reorder both tables
+        aldf = aldf.iloc[order].reset_index(drop = True)
+        massdf = massdf.iloc[order].reset_index(drop = True)
               
     
     aldf = aldf.sort_values('mean')
@@ -88,6 +462,4 @@ def align_spectra(spec, ppm_window = 2):
     aldf = aldf.reset_index(drop = True)
     aldf.index = ["ID" + s for s in [str(x) for x in list(range(1, aldf.shape[0] + 1, 1))]]  
     
-    aldf = aldf.apply(lambda col:pd.to_numeric(col, errors='coerce'))                                                ##fix datatype:object bug; convert to float64
-    
     return aldf    
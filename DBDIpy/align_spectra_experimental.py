@@ -1,34 +1,58 @@
-def align_spectra_b(spec, ppm_window = 2):
-    
-    """beta version of DBDIpy.align_spectra() with optimized runtime.
-    Tests pending.
-    
+def align_spectra_b(spec, ppm_window = 2, mz_window = None, merge = True):
+
+    """Feature building from a list of spectra with preallocated buffers.
+    Variant of DBDIpy.align_spectra() which counts the peaks of all spectra up-front and
+    preallocates every buffer of the alignment once: each peak fills exactly one cell of the
+    feature table, so the total number of peaks bounds both the number of features and the
+    number of stored intensities. The spectra are then aligned by a DBDIpy.SpectraAligner
+    in sparse mode whose buffers never need to grow.
+
+    Parameters
+    ----------
+    spec : list of matchms.Spectra
+           Spectra imported by matchms from mass spectrometric experiments
+           (MS1) of instance matchms.Spectrum.
+
+    ppm_window : float, optional
+                 Window for mass alignment in ppm. Default is 2 ppm.
+                 The window scales with the mass of a feature (m/z x ppm_window x 1e-6).
+
+    mz_window : float, optional
+                Absolute window for mass alignment in Da. Overrides ppm_window if given.
+
+    merge : bool, optional
+            Collapse neighbouring features whose mean m/z values drifted into each
+            other's window, as in DBDIpy.align_spectra(). Default is True.
+
+    Returns
+    -------
+    A two-dimensional pd.DataFrames containing aligned mass spectrometric features
+    in the same layout as DBDIpy.align_spectra(): a "mean" m/z column followed by
+    one intensity column per scan, indexed by feature IDs.
+
+    See Also
+    --------
+    DBDIpy.align_spectra() : Default alignment function.
+
     """
-    
+
     import matchms
-    import numpy as np
-    import pandas as pd
     from tqdm import tqdm
-    
+    from DBDIpy.align_spectra import _merge_candidates, _merge_features
+    from DBDIpy.spectra_aligner import SpectraAligner
+
     if not isinstance(spec[0], matchms.Spectrum):
         raise TypeError("Argument for spec should be a list of matchms.Spectrum.")
-        
+
+    aligner = SpectraAligner(ppm_window = ppm_window, sparse = True, mz_window = mz_window)
+
     n_peaks = sum([len(s.peaks.mz) for s in spec])
-    
-    aldf = pd.DataFrame({"mean": np.zeros(n_peaks), "scan1": np.zeros(n_peaks)})
-    
-    massdf = pd.DataFrame({"scan1": np.zeros(n_peaks)})
-    
-    peak_count = 0
-    
-    for s in tqdm(range(1, len(spec)), desc = 'progress'):
-        scan_s = spec[s]
-        mz_s, scan_s_int = scan_s.peaks.mz, scan_s.peaks.intensities
-        aldf_mz_mask = (aldf["mean"][peak_count:peak_count+len(mz_s)] >= mz_s[:, np.newaxis] - ppm_window * 1e-6) & (aldf["mean"][peak_count:peak_count+len(mz_s)] <= mz_s[:, np.newaxis] + ppm_window * 1e-6)
-        idx = np.argmin(np.abs(aldf["mean"][peak_count:peak_count+len(mz_s)][aldf_mz_mask] - mz_s[:, np.newaxis][aldf_mz_mask]), axis=1)
-        idx += peak_count
-        aldf.iloc[idx, s+1] = scan_s_int
-        massdf.iloc[idx, s+1] = mz_s
-        peak_count += len(mz_s)
-    
-    return aldf, massdf
+    aligner._reserve(n_peaks, n_peaks)                                                       ##every peak fills at most one feature and one cell
+
+    for s in tqdm(range(len(spec)), desc = 'progress'):
+        aligner.add(spec[s])
+
+    if merge and _merge_candidates(aligner.mz, ppm_window, mz_window).size > 0:
+        return _merge_features(aligner.to_sparse(), ppm_window, mz_window).to_frame()
+
+    return aligner.to_frame()
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+
+class AnnotationIndex:
+
+    """Lookup index of mass difference rules for adduct and fragment annotation.
+    Every rule spans an interval of accepted mass differences around its deltamz. Rules are
+    sorted by their lower bound once, so the rules matching a mass difference are found by
+    np.searchsorted in O(log R) instead of scanning all results once per rule. A mass
+    difference matching several overlapping rules receives every match.
+    identify_adducts() and propose_adducts() annotate their results through this index.
+
+    Parameters
+    ----------
+    deltamz : array-like
+              Mass differences of the rules in Da.
+
+    labels : array-like
+             Name of every rule, e.g. the motive or annotation of an adduct.
+
+    mass_error : float, optional
+                 Tolerance around each deltamz. Default is 2.
+
+    unit : str, {"ppm", "Da"}, optional
+           Unit of mass_error. "ppm" scales the tolerance with deltamz as in
+           identify_adducts(), "Da" is an absolute tolerance as in propose_adducts().
+
+    Examples
+    --------
+    >>> rules = AnnotationIndex([15.994915, 18.010565], ["O", "H2O"], mass_error = 2, unit = "ppm")
+    >>> pairs, matched = rules.lookup(np.array([15.99492, 18.0106, 3.0]))
+
+    """
+
+    def __init__(self, deltamz, labels, mass_error = 2, unit = "ppm"):
+
+        self.deltamz = np.asarray(deltamz, dtype = np.float64).ravel()
+        self.labels = np.asarray(labels, dtype = object).ravel()
+
+        if self.deltamz.size != self.labels.size:
+            raise ValueError("Incompatible dimensions of mass differences and labels.")
+
+        if isinstance(mass_error, bool) or not isinstance(mass_error, (int, float)):
+            raise TypeError("Argument mass_error should be numeric.")
+
+        if unit not in ("ppm", "Da"):
+            raise ValueError("Invalid unit. Choose from 'ppm' or 'Da'.")
+
+        self.mass_error = mass_error
+        self.unit = unit
+
+        tol = np.abs(self.deltamz) * mass_error * 1e-6 if unit == "ppm" else np.full(self.deltamz.size, float(mass_error))
+        self.lower = np.minimum(self.deltamz - tol, self.deltamz + tol)
+        self.upper = np.maximum(self.deltamz - tol, self.deltamz + tol)
+
+        ##rules sorted by lower bound
+        self._order = np.argsort(self.lower, kind = "stable")
+        self._lower = self.lower[self._order]
+        self._upper = self.upper[self._order]
+        self._width = (self.upper - self.lower).max(initial = 0.0)
+
+    def __repr__(self):
+        return f"AnnotationIndex({self.n_rules} rules, mass_error = {self.mass_error} {self.unit})"
+
+    def __len__(self):
+        return self.n_rules
+
+    @property
+    def n_rules(self):
+        """Number of rules."""
+        return self.deltamz.size
+
+    @classmethod
+    def from_frame(cls, rules, mzcol = "deltamz", labelcol = "motive", mass_error = 2, unit = "ppm"):
+
+        """Builds the index from a DataFrame of rules, e.g. the adduct rules of identify_adducts()."""
+
+        if not isinstance(rules, pd.DataFrame):
+            raise TypeError("Argument for rules should be of instance pandas.DataFrame.")
+
+        return cls(rules[mzcol].to_numpy(), rules[labelcol].to_numpy(), mass_error = mass_error, unit = unit)
+
+    def lookup(self, mzdiff):
+
+        """All matches of the mass differences mzdiff.
+        Returns two integer arrays of equal length holding the position in mzdiff and the
+        matched rule (in the order the rules were given), sorted by position and rule.
+
+        """
+
+        x = np.asarray(mzdiff, dtype = np.float64).ravel()
+
+        ##rules with lower <= x are left of hi; rules with lower < x - width cannot reach x
+        lo = np.searchsorted(self._lower, x - self._width, side = "left")
+        hi = np.searchsorted(self._lower, x, side = "right")
+        n = hi - lo
+
+        pos = np.repeat(np.arange(x.size), n)
+        cand = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n) + np.repeat(lo, n)
+        keep = self._upper[cand] >= x[pos]
+        pos, rule = pos[keep], self._order[cand[keep]]
+
+        srt = np.lexsort((rule, pos))
+
+        return pos[srt], rule[srt]
+
+    def annotate(self, mzdiff, sep = "; "):
+
+        """Labels of all rules matching each mass difference, joined by sep; nan if none matches."""
+
+        x = np.asarray(mzdiff, dtype = np.float64).ravel()
+        pos, rule = self.lookup(x)
+
+        res = np.full(x.size, np.nan, dtype = object)
+        res[pos] = self.labels[rule]                                                         ##single matches, vectorized
+
+        counts = np.bincount(pos, minlength = x.size)
+        for p in np.flatnonzero(counts > 1):                                                 ##join overlapping matches
+            start, stop = np.searchsorted(pos, [p, p + 1])
+            res[p] = sep.join(str(label) for label in self.labels[rule[start:stop]])
+
+        return res
@@ -0,0 +1,401 @@
+def correlate_xic(df, method = "spearman", dtype = "float64", min_overlap = 2):
+
+    """Pointwise correlation of XIC traces.
+    Computes the correlation matrix of all rows of a DataFrame of equal-length XIC,
+    e.g. generated by impute_intensities(). Every XIC is ranked (Spearman) and
+    z-normalized once, so that the complete matrix is a single matrix product
+    evaluated by BLAS instead of pairwise loops.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+         A DataFrame of equal-length ion traces formated as rows.
+
+    method : str, {'spearman', 'pearson', 'kendall'}
+             Correlation method. Default is "spearman".
+             "kendall" has no matrix formulation and is passed to pandas.DataFrame.corr().
+
+    dtype : str, {"float64", "float32"}, optional
+            Precision of the matrix product. "float32" halves memory and is faster for
+            large tables at a precision of about 1e-6 on the coefficients.
+
+    min_overlap : int, optional
+                  XIC may contain nan for scans without detection. Pearson and Kendall coefficients
+                  are then computed over the scans detected in both XIC only, and pairs sharing fewer
+                  than min_overlap scans are nan. Spearman requires input without missing values.
+                  Default is 2.
+
+    Returns
+    -------
+    A pd.DataFrame of correlation coefficients indexed by the row labels of df on both axes.
+
+    See Also
+    --------
+    DBDIpy.correlate_xic_blocks() : Blocked computation for large tables.
+    pandas.DataFrame.corr()
+
+    """
+
+    import pandas as pd
+
+    _check_input(df, method, dtype, min_overlap)
+
+    if method == "kendall":
+        return df.T.corr(method = method, min_periods = min_overlap)
+
+    Z, M = _prepare(df.to_numpy(), method, dtype)
+    C = _corr_block(Z, M, slice(None), min_overlap = min_overlap)
+
+    return pd.DataFrame(C, index = df.index, columns = df.index)
+
+
+def correlate_xic_blocks(df, method = "spearman", dtype = "float64", block_size = 1024, min_overlap = 2):
+
+    """Blocked pointwise correlation of XIC traces.
+    Yields the correlation matrix of correlate_xic() in horizontal blocks of block_size rows,
+    so that the full N x N matrix is never held in memory. XIC are ranked and
+    z-normalized only once for all blocks.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+         A DataFrame of equal-length ion traces formated as rows.
+
+    method : str, {'spearman', 'pearson'}
+             Correlation method. Default is "spearman".
+
+    dtype : str, {"float64", "float32"}, optional
+            Precision of the matrix product.
+
+    block_size : int, optional
+                 Number of XIC per block. Default is 1024.
+
+    min_overlap : int, optional
+                  XIC may contain nan for scans without detection. Pearson coefficients are then
+                  computed over the scans detected in both XIC only, and pairs sharing fewer than
+                  min_overlap scans are nan. Spearman requires input without missing values.
+                  Default is 2.
+
+    Yields
+    ------
+    pd.DataFrame blocks of correlation coefficients of block_size XIC (rows) against
+    all XIC in df (columns).
+
+    Examples
+    --------
+    >>> for block in correlate_xic_blocks(specs_imputed, block_size = 2000):
+    ...     partners = block[block > 0.9]
+
+    """
+
+    import pandas as pd
+
+    _check_input(df, method, dtype, min_overlap)
+
+    if method == "kendall":
+        raise ValueError("Blocked correlation supports 'spearman' or 'pearson' only.")
+
+    if isinstance(block_size, bool) or not isinstance(block_size, int) or block_size < 1:
+        raise ValueError("Argument block_size should be a positive integer.")
+
+    Z, M = _prepare(df.to_numpy(), method, dtype)
+    for start, block in _corr_blocks(Z, M, block_size, min_overlap):
+        yield pd.DataFrame(block, index = df.index[start:start + block.shape[0]], columns = df.index)
+
+
+def correlate_xic_sparse(df, method = "spearman", threshold = 0.9, dtype = "float64", block_size = 1024,
+                         min_overlap = 2):
+
+    """Thresholded pointwise correlation of XIC traces.
+    Computes the correlation matrix tile by tile and keeps only coefficients above threshold
+    as a scipy.sparse matrix. Each tile correlates block_size XIC with all XIC of higher
+    index, so memory is bounded by block_size x N plus the number of hits, and every
+    coefficient is computed once.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+         A DataFrame of equal-length ion traces formated as rows.
+
+    method : str, {'spearman', 'pearson'}
+             Correlation method. Default is "spearman".
+
+    threshold : float, optional
+                Coefficients greater than threshold are stored. Default is 0.9.
+
+    dtype : str, {"float64", "float32"}, optional
+            Precision of the matrix products and of the stored coefficients.
+
+    block_size : int, optional
+                 Number of XIC per tile. Default is 1024.
+
+    min_overlap : int, optional
+                  XIC may contain nan for scans without detection. Pearson coefficients are then
+                  computed over the scans detected in both XIC only, and pairs sharing fewer than
+                  min_overlap scans are nan. Spearman requires input without missing values.
+                  Default is 2.
+
+    Returns
+    -------
+    A symmetric scipy.sparse.csr_matrix of shape N x N holding the coefficients above
+    threshold at the positions of both XIC. The diagonal is not stored.
+
+    See Also
+    --------
+    DBDIpy.correlate_xic() : Dense correlation matrix.
+
+    """
+
+    import numpy as np
+    import scipy.sparse
+
+    _check_input(df, method, dtype, min_overlap)
+
+    if method == "kendall":
+        raise ValueError("Sparse correlation supports 'spearman' or 'pearson' only.")
+
+    if isinstance(block_size, bool) or not isinstance(block_size, int) or block_size < 1:
+        raise ValueError("Argument block_size should be a positive integer.")
+
+    Z, M = _prepare(df.to_numpy(), method, dtype)
+    i, j, corr = _thresholded_pairs(Z, threshold, block_size, M, min_overlap)
+
+    n = Z.shape[0]
+    cormat = scipy.sparse.csr_matrix((np.concatenate([corr, corr]), (np.concatenate([i, j]), np.concatenate([j, i]))),
+                                     shape = (n, n), dtype = dtype)
+
+    return cormat
+
+
+def _check_input(df, method, dtype, min_overlap = 2):
+
+    """Common input validation of the correlation functions."""
+
+    import numpy as np
+    import pandas as pd
+
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError("Argument for df should be of instance pandas.DataFrame.")
+
+    if method not in ("spearman", "pearson", "kendall"):
+        raise ValueError("Invalid correlation method. Choose from 'spearman', 'pearson' or 'kendall'.")
+
+    if np.dtype(dtype) not in (np.float32, np.float64):
+        raise ValueError("Invalid dtype. Choose from 'float32' or 'float64'.")
+
+    if isinstance(min_overlap, bool) or not isinstance(min_overlap, int) or min_overlap < 1:
+        raise ValueError("Argument min_overlap should be a positive integer.")
+
+
+def _normalize(X, method, dtype = "float64"):
+
+    """Ranks (Spearman) and z-normalizes the rows of X to unit length.
+    The dot product of two normalized rows is their correlation coefficient;
+    rows of constant intensity become nan.
+
+    """
+
+    import numpy as np
+
+    X = np.asarray(X, dtype = np.float64)
+
+    if method == "spearman":
+        from scipy.stats import rankdata
+        X = rankdata(X, axis = 1)                                                            ##average ranks of ties as in pandas
+
+    Z = X - X.mean(axis = 1, keepdims = True)
+    norm = np.sqrt((Z * Z).sum(axis = 1, keepdims = True))
+    with np.errstate(invalid = "ignore", divide = "ignore"):
+        Z = Z / norm
+
+    return Z.astype(dtype, copy = False)
+
+
+def _prepare(X, method, dtype = "float64"):
+
+    """Normalized rows Z and detection mask M of X for _corr_block().
+    Without missing values M is None and Z is given by _normalize(). Otherwise every row is
+    centered and scaled by its own detected values and missing values are set to 0 in Z and M.
+    Spearman ranks would depend on the scans shared by every pair, so rows with missing
+    values are rejected for method = "spearman".
+
+    """
+
+    import numpy as np
+
+    X = np.asarray(X, dtype = np.float64)
+    detected = ~np.isnan(X)
+
+    if detected.all():
+        return _normalize(X, method, dtype), None
+
+    if method == "spearman":
+        raise ValueError("Spearman correlation of XIC containing nan is not available for this search. "
+                         "Impute missing values or choose method = 'pearson'.")
+
+    with np.errstate(invalid = "ignore", divide = "ignore"):
+        n = detected.sum(axis = 1, keepdims = True)
+        Z = np.where(detected, X - np.nansum(X, axis = 1, keepdims = True) / n, 0)
+        scale = np.sqrt((Z * Z).sum(axis = 1, keepdims = True) / n)
+        Z = np.where(scale > 0, Z / scale, 0)                                              ##scaling keeps sums well conditioned
+
+    return Z.astype(dtype), detected.astype(dtype)
+
+
+def _corr_block(Z, M, rows, cols = slice(None), min_overlap = 2):
+
+    """Correlation of rows against cols of prepared data (Z, M), clipped to [-1, 1].
+    With a mask, coefficients are computed over the scans detected in both XIC from six
+    masked matrix products; pairs sharing fewer than min_overlap scans are nan.
+
+    """
+
+    import numpy as np
+
+    Zr, Zc = Z[rows], Z[cols]
+
+    if M is None:
+        return np.clip(Zr @ Zc.T, -1, 1)
+
+    Mr, Mc = M[rows], M[cols]
+    n = Mr @ Mc.T                                                                            ##number of common scans
+    sx, sy = Zr @ Mc.T, Mr @ Zc.T
+    with np.errstate(invalid = "ignore", divide = "ignore"):
+        cov = Zr @ Zc.T - sx * sy / n
+        var_x = (Zr * Zr) @ Mc.T - sx * sx / n
+        var_y = Mr @ (Zc * Zc).T - sy * sy / n
+        C = cov / np.sqrt(var_x * var_y)
+    C[(n < min_overlap) | (var_x <= 0) | (var_y <= 0)] = np.nan
+
+    return np.clip(C, -1, 1)
+
+
+def _corr_blocks(Z, M, block_size, min_overlap = 2):
+
+    """Yields (start, block) with the correlation of block_size rows against all rows."""
+
+    for start in range(0, Z.shape[0], block_size):
+        yield start, _corr_block(Z, M, slice(start, start + block_size), min_overlap = min_overlap)
+
+
+def _corr_pairs(Z, M, i, j, min_overlap = 2, block = 65536):
+
+    """Correlation of the row pairs (i[k], j[k]) of prepared data (Z, M), clipped to [-1, 1]."""
+
+    import numpy as np
+
+    corr = np.empty(len(i), dtype = np.float64)
+    for b in range(0, len(i), block):
+        Zi, Zj = Z[i[b:b + block]], Z[j[b:b + block]]
+        if M is None:
+            corr[b:b + block] = np.einsum("ij,ij->i", Zi, Zj)
+            continue
+        Mi, Mj = M[i[b:b + block]], M[j[b:b + block]]
+        n = np.einsum("ij,ij->i", Mi, Mj)
+        sx, sy = np.einsum("ij,ij->i", Zi, Mj), np.einsum("ij,ij->i", Mi, Zj)
+        with np.errstate(invalid = "ignore", divide = "ignore"):
+            cov = np.einsum("ij,ij->i", Zi, Zj) - sx * sy / n
+            var_x = np.einsum("ij,ij->i", Zi * Zi, Mj) - sx * sx / n
+            var_y = np.einsum("ij,ij->i", Mi, Zj * Zj) - sy * sy / n
+            c = cov / np.sqrt(var_x * var_y)
+        c[(n < min_overlap) | (var_x <= 0) | (var_y <= 0)] = np.nan
+        corr[b:b + block] = c
+
+    return np.clip(corr, -1, 1)
+
+
+def _thresholded_pairs(Z, threshold, block_size, M = None, min_overlap = 2):
+
+    """Pairs (i, j) with i < j and correlation above threshold from prepared rows (Z, M).
+    Tiles of block_size rows are correlated with all rows from the start of the tile on.
+
+    """
+
+    import numpy as np
+
+    res_i, res_j, res_corr = [], [], []
+    for start in range(0, Z.shape[0], block_size):
+        block = _corr_block(Z, M, slice(start, start + block_size), slice(start, None), min_overlap)
+        r, c = np.nonzero(block > threshold)
+        keep = r < c                                                                         ##upper triangle without diagonal
+        r, c = r[keep], c[keep]
+        res_i.append(r + start)
+        res_j.append(c + start)
+        res_corr.append(block[r, c])
+
+    if not res_i:
+        return np.empty(0, dtype = np.int64), np.empty(0, dtype = np.int64), np.empty(0, dtype = Z.dtype)
+
+    return np.concatenate(res_i), np.concatenate(res_j), np.concatenate(res_corr)
+
+
+def _lsh_bands(threshold, recall, n_bits):
+
+    """Number of bands of n_bits random hyperplanes for candidate recall at threshold.
+    Two unit vectors of correlation r agree on a hyperplane with p = 1 - arccos(r) / pi and
+    share a band with p ** n_bits. Returns the number of bands and the recall they achieve
+    for pairs of correlation threshold; more strongly correlated pairs are found more often.
+
+    """
+
+    import numpy as np
+
+    p = (1 - np.arccos(np.clip(threshold, -1, 1)) / np.pi) ** n_bits
+
+    if p >= 1:
+        return 1, 1.0
+
+    n_bands = max(1, int(np.ceil(np.log1p(-recall) / np.log1p(-p))))
+
+    return n_bands, float(1 - (1 - p) ** n_bands)
+
+
+def _lsh_pairs(Z, threshold, recall = 0.99, n_bits = None, random_state = None):
+
+    """Candidate pairs (i, j) with i < j of normalized rows Z by random-hyperplane hashing.
+    Rows are split into buckets by the signs of their projections on n_bits random
+    hyperplanes, once per band, and all rows sharing a bucket in any band become
+    candidates. Returns the candidates and the expected recall at threshold.
+
+    """
+
+    import numpy as np
+
+    n = Z.shape[0]
+    if n_bits is None:
+        n_bits = int(np.clip(np.ceil(np.log2(max(n, 2))), 8, 24))                            ##about one random collision per bucket
+    n_bands, achieved = _lsh_bands(threshold, recall, n_bits)
+
+    rng = np.random.default_rng(random_state)
+    rows = np.flatnonzero(np.isfinite(Z).all(axis = 1))                                      ##constant XIC have no correlation
+    empty = np.empty(0, dtype = np.int64)
+    if rows.size < 2:
+        return empty, empty, achieved
+
+    Zr = Z[rows]
+    weights = np.exp2(np.arange(n_bits)).astype(Z.dtype)                                   ##exact bit packing by BLAS
+
+    pairs = []
+    for b in range(n_bands):
+        if b % 8 == 0:                                                                       ##project 8 bands per matrix product
+            planes = rng.standard_normal((Z.shape[1], min(8, n_bands - b) * n_bits)).astype(Z.dtype)
+            keys = ((Zr @ planes) > 0).astype(Z.dtype).reshape(rows.size, -1, n_bits) @ weights
+        key = keys[:, b % 8]
+        srt = np.argsort(key, kind = "stable")
+        o, k = rows[srt], key[srt]
+
+        ##all pairs within runs of equal keys
+        start = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        size = np.diff(np.r_[start, k.size])
+        after = np.repeat(start + size, size) - np.arange(k.size) - 1                        ##rows behind each row in its bucket
+        offset = np.arange(after.sum()) - np.repeat(np.cumsum(after) - after, after)
+        first = np.repeat(np.arange(k.size), after)
+        i, j = o[first], o[first + 1 + offset]
+        pairs.append(np.minimum(i, j) * n + np.maximum(i, j))
+
+    pairs = np.sort(np.concatenate(pairs))
+    if pairs.size == 0:                                                                      ##no bucket holds two rows
+        return empty, empty, achieved
+    pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]]
+
+    return pairs // n, pairs % n, achieved
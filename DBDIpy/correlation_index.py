@@ -0,0 +1,171 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+class CorrelationIndex:
+
+    """Reusable correlation index for repeated queries on a table of XIC.
+    XIC are ranked (Spearman) and z-normalized once when the index is built. A query for
+    one feature then is a single vector-matrix product instead of a full correlation matrix,
+    and rows which were queried before are served from a least-recently-used cache.
+    propose_adducts() accepts a CorrelationIndex in place of a DataFrame, so that looking up
+    many features of one dataset costs one row each.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+         A DataFrame of equal-length ion traces formated as rows,
+         e.g. generated by impute_intensities().
+
+    method : str, {'pearson', 'spearman'}, optional
+             Correlation method. Default is "pearson" as in propose_adducts().
+
+    dtype : str, {"float64", "float32"}, optional
+            Precision of the normalized XIC and of the cached rows.
+
+    cache_size : int, optional
+                 Maximum number of cached correlation rows. Default is 128.
+
+    min_overlap : int, optional
+                  Enables XIC containing nan with method = "pearson". Coefficients are computed
+                  over the scans detected in both XIC only; pairs sharing fewer than min_overlap
+                  scans are nan. Default is None, which requires data without missing values.
+
+    Examples
+    --------
+    >>> index = CorrelationIndex(specs_imputed, method = "pearson")
+    >>> proposals = [propose_adducts(ID, index, masses) for ID in (55, 99, 108)]
+
+    See Also
+    --------
+    DBDIpy.correlate_xic() : Full correlation matrix.
+    DBDIpy.propose_adducts() : Adduct proposals for a single feature.
+
+    """
+
+    def __init__(self, df, method = "pearson", dtype = "float64", cache_size = 128, min_overlap = None):
+
+        from DBDIpy.correlate_xic import _check_input
+
+        _check_input(df, method, dtype)
+
+        if method == "kendall":
+            raise ValueError("CorrelationIndex supports 'spearman' or 'pearson' only.")
+
+        if isinstance(cache_size, bool) or not isinstance(cache_size, int) or cache_size < 0:
+            raise ValueError("Argument cache_size should be a non-negative integer.")
+
+        if min_overlap is not None and (isinstance(min_overlap, bool) or not isinstance(min_overlap, int) or min_overlap < 2):
+            raise ValueError("Argument min_overlap should be an integer of at least 2.")
+
+        self.method = method
+        self.dtype = np.dtype(dtype)
+        self.cache_size = cache_size
+        self.min_overlap = min_overlap
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()                                                          ##position -> correlation row
+
+        self.update(df)
+
+    def __repr__(self):
+        return (f"CorrelationIndex({self.n_features} features, method = '{self.method}', "
+                f"{len(self._cache)} cached rows)")
+
+    def __len__(self):
+        return self.n_features
+
+    @property
+    def n_features(self):
+        """Number of indexed XIC."""
+        return self._Z.shape[0]
+
+    @property
+    def index(self):
+        """Labels of the indexed XIC."""
+        return self._index
+
+    def update(self, df):
+
+        """Rebuilds the index from changed data and invalidates all cached rows."""
+
+        from DBDIpy.correlate_xic import _check_input, _prepare
+
+        _check_input(df, self.method, self.dtype)
+
+        if self.min_overlap is None and df.isnull().values.any():
+            raise ValueError("Input DataFrame contains missing values.")
+
+        self._Z, self._M = _prepare(df.to_numpy(), self.method, self.dtype)
+        self._index = df.index.copy()
+        self.clear_cache()
+
+    def clear_cache(self):
+
+        """Drops all cached correlation rows."""
+
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _check_positions(self, IDs):
+
+        """Validates positional IDs."""
+
+        for ID in IDs:
+            if isinstance(ID, (bool, np.bool_)) or not isinstance(ID, (int, np.integer)):
+                raise TypeError("IDs should be integer positions of features.")
+            if not -self.n_features <= ID < self.n_features:
+                raise IndexError(f"ID {ID} is out of range for {self.n_features} features.")
+
+        return [int(ID) % self.n_features for ID in IDs]
+
+    def rows(self, IDs):
+
+        """Correlation of the features at positions IDs with all features.
+        Rows missing from the cache are computed together in one matrix product.
+        Returns a pd.DataFrame with one row per ID and one column per indexed XIC.
+
+        """
+
+        from DBDIpy.correlate_xic import _corr_block
+
+        IDs = self._check_positions(list(IDs))
+
+        missing = [ID for ID in dict.fromkeys(IDs) if ID not in self._cache]
+        if missing:
+            block = _corr_block(self._Z, self._M, missing, min_overlap = self.min_overlap or 2)
+            for ID, row in zip(missing, block):
+                self._cache[ID] = row
+        self.misses += len(missing)
+        self.hits += len(IDs) - len(missing)
+
+        res = np.empty((len(IDs), self.n_features), dtype = self.dtype)
+        for r, ID in enumerate(IDs):
+            res[r] = self._cache[ID]
+            self._cache.move_to_end(ID)                                                      ##mark as recently used
+
+        while len(self._cache) > self.cache_size:                                            ##evict least recently used rows
+            self._cache.popitem(last = False)
+
+        return pd.DataFrame(res, index = self._index[IDs], columns = self._index)
+
+    def row(self, ID):
+
+        """Correlation of the feature at position ID with all features as pd.Series."""
+
+        return self.rows([ID]).iloc[0]
+
+    def neighbours(self, ID, threshold = 0.9):
+
+        """Features correlated with the feature at position ID by at least threshold.
+        Perfect correlations, including the feature itself, are excluded as in propose_adducts().
+
+        """
+
+        row = self.row(ID)
+        own = np.arange(self.n_features) == self._check_positions([ID])[0]
+
+        return row[(row >= threshold) & (row < 1) & ~own]
@@ -0,0 +1,87 @@
+def export_to_feather(df, path, metadata = None):
+
+    """Writes an aligned feature table to an uncompressed Feather (Arrow IPC) file.
+    Feature labels are stored as column "ID", followed by the m/z and intensity columns
+    and the optional metadata columns. Numeric columns are written from their NumPy
+    buffers with missing values kept as nan, so that read_feather() can memory-map the
+    file and return the intensities as zero-copy views without reading the whole table.
+
+    Parameters
+    ----------
+    df : pd.DataFrame or DBDIpy.SparseSpectra
+         A two-dimensional DataFrame containing aligned mass spectrometric features
+         e.g. generated by align_spectra() or impute_intensities().
+
+    path : str or os.PathLike
+           Name of the file to write. An existing file is overwritten.
+
+    metadata : pd.DataFrame, optional
+               Annotation of the features, e.g. a column "mol_formula" for plot_adducts().
+               Rows are matched to the features of df by position. A column "ID" is
+               dropped in favour of the labels of df.
+
+    Returns
+    -------
+    The number of written features.
+
+    Examples
+    --------
+    >>> export_to_feather(specs_aligned, "specs_aligned.feather", metadata = annotation_metadata)
+    >>> specs_aligned = read_feather("specs_aligned.feather")
+
+    See Also
+    --------
+    DBDIpy.read_feather() : Memory-mapped import of the written file.
+
+    """
+
+    import json
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.feather
+    from DBDIpy.sparse_spectra import SparseSpectra
+
+    if isinstance(df, SparseSpectra):
+        df = df.to_frame()
+
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError("Argument df should be of instance pd.DataFrame or DBDIpy.SparseSpectra.")
+
+    if metadata is None:
+        metadata = pd.DataFrame(index = range(df.shape[0]))
+
+    if not isinstance(metadata, pd.DataFrame):
+        raise TypeError("Argument metadata should be of instance pd.DataFrame.")
+
+    if metadata.shape[0] != df.shape[0]:
+        raise ValueError("Incompatible dimensions of df and metadata.")
+
+    metadata = metadata.drop(columns = "ID", errors = "ignore")
+
+    ##JSON labels restore non-string column labels, e.g. scan numbers
+    labels = lambda x: [l.item() if isinstance(l, np.generic) else l for l in x]
+    try:
+        info = {"columns": labels(df.columns), "metadata": labels(metadata.columns),
+                "index": df.index.name}
+        info = json.dumps(info)
+    except TypeError:
+        raise ValueError("Column labels should be strings or numbers.")
+
+    names = ["ID"] + [str(c) for c in df.columns] + [str(c) for c in metadata.columns]
+    if len(set(names)) != len(names):
+        raise ValueError("Column labels of df and metadata should be unique and differ from 'ID'.")
+
+    arrays = [pa.array(np.asarray(df.index))]
+    for frame in (df, metadata):
+        for c in range(frame.shape[1]):
+            values = frame.iloc[:, c]
+            if values.dtype.kind in "biuf":
+                arrays.append(pa.array(values.to_numpy()))                                  ##nan stays a value, no validity bitmap
+            else:
+                arrays.append(pa.array(values.to_numpy(), from_pandas = True))
+
+    table = pa.table(arrays, names = names, metadata = {"dbdipy": info})
+    pyarrow.feather.write_feather(table, path, compression = "uncompressed")                 ##uncompressed files can be memory-mapped
+
+    return df.shape[0]
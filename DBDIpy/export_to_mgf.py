@@ -0,0 +1,91 @@
+def export_to_mgf(df, path, mzcol = 0, fmt = "%.6f %.8g", compress = None, chunk_size = 256):
+
+    """Writes tabular data to a .mgf-file.
+    Streams a two-dimensional pd.DataFrame of aligned mass spectrometric features directly
+    to MGF text with one spectrum per scan, without building matchms.Spectrum objects.
+    Peaks of chunk_size scans are formatted together and written to a buffered file in
+    one call, so that large exports are limited by I/O rather than by object allocation.
+
+    Parameters
+    ----------
+    df : pd.DataFrame or DBDIpy.SparseSpectra
+         A DataFrame containing tabular mass spectrometric data as for export_to_spectra().
+         The first column (by default) contains mass to charge ratios,
+         successive columns contain corresponting signal intensities
+         of each mass spectrometric scan.
+
+    path : str or os.PathLike
+           Name of the file to write. An existing file is overwritten.
+
+    mzcol : int, optional
+            Position of the column containing m/z information of the features.
+            Default is 0. Ignored for SparseSpectra input.
+
+    fmt : str, optional
+          Format of a peak line for m/z value and intensity. Default is "%.6f %.8g".
+
+    compress : str, {None, "gzip"}, optional
+               Write a gzip-compressed file. Default is None, which compresses
+               if path ends with ".gz".
+
+    chunk_size : int, optional
+                 Number of scans formatted per write. Default is 256.
+
+    Returns
+    -------
+    The number of written spectra. Every spectrum is titled by its column label and
+    contains the detected signals of the scan sorted by m/z.
+
+    Examples
+    --------
+    >>> export_to_mgf(specs_imputed, "DBDIpy_processed_spectra.mgf.gz", mzcol = 88)
+
+    See Also
+    --------
+    DBDIpy.export_to_spectra() : Export to a list of matchms.Spectrum objects.
+
+    """
+
+    import gzip
+    import os
+    import numpy as np
+    from DBDIpy.export_to_spectra import _scan_peaks
+
+    if compress is None:
+        compress = "gzip" if os.fspath(path).endswith(".gz") else None
+
+    if compress not in (None, "gzip"):
+        raise ValueError("Invalid compression. Choose from None or 'gzip'.")
+
+    if isinstance(chunk_size, bool) or not isinstance(chunk_size, int) or chunk_size < 1:
+        raise ValueError("Argument chunk_size should be a positive integer.")
+
+    try:
+        fmt % (0.0, 0.0)
+    except (TypeError, ValueError):
+        raise ValueError("Argument fmt should format one m/z value and one intensity, e.g. '%.6f %.8g'.")
+
+    peaks = _scan_peaks(df, mzcol)
+    line = fmt + "\n"
+
+    if compress == "gzip":
+        handle = gzip.open(path, "wt", encoding = "utf-8", compresslevel = 6)
+    else:
+        handle = open(path, "w", encoding = "utf-8", buffering = 1 << 20)
+
+    n_spectra = 0
+
+    with handle:
+        chunk = []
+        for label, mz, intensities in peaks:
+            values = np.column_stack([mz, intensities]).ravel().tolist()
+            chunk.append(f"BEGIN IONS\nTITLE={label}\n" + (line * mz.size) % tuple(values) + "END IONS\n\n")
+            n_spectra += 1
+
+            if len(chunk) == chunk_size:                                                     ##one write per chunk of scans
+                handle.write("".join(chunk))
+                chunk = []
+
+        handle.write("".join(chunk))
+
+    return n_spectra
@@ -1,25 +1,33 @@
-def export_to_spectra(df, mzcol = 0):
+def export_to_spectra(df, mzcol = 0, lazy = False):
     
     """Builds a list of spectra from tabular data.
     Splits a two-dimensional pd.DataFrames containing aligned mass spectrometric features 
     to a list of matchms.Spectrum objects for further processing or exporting to .mgf-files.
+    The m/z values and intensities are extracted once as NumPy arrays and every spectrum
+    is built from the detected signals of one column. The input is not modified.
     
     Parameters
     ----------    
-    df : pd.DataFrame
+    df : pd.DataFrame or DBDIpy.SparseSpectra
          A DataFrame containing tabular mass spectrometric data. 
          The first column (by default) contains mass to charge ratios,
          successive columns contain corresponting signal intensities 
          of each mass spectrometric scan.
+         SparseSpectra are exported from their stored signals directly.
         
     mzcol : int, optional
             Position of the column containing m/z information of the features.
-            Default is 0.
+            Default is 0. Ignored for SparseSpectra input.
+    
+    lazy : bool, optional
+           Return a generator which builds the spectra one by one while it is consumed
+           instead of a list holding all of them, e.g. to write large tables scan by scan.
+           Default is False.
     
     Returns
     -------
     A a list containing a matchms.Spectrum object for each column of the input
-    DataFrame except for the m/z column.
+    DataFrame except for the m/z column. A generator of the same spectra if lazy is True.
     
     See Also
     --------
@@ -30,24 +38,62 @@ def export_to_spectra(df, mzcol = 0):
     
     import matchms
     
-    df.rename(columns = {df.columns[mzcol]: 'mean'}, inplace = True)
+    speclist = (matchms.Spectrum(mz = mz, intensities = intensities) for label, mz, intensities in _scan_peaks(df, mzcol))
+    
+    if lazy:
+        return speclist
+  
+    return list(speclist)
+
+
+def _scan_peaks(df, mzcol = 0):
+    
+    """Validates tabular data and returns a generator of (label, mz, intensities) per scan.
+    Peaks are the detected signals of a scan sorted by m/z. The m/z values and intensities
+    of DataFrames are extracted once as NumPy arrays, the input is not modified.
     
-    df = df.sort_values('mean')
+    """
     
-    speclist = []    
+    import numpy as np
+    from DBDIpy.sparse_spectra import SparseSpectra
     
-    for s in range(0,df.shape[1]):
+    if isinstance(df, SparseSpectra):
+        if df.mz is None:
+            raise ValueError("SparseSpectra without m/z values cannot be exported.")
+            
+        order = np.argsort(df.mz, kind = "stable")                             ##sort features by m/z
+        csc = df.intensities[order].tocsc()
+        csc.sort_indices()
         
-        if s == mzcol:                                                         ##skip column with mz values
-            continue
+        return _sparse_peaks(df.mz[order], csc, df.columns)
         
-        spec_s = df.iloc[:,[mzcol,s]].copy()
-        spec_s = spec_s.dropna()
-        spec_s = spec_s.reset_index(drop = True)
+    X = df.to_numpy(dtype = float)                                             ##one copy of the table, caller's df untouched
+    mz = X[:, mzcol]
+    order = np.argsort(mz, kind = "stable")                                    ##sort features by m/z
+    order = order[~np.isnan(mz[order])]                                        ##features without m/z are dropped
+    scans = [s for s in range(X.shape[1]) if s != mzcol % X.shape[1]]          ##skip column with mz values
+    
+    return _dense_peaks(mz[order], X, order, scans, df.columns)
+
+
+def _dense_peaks(mz, X, order, scans, columns):
+    
+    """Yields the non-missing rows in order of every column s in scans of X."""
+    
+    import numpy as np
+    
+    for s in scans:
+        intensities = X[:, s][order]
+        detected = ~np.isnan(intensities)
         
-        spec_s = matchms.Spectrum(mz = spec_s.iloc[:,0].to_numpy(dtype = float), 
-                                  intensities = spec_s.iloc[:,1].to_numpy(dtype = float))
+        yield columns[s], mz[detected], intensities[detected]
+
+
+def _sparse_peaks(mz, csc, columns):
+    
+    """Yields the stored signals of every column of a sorted scipy.sparse.csc_matrix."""
+    
+    for s in range(csc.shape[1]):
+        peaks = slice(csc.indptr[s], csc.indptr[s+1])                          ##stored signals of scan s
         
-        speclist.append(spec_s)
-  
-    return speclist
\ No newline at end of file
+        yield columns[s], mz[csc.indices[peaks]], csc.data[peaks].astype(float)
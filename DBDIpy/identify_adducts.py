@@ -1,4 +1,6 @@
-def identify_adducts(df, masses, custom_adducts = None, method = "spearman", threshold = 0.90, mass_error = 2):
+def identify_adducts(df, masses = None, custom_adducts = None, method = "spearman", threshold = 0.90, mass_error = 2,
+                     search = "mass", block_size = 1024, min_overlap = None, network = False,
+                     recall = 0.99, random_state = None):
     
     """Finds different ion species of a single analyte molecule. 
     Computes pointwise correlation of XIC traces to identify in-source adducts or in-source fragments
@@ -7,15 +9,20 @@ def identify_adducts(df, masses, custom_adducts = None, method = "spearman", thr
     
     Parameters
     ----------    
-    df : pd.DataFrame
+    df : pd.DataFrame or DBDIpy.SparseSpectra
          A DataFrame of equal-length ion traces formated as rows.
          Input DataFrame can be provided by align_spectra() and impute_intensities().
+         SparseSpectra are accepted if every feature was detected in every scan, 
+         or for any detection pattern together with min_overlap. They are converted 
+         to a dense DataFrame first, so memory scales with features x scans as for 
+         DataFrame input.
     
     masses : pd.series 
              A series of m/z values for specification of adduct or fragment types. 
             Use of theoretic masses is strongly recommended for higher precission.
             If theoretic masses are not available, adapt mass_error 
             in accordance to the type of your mass analyzer.
+            May be omitted for SparseSpectra input, then their mean m/z values are used.
         
     adduct_rules : pd.DataFrame, optional
                   The function searches for 1-Oxygen and 2-Oxygen adducts 
@@ -33,10 +40,53 @@ def identify_adducts(df, masses, custom_adducts = None, method = "spearman", thr
     mass_error : int or float
                  Tolerance of the mass spectrometer in ppm. Default is 2 ppm. 
     
+    search : str, {"mass", "correlation"}, optional
+             Order of the two search criteria. "mass" (default) first lists all pairs of 
+             features whose mass difference matches an adduct rule by np.searchsorted on 
+             sorted m/z values and correlates only these candidate pairs. Memory and runtime 
+             scale with the number of candidates instead of the squared number of features.
+             "correlation" correlates all features first and filters pairs by mass difference 
+             afterwards. Both return the same pairs.
+             "approximate" hashes the ranked and normalized XIC by the signs of random 
+             projections and verifies only features sharing a hash bucket exactly. Pairs 
+             above threshold are found with probability of at least recall, so adduct search 
+             scales to tables where all pairs cannot be correlated.
+    
+    block_size : int, optional
+                 Number of XIC correlated per tile with search = "correlation". Only coefficients 
+                 above threshold are kept from every tile, so memory is bounded by block_size x N 
+                 plus the number of hits instead of N x N. Default is 1024.
+    
+    min_overlap : int, optional
+                  Enables correlation of XIC containing nan, e.g. aligned but not imputed data. 
+                  Coefficients are computed over the scans detected in both XIC only and pairs 
+                  sharing fewer than min_overlap scans are dismissed. Available for "pearson" 
+                  and "kendall"; Spearman ranks would depend on the scans shared by every pair, 
+                  so method = "spearman" raises a ValueError for input with missing values. 
+                  Default is None, which requires imputed input without missing values.
+    
+    network : bool, optional
+              Return the results as DBDIpy.AdductNetwork with features as nodes and annotated 
+              pairs as edges, e.g. to group the ion species of one compound by connected 
+              components. The dictionary of DataFrames is kept as its adducts attribute. 
+              Default is False.
+    
+    recall : float, optional
+             Minimal probability to find a pair correlated by threshold with 
+             search = "approximate". Higher recall hashes more bands and verifies more 
+             candidates. The achieved recall is reported in the attrs["recall"] of every 
+             result DataFrame. Default is 0.99.
+    
+    random_state : int or np.random.Generator, optional
+                   Seed of the random projections with search = "approximate".
+    
     Returns
     -------
     A dictionary of DataFrames containing pairwise information about correlation of XIC traces and 
     putatively identified in-source adducts or in-source fragments.
+    Every pair of features is listed once with the lighter feature as base: base_index gives its
+    position in df, match_index the label of the heavier correlation partner.
+    A DBDIpy.AdductNetwork if network is True.
     
     
     Raises
@@ -50,26 +100,56 @@ def identify_adducts(df, masses, custom_adducts = None, method = "spearman", thr
     
     """
 #%%library import 
+    import numpy as np
     import pandas as pd
-    from tqdm import tqdm
+    from DBDIpy.adduct_network import AdductNetwork
+    from DBDIpy.annotation_index import AnnotationIndex
+    from DBDIpy.sparse_spectra import SparseSpectra
     
 #%%check if user imput is valid
     
+    if isinstance(df, SparseSpectra):
+        if masses is None and df.mz is not None:
+            masses = pd.Series(df.mz, index = df.index)
+        df = df.to_frame(mzcol = None)                                                   ##correlation works on dense XIC
+    
     if not isinstance(df, pd.DataFrame):
         raise TypeError("Argument for df should be of instance pandas.DataFrame.")  
         
-    if df.isnull().values.any():
+    if min_overlap is None and df.isnull().values.any():
         raise ValueError("Input DataFrame contains missing values.")
+        
+    if min_overlap is not None and (isinstance(min_overlap, bool) or not isinstance(min_overlap, int) or min_overlap < 2):
+        raise ValueError("Argument min_overlap should be an integer of at least 2.")
+    
+    if masses is None:
+        raise TypeError("Argument masses is required for DataFrame input.")
     
     if masses.size != df.shape[0]:
         raise ValueError("Incompatible dimensions of mass list and number of XIC.")
         
+    masses = pd.Series(np.asarray(masses, dtype = float), index = df.index)                ##align masses to XIC labels
+        
     if df.shape[1] < 10:
         raise Warning("Low number of scans! Consider providing more scans to improve reliability of correlation results.")
         
-#%%correlation matrix calculation            
-    cormat = df.T.corr(method = method)
-    
+    if method not in ("spearman", "pearson", "kendall"):
+        raise ValueError("Invalid correlation method. Choose from 'spearman', 'pearson' or 'kendall'.")
+        
+    if search not in ("mass", "correlation", "approximate"):
+        raise ValueError("Invalid search mode. Choose from 'mass', 'correlation' or 'approximate'.")
+        
+    if search == "approximate":
+        if method == "kendall":
+            raise ValueError("Approximate search supports 'spearman' or 'pearson' only.")
+        if min_overlap is not None:
+            raise ValueError("Approximate search requires input without missing values.")
+        if isinstance(recall, bool) or not isinstance(recall, (int, float)) or not 0 < recall < 1:
+            raise ValueError("Argument recall should be a number between 0 and 1.")
+        
+    if isinstance(block_size, bool) or not isinstance(block_size, int) or block_size < 1:
+        raise ValueError("Argument block_size should be a positive integer.")
+        
 #%%set up adduct rules   
     massdifflib = pd.DataFrame({'deltamz': [15.994915, 31.98983, 18.010565],
                                  'motive': ["O", "O2", "H2O"]})
@@ -85,37 +165,174 @@ def identify_adducts(df, masses, custom_adducts = None, method = "spearman", thr
          else:
              raise TypeError("Wrong format for custom adduct rules. See documentation for example.")
              
-    massdifflib["mass_upper"] = massdifflib["deltamz"] + massdifflib["deltamz"] * mass_error * 1e-6 
-    massdifflib["mass_lower"] = massdifflib["deltamz"] - massdifflib["deltamz"] * mass_error * 1e-6 
+    rules = AnnotationIndex.from_frame(massdifflib, mass_error = mass_error, unit = "ppm")
 
-#%%refine correlations by mass differences
-    res_internal = pd.DataFrame({"base_mz": [], "base_index": [], "match_mz": [],
-                             "match_index": [], "mzdiff": [],"corr": []})
-     
-    for i in tqdm(range(len(cormat)), desc='progress'):
+#%%correlate candidate pairs of matching mass differences
+    if search == "mass":
+        res_internal = _candidate_pairs(df, masses, rules, method, threshold, min_overlap or 2)
 
-        featnow = cormat.iloc[:,i]                                                      
-        featnow = featnow[(featnow > threshold) & (featnow < 1)]     
-    
-        mzi = masses[i]                                        
-        mz_matches = masses[featnow.index]                          
-        mz_diff = abs(mz_matches - mzi)                                            
-    
-    
-        for j in range(len(featnow)):
+#%%refine correlations by mass differences
+    elif search == "correlation":
+        res_internal = _correlated_pairs(df, masses, method, threshold, block_size, min_overlap or 2)
         
-            res_internal.loc[len(res_internal)] = [masses[i], i, masses[featnow.index[j]],
-                                                   featnow.index[j], mz_diff.values[j],
-                                                   featnow.values[j]]
+#%%verify hashed candidates of likely correlation
+    else:
+        res_internal, achieved = _approximate_pairs(df, masses, rules, method, threshold, recall, random_state)
      
 #%%extract different adduct types to lists
+    pair, rule = rules.lookup(res_internal["mzdiff"].to_numpy())
+    
+    srt = np.argsort(rule, kind = "stable")                                                  ##group matched pairs by rule
+    pair, rule = pair[srt], rule[srt]
+    bounds = np.searchsorted(rule, np.arange(rules.n_rules + 1))
+    
     reslist = {}   
 
     for a in range(massdifflib.shape[0]):
         
-        dfnow = res_internal.loc[(res_internal["mzdiff"] >= massdifflib.loc[a, "mass_lower"]) &
-                                 (res_internal["mzdiff"] <= massdifflib.loc[a, "mass_upper"])]
+        reslist[massdifflib.loc[a, "motive"]] = res_internal.iloc[pair[bounds[a]:bounds[a + 1]]]
         
-        reslist[massdifflib.loc[a, "motive"]] = dfnow
+        if search == "approximate":
+            reslist[massdifflib.loc[a, "motive"]].attrs["recall"] = achieved
+    
+    if network:
+        return AdductNetwork.from_adducts(reslist, df.index)
         
     return reslist
+
+
+def _correlated_pairs(df, masses, method, threshold, block_size, min_overlap = 2):
+    
+    """Search of identify_adducts() over all pairs of features.
+    Pairs above threshold are extracted tile by tile from the upper triangle of the correlation matrix.
+    
+    """
+    
+    import numpy as np
+    from DBDIpy.correlate_xic import _prepare, _thresholded_pairs
+    
+    if method == "kendall":                                                                  ##no matrix formulation, dense pandas path
+        C = df.T.corr(method = method, min_periods = min_overlap).to_numpy()
+        i, j = np.nonzero(np.triu(C > threshold, k = 1))
+        corr = C[i, j]
+    else:
+        Z, M = _prepare(df.to_numpy(), method)
+        i, j, corr = _thresholded_pairs(Z, threshold, block_size, M, min_overlap)
+    
+    keep = corr < 1
+    
+    return _pair_frame(masses, i[keep], j[keep], corr[keep])
+
+
+def _approximate_pairs(df, masses, rules, method, threshold, recall = 0.99, random_state = None):
+    
+    """Search of identify_adducts() over candidate pairs from random-hyperplane hashing.
+    Candidates matching no adduct rule are dismissed before the exact correlation. Returns 
+    the pairs above threshold in the layout of _correlated_pairs() and the recall expected 
+    for pairs correlated by threshold.
+    
+    """
+    
+    import numpy as np
+    from DBDIpy.correlate_xic import _normalize, _lsh_pairs, _corr_pairs
+    
+    Z = _normalize(df.to_numpy(), method)
+    i, j, achieved = _lsh_pairs(Z, threshold, recall, random_state = random_state)
+    
+    mz = masses.to_numpy()
+    matched = np.unique(rules.lookup(np.abs(mz[j] - mz[i]))[0])
+    i, j = i[matched], j[matched]
+    
+    corr = _corr_pairs(Z, None, i, j)
+    keep = (corr > threshold) & (corr < 1)
+    
+    return _pair_frame(masses, i[keep], j[keep], corr[keep]), achieved
+
+
+def _candidate_pairs(df, masses, rules, method, threshold, min_overlap = 2):
+    
+    """Correlates only pairs of features whose mass difference falls into an adduct rule window.
+    Returns the pairs above threshold in the layout and order of _correlated_pairs().
+    
+    """
+    
+    import numpy as np
+    
+    mz = masses.to_numpy()
+    order = np.argsort(mz, kind = "stable")
+    mz_sorted = mz[order]
+    eps = 1e-9 * max(1.0, np.abs(mz).max(initial = 0.0))                                  ##widen windows by rounding error, exact filter follows
+    
+    ##merge overlapping rule windows, mass differences are positive
+    windows = np.sort(np.column_stack([np.abs(rules.lower), np.abs(rules.upper)]), axis = 1)
+    windows = windows[np.argsort(windows[:, 0], kind = "stable")]
+    merged = []
+    for lower, upper in windows:
+        if merged and lower <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], upper)
+        else:
+            merged.append([lower, upper])
+    
+    ##list candidate pairs per window, lighter feature first
+    pairs = []
+    for lower, upper in merged:
+        lo = np.searchsorted(mz_sorted, mz_sorted + lower - eps, side = "left")
+        hi = np.searchsorted(mz_sorted, mz_sorted + upper + eps, side = "right")
+        n = hi - lo
+        base = np.repeat(np.arange(mz.size), n)
+        match = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n) + np.repeat(lo, n)   ##offsets within each window
+        pairs.append(np.column_stack([order[base], order[match]]))
+        
+    pairs = np.concatenate(pairs) if pairs else np.empty((0, 2), dtype = np.int64)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    pairs = np.unique(np.sort(pairs, axis = 1), axis = 0)
+    
+    ##correlate candidate pairs and keep those above threshold
+    corr = _pair_corr(df.to_numpy(dtype = np.float64), pairs[:, 0], pairs[:, 1], method, min_overlap)
+    keep = (corr > threshold) & (corr < 1)
+    
+    return _pair_frame(masses, pairs[keep, 0], pairs[keep, 1], corr[keep])
+
+
+def _pair_frame(masses, i, j, corr):
+    
+    """Builds the result table of identify_adducts() from positional pairs (i, j) with i < j.
+    Every pair is reported once with the lighter feature as base, sorted by base and match position.
+    
+    """
+    
+    import numpy as np
+    import pandas as pd
+    
+    mz = masses.to_numpy()
+    swap = mz[i] > mz[j]
+    base, match = np.where(swap, j, i), np.where(swap, i, j)
+    srt = np.lexsort((match, base))
+    base, match, corr = base[srt], match[srt], np.asarray(corr)[srt]
+    
+    res_internal = pd.DataFrame({"base_mz": mz[base], "base_index": base.astype(np.int64), 
+                                 "match_mz": mz[match], "match_index": masses.index[match], 
+                                 "mzdiff": mz[match] - mz[base], "corr": corr})
+    
+    return res_internal
+
+
+def _pair_corr(X, i, j, method, min_overlap = 2):
+    
+    """Correlation coefficients between rows i and j of X for a list of row pairs."""
+    
+    import numpy as np
+    from DBDIpy.correlate_xic import _prepare, _corr_pairs
+    
+    if method == "kendall":
+        from scipy.stats import kendalltau
+        corr = np.full(len(i), np.nan)
+        for k, (a, b) in enumerate(zip(i, j)):
+            common = ~np.isnan(X[a]) & ~np.isnan(X[b])
+            if common.sum() >= min_overlap:
+                corr[k] = kendalltau(X[a, common], X[b, common])[0]
+        return corr
+    
+    Z, M = _prepare(X, method)
+    
+    return _corr_pairs(Z, M, i, j, min_overlap)
@@ -1,4 +1,5 @@
-def impute_intensities(df, method = "linear"):
+def impute_intensities(df, method = "linear", engine = "numpy", random_state = None, n_jobs = 1, chunk_size = 1000,
+                       dtype = None):
     
     """Fills nan values in data tables.
     Imputes NaN values contained in a DataFrame consisting of aligned mass spectra.
@@ -13,9 +14,11 @@ def impute_intensities(df, method = "linear"):
     
     Parameters
     ----------    
-    df : pd.DataFrame 
+    df : pd.DataFrame or DBDIpy.SparseSpectra
          A DataFrame containing missing (NaN) values to be imputed.
          Input DataFrame can be provided by align_spectra().
+         SparseSpectra are converted to a dense DataFrame first (absent entries become NaN), 
+         so memory scales with features x scans as for DataFrame input.
     
     method : str
             Intepolation method to be used; default is "linear". 
@@ -24,6 +27,31 @@ def impute_intensities(df, method = "linear"):
                 "quadratic", "cubic", "barycentric", "zero",
                 "krogh", "from_derivatives"
     
+    engine : str, {"numpy", "pandas"}, optional
+             Imputation backend. "numpy" (default) imputes the whole table as one 
+             two-dimensional array: first and last detected scans are located per row, 
+             gaps are filled by linear interpolation via cumulative indexing and the 
+             baseline noise is drawn in one vectorized call. Methods other than "linear", 
+             "index" and "pad" interpolate row-wise within the detected region only.
+             "pandas" is the original row-by-row implementation.
+    
+    random_state : None, int, np.random.SeedSequence or np.random.Generator, optional
+                   Seed for the baseline noise. Pass an integer to obtain reproducible results.
+                   Default is None, which draws fresh entropy from the operating system.
+    
+    n_jobs : int, optional
+             Number of worker processes for the "numpy" engine. -1 uses all available cores. 
+             Default is 1.
+    
+    chunk_size : int, optional
+                 Number of rows imputed per block by the "numpy" engine. Every block draws its 
+                 baseline noise from an independent stream spawned from random_state, so results 
+                 for a given seed and chunk_size are identical for any n_jobs. Default is 1000.
+    
+    dtype : str, {"float64", "float32"} or None, optional
+            Data type of the returned intensities. Default is None, which keeps float32 input 
+            as float32 and returns float64 otherwise.
+    
     Returns
     -------
     A DataFrame of equal length ion intensity series without NaN.
@@ -36,13 +64,16 @@ def impute_intensities(df, method = "linear"):
     
     """
     
-    import math
-    from tqdm import tqdm
-    import random
+    import os
+    import numpy as np
     import pandas as pd
     import warnings
+    from DBDIpy.sparse_spectra import SparseSpectra
     
     ##check if user imput is valid
+    if isinstance(df, SparseSpectra):
+        df = df.to_frame(mzcol = None)                                                   ##imputation fills the gaps, result is dense
+        
     if not isinstance(df, pd.DataFrame):
         raise TypeError('Argument for df should be of instance pandas.DataFrame.')
         
@@ -54,15 +85,145 @@ def impute_intensities(df, method = "linear"):
     if 'mean' in df.columns:
         warnings.warn("Possible bad composition of input. Check if DataFrames only is composed if XIC")
         
+    if isinstance(n_jobs, bool) or not isinstance(n_jobs, int) or n_jobs == 0 or n_jobs < -1:
+        raise ValueError("Argument n_jobs should be a positive integer or -1.")
+        
+    if isinstance(chunk_size, bool) or not isinstance(chunk_size, int) or chunk_size < 1:
+        raise ValueError("Argument chunk_size should be a positive integer.")
+        
+    if dtype is None:
+        dtype = np.float32 if (df.dtypes == np.float32).all() and df.shape[1] > 0 else np.float64
+        
+    if np.dtype(dtype) not in (np.float32, np.float64):
+        raise ValueError("Invalid dtype. Choose from 'float32' or 'float64'.")
+        
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+        
+    seed = _seed_sequence(random_state)
+        
+    if engine == "numpy":
+        return _impute_numpy(df, method, seed, n_jobs, chunk_size, dtype)
+    
+    if engine == "pandas":
+        return _impute_pandas(df, method, seed, dtype)
+    
+    raise ValueError("Invalid imputation engine. Choose from 'numpy' or 'pandas'.")
+
+
+def _seed_sequence(random_state):
+    
+    """Converts random_state to a np.random.SeedSequence for spawning independent streams."""
+    
+    import numpy as np
+    
+    if isinstance(random_state, np.random.Generator):
+        return random_state.bit_generator.seed_seq.spawn(1)[0]
+    
+    if isinstance(random_state, np.random.SeedSequence):
+        return random_state
+    
+    if random_state is None or (isinstance(random_state, int) and not isinstance(random_state, bool)):
+        return np.random.SeedSequence(random_state)
+    
+    raise TypeError("Argument random_state should be None, an integer, a SeedSequence or a Generator.")
+
+
+def _impute_numpy(df, method, seed, n_jobs, chunk_size, dtype = "float64"):
+    
+    """Vectorized imputation engine of impute_intensities().
+    Rows are imputed in blocks of chunk_size, each with its own spawned seed stream, 
+    optionally distributed over a process pool.
+    
+    """
+    
+    import numpy as np
+    import pandas as pd
+    from concurrent.futures import ProcessPoolExecutor
+    
+    X = df.to_numpy(dtype = dtype)
+    starts = range(0, X.shape[0], chunk_size)
+    chunks = [X[i:i + chunk_size] for i in starts]
+    seeds = seed.spawn(len(chunks))
+    
+    if n_jobs > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers = n_jobs) as pool:
+            res = list(pool.map(_impute_block, chunks, [method] * len(chunks), seeds))
+    else:
+        res = [_impute_block(c, method, sd) for c, sd in zip(chunks, seeds)]
+    
+    X = np.concatenate(res) if res else X.copy()
+    
+    return pd.DataFrame(X, index = df.index, columns = df.columns)
+
+
+def _impute_block(X, method, seed):
+    
+    """Imputes a block of rows of a two-dimensional array."""
+    
+    import warnings
+    import numpy as np
+    import pandas as pd
+    
+    X = X.copy()
+    n_scans = X.shape[1]
+    cols = np.arange(n_scans)
+    detected = ~np.isnan(X)
+    
+    ##part 1: filling NaN within data region
+    prev = np.maximum.accumulate(np.where(detected, cols, -1), axis = 1)                      ##last detected scan up to j
+    nxt = np.minimum.accumulate(np.where(detected, cols, n_scans)[:, ::-1], axis = 1)[:, ::-1] ##next detected scan from j
+    inside = ~detected & (prev >= 0) & (nxt < n_scans)
+    
+    if method in ("linear", "index"):
+        r, c = np.nonzero(inside)
+        p, q = prev[r, c], nxt[r, c]
+        X[r, c] = X[r, p] + (X[r, q] - X[r, p]) * (c - p) / (q - p)
+    elif method == "pad":
+        r, c = np.nonzero(inside)
+        X[r, c] = X[r, prev[r, c]]                                                           ##carry last detected value forward
+    else:
+        first = np.argmax(detected, axis = 1)
+        last = n_scans - 1 - np.argmax(detected[:, ::-1], axis = 1)
+        for i in np.flatnonzero(inside.any(axis = 1)):
+            datareg = pd.Series(X[i, first[i]:last[i] + 1]).interpolate(method = method)
+            X[i, first[i]:last[i] + 1] = datareg.to_numpy()
+    
+    ##part 2: adding a baseline of +-1 % around the row minimum
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)                                    ##rows without any signal stay NaN
+        s_min = np.nanmin(X, axis = 1)
+        
+    r, c = np.nonzero(np.isnan(X))
+    fill_min = s_min[r] - s_min[r] * 0.01
+    fill_max = s_min[r] + s_min[r] * 0.01
+    rng = np.random.default_rng(seed)
+    X[r, c] = np.round(fill_min + (fill_max - fill_min) * rng.random(r.size), 2)
+    
+    return X
+
+
+def _impute_pandas(df, method, seed, dtype = "float64"):
+    
+    """Original row-by-row implementation of impute_intensities()."""
+    
+    import math
+    from tqdm import tqdm
+    import numpy as np
+    import pandas as pd
+    
+    rng = np.random.default_rng(seed)
+    
     ##define function for addition of a baseline 
     def baselinefill():
         s_min = v.min()
         fill_min = s_min - s_min * 0.01
         fill_max = s_min + s_min * 0.01  
-        return round(random.uniform(fill_min, fill_max),2)
+        return round(fill_min + (fill_max - fill_min) * rng.random(),2)
     
     ##fill the DataFrame row by row
-    for i, v in tqdm(df.iterrows(), desc='progress'):                  
+    rows = []
+    for i, v in tqdm(df.astype(np.float64).iterrows(), desc='progress'):                  
         ##part 1: filling NaN within data region
         vnotNA = v.notna()                                           
         vnotNA[::1].idxmax()                                         
@@ -73,8 +234,8 @@ def impute_intensities(df, method = "linear"):
         v[vnotNA[::1].idxmax():vnotNA[::-1].idxmax()] = datareg     
         ##part : adding a baseline
         v[v.isna()] = v[v.isna()].apply(lambda x: baselinefill() if math.isnan(x) else x)
-    
-    ##fix all dtypes to float64    
-    df = df.apply(lambda col:pd.to_numeric(col, errors = 'coerce'))
+        rows.append(v)
+        
+    df = pd.DataFrame(rows, index = df.index, columns = df.columns).astype(dtype)
 
     return df
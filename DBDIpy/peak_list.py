@@ -0,0 +1,114 @@
+import numpy as np
+
+
+class PeakList:
+
+    """Peak lists of many scans in one set of arrays.
+    The m/z values and intensities of all scans are concatenated into two flat arrays and
+    scan s holds the peaks offsets[s]:offsets[s+1], as in the CSR layout of scipy.sparse.
+    Scans are views into these arrays, so no object is allocated per scan or peak.
+    DBDIpy.read_mgf() returns a PeakList and align_spectra() and SpectraAligner accept it
+    in place of a list of matchms.Spectrum.
+
+    Parameters
+    ----------
+    mz : array-like
+         m/z values of all peaks, scan after scan.
+
+    intensities : array-like
+                  Intensities of all peaks in the order of mz.
+
+    offsets : array-like of int
+              Start of every scan in mz and intensities followed by the total number of peaks.
+
+    titles : list, optional
+             Title of every scan, e.g. from the TITLE lines of a .mgf-file.
+
+    Examples
+    --------
+    >>> peaks = read_mgf("example_dataset.mgf")
+    >>> specs_aligned = align_spectra(peaks)
+
+    See Also
+    --------
+    DBDIpy.read_mgf() : Reads a PeakList from a .mgf-file.
+
+    """
+
+    def __init__(self, mz, intensities, offsets, titles = None):
+
+        self.mz = np.asarray(mz, dtype = np.float64).ravel()
+        self.intensities = np.asarray(intensities, dtype = np.float64).ravel()
+        self.offsets = np.asarray(offsets, dtype = np.int64).ravel()
+
+        if self.mz.size != self.intensities.size:
+            raise ValueError("Incompatible dimensions of m/z values and intensities.")
+
+        if (self.offsets.size == 0 or self.offsets[0] != 0 or self.offsets[-1] != self.mz.size
+                or np.any(np.diff(self.offsets) < 0)):
+            raise ValueError("Offsets should increase from 0 to the number of peaks.")
+
+        self.titles = list(titles) if titles is not None else [None] * self.n_scans
+
+        if len(self.titles) != self.n_scans:
+            raise ValueError("Incompatible dimensions of titles and number of scans.")
+
+    def __repr__(self):
+        return f"PeakList({self.n_scans} scans, {self.n_peaks} peaks)"
+
+    def __len__(self):
+        return self.n_scans
+
+    def __iter__(self):
+        for s in range(self.n_scans):
+            yield self.scan(s)
+
+    @property
+    def n_scans(self):
+        """Number of scans."""
+        return self.offsets.size - 1
+
+    @property
+    def n_peaks(self):
+        """Total number of peaks."""
+        return self.mz.size
+
+    def scan(self, s):
+
+        """Views of the m/z values and intensities of scan s."""
+
+        peaks = slice(self.offsets[s], self.offsets[s + 1])
+
+        return self.mz[peaks], self.intensities[peaks]
+
+    @classmethod
+    def from_spectra(cls, spectra):
+
+        """Builds a PeakList from an iterable of matchms.Spectrum."""
+
+        mz, intensities, titles = [], [], []
+        for spectrum in spectra:
+            mz.append(np.asarray(spectrum.peaks.mz, dtype = np.float64))
+            intensities.append(np.asarray(spectrum.peaks.intensities, dtype = np.float64))
+            titles.append(spectrum.get("title"))
+
+        offsets = np.concatenate([[0], np.cumsum([m.size for m in mz], dtype = np.int64)])
+        concat = lambda x: np.concatenate(x) if x else np.empty(0)
+
+        return cls(concat(mz), concat(intensities), offsets, titles = titles)
+
+    def to_spectra(self):
+
+        """List of matchms.Spectrum with peaks sorted by m/z and titles as metadata."""
+
+        import matchms
+
+        speclist = []
+        for s in range(self.n_scans):
+            mz, intensities = self.scan(s)
+            order = np.argsort(mz, kind = "stable")
+            metadata = {} if self.titles[s] is None else {"title": self.titles[s]}
+            speclist.append(matchms.Spectrum(mz = mz[order], intensities = intensities[order],
+                                             metadata = metadata, metadata_harmonization = False))
+
+        return speclist
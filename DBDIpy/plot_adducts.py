@@ -38,6 +38,7 @@ def plot_adducts(IDs, df, metadata = None, transform = False):
     import matplotlib.pyplot as plt
     import numpy as np
     import pandas as pd
+    from DBDIpy.correlate_xic import correlate_xic
         
     if not isinstance(IDs, list):
         raise TypeError("Argument ID should be a list of IDs.")
@@ -53,7 +54,7 @@ def plot_adducts(IDs, df, metadata = None, transform = False):
     dfp = dfp.reset_index(drop = True) 
     
     ##for plotting information: calculate correlation between features
-    quickcorr = dfp.corr()                              
+    quickcorr = correlate_xic(df.iloc[IDs,:], method = "pearson")
     quickcorr = quickcorr.iloc[0,:]
     quickcorr = quickcorr.round(decimals = 3).astype(str)
     quickcorr = "- R2 = " + quickcorr
@@ -1,5 +1,5 @@
 def propose_adducts(ID, df, masses, method = "pearson", threshold = 0.90, mass_error = 0.005,
-                    custom_adducts = None):
+                    custom_adducts = None, block_size = 1024, min_overlap = None):
     
     """Suggests highly correlated mass traces for an input XIC without prior knowledge of identity. 
     An untargeted approach of searching for adducts and in-source fragments in a dataset. 
@@ -9,12 +9,16 @@ def propose_adducts(ID, df, masses, method = "pearson", threshold = 0.90, mass_e
      
     Parameters
     ----------    
-    ID : integer
+    ID : integer, list of integers, np.ndarray or "all"
          The index of the input feature to suggest potential adducts for.
+         Several positions, or "all" for an untargeted screen of the whole table, 
+         are correlated block-wise with one matrix product per block_size features.
     
-    df : pd.DataFrame
+    df : pd.DataFrame or DBDIpy.CorrelationIndex
         A two-dimensional DataFrame containing aligned mass spectrometric features
         e.g. generated by align_spectra() to perform adduct proposal.
+        A CorrelationIndex built once from the DataFrame answers repeated queries 
+        from its cache of correlation rows; its method has to match method.
         
     masses : pd.series 
             A series of m/z values for specification of adduct or fragment types. 
@@ -28,19 +32,38 @@ def propose_adducts(ID, df, masses, method = "pearson", threshold = 0.90, mass_e
     threshold : float
                 Correlation treshold to associate two XIC. Default is 0.9.
                
-    mass_error : int or float
+    mass_error : float
                  Tolerance of the mass spectrometer in Da. Default is 0.005 Da.
-                 Is used to suggest potential annotations for the candidate.
+                 Is used to suggest potential annotations for the candidate: a mass difference
+                 is annotated if it lies within mass_error of a reference mass difference,
+                 bounds included. Differences matching several references list all of them
+                 separated by "; " in the order of the references, custom_adducts last.
+                 DBDIpy versions <= 1.2 ignored mass_error for annotation and matched by
+                 np.isclose() with its default tolerances (about 1e-5 relative, i.e. ~0.2 mDa
+                 at 18 Da) and kept only the last matching reference.
                  
     custom_adducts : pd.DataFrame
                      A pandas DataFrame of structure pd.DataFrame({'mass_diff': [m1, m2, m3, ...],
                                                                    'annotation': ["ann1", "ann2", "ann3", ...]})
                      that permits the user to search for adducts relevant on their platform.
     
+    block_size : int, optional
+                 Number of queried features correlated per matrix product. Default is 1024.
+    
+    min_overlap : int, optional
+                  Enables correlation of XIC containing nan, e.g. aligned but not imputed data. 
+                  Coefficients are computed over the scans detected in both XIC only and pairs 
+                  sharing fewer than min_overlap scans are dismissed. Available for "pearson" 
+                  and "kendall"; method = "spearman" raises a ValueError for input with missing 
+                  values as in identify_adducts(). 
+                  Default is None, which requires input without missing values.
+    
     Returns
     -------
     Output is a pd.DataFrame containing XIC IDs, correlation coefficients,
     mass difference of correlated ion traces and potential anotation of these. 
+    For several IDs, the results are returned in long format with an additional 
+    first column "ID" holding the position of the queried feature.
     
     See Also
     --------
@@ -52,12 +75,17 @@ def propose_adducts(ID, df, masses, method = "pearson", threshold = 0.90, mass_e
     
     import numpy as np
     import pandas as pd
+    from DBDIpy.annotation_index import AnnotationIndex
+    from DBDIpy.correlate_xic import _prepare, _corr_block
+    from DBDIpy.correlation_index import CorrelationIndex
     
    
 #%%check if user imput is valid
         
-    if not isinstance(ID, int):
-        raise TypeError("Argument ID should be an integer.")
+    batch = not isinstance(ID, (int, np.integer)) or isinstance(ID, bool)                 ##e.g. np.int64 from df.index
+    
+    if batch and not (isinstance(ID, (list, tuple, np.ndarray)) or (isinstance(ID, str) and ID == "all")):
+        raise TypeError("Argument ID should be an integer, a list of integers or 'all'.")
         
     if not isinstance(threshold, float):
         raise TypeError("Invalid input for arggument treshold.")
@@ -65,15 +93,40 @@ def propose_adducts(ID, df, masses, method = "pearson", threshold = 0.90, mass_e
     if not isinstance(mass_error, float):
         raise TypeError("Invalid input for arggument mass_error.")
         
-    if not isinstance(df, pd.DataFrame):
+    if not isinstance(df, (pd.DataFrame, CorrelationIndex)):
         raise TypeError("Argument df should of instance pd.DataFrame.")  
         
-    if df.isnull().values.any():
-        raise ValueError("Input DataFrame contains missing values.")
+    if method not in ("spearman", "pearson", "kendall"):
+        raise ValueError("Invalid correlation method. Choose from 'spearman', 'pearson' or 'kendall'.")
+        
+    if isinstance(df, CorrelationIndex) and df.method != method:
+        raise ValueError(f"CorrelationIndex was built for method '{df.method}'.")
         
-    if ID is None:
+    if isinstance(df, pd.DataFrame) and min_overlap is None and df.isnull().values.any():
         raise ValueError("Input DataFrame contains missing values.")
         
+    if min_overlap is not None and (isinstance(min_overlap, bool) or not isinstance(min_overlap, int) or min_overlap < 2):
+        raise ValueError("Argument min_overlap should be an integer of at least 2.")
+        
+    if isinstance(block_size, bool) or not isinstance(block_size, int) or block_size < 1:
+        raise ValueError("Argument block_size should be a positive integer.")
+        
+    n_feat = len(df) if isinstance(df, CorrelationIndex) else df.shape[0]
+    labels = df.index
+    
+    if len(masses) != n_feat:
+        raise ValueError("Incompatible dimensions of mass list and number of XIC.")
+        
+    IDs = np.arange(n_feat) if isinstance(ID, str) else np.atleast_1d(np.asarray(ID))
+    
+    if IDs.size > 0 and not np.issubdtype(IDs.dtype, np.integer):
+        raise TypeError("Argument ID should be an integer, a list of integers or 'all'.")
+        
+    IDs = IDs.astype(np.int64)
+    if np.any((IDs < -n_feat) | (IDs >= n_feat)):
+        raise IndexError("Argument ID is out of range of the feature table.")
+    IDs = IDs % max(n_feat, 1)
+        
   
 #%% define lookup df with potential annotations
           
@@ -86,31 +139,47 @@ def propose_adducts(ID, df, masses, method = "pearson", threshold = 0.90, mass_e
         annotations = pd.concat([annotations, custom_adducts])
         annotations = annotations.reset_index(drop=True)
         
-#%% setup results df and correlation matrix calculation  
-          
-    res = pd.DataFrame({'match_IDs': [],
-                        'cor': [],
-                        'mass_diff': [],
-                        'annotation': []})
-     
-    cormat = df.T.corr(method = method)
+#%% correlate queried features block-wise and identify highly correlated features
+    
+    if isinstance(df, CorrelationIndex):                                                     ##cached rows of the index
+        rows_of = lambda q: df.rows(q).to_numpy().copy()
+    elif method == "kendall":                                                                ##no matrix formulation
+        cormat = df.T.corr(method = method, min_periods = min_overlap or 1).to_numpy()
+        rows_of = lambda q: cormat[q].copy()
+    else:                                                                                    ##only the queried rows of the matrix
+        Z, M = _prepare(df.to_numpy(), method)
+        rows_of = lambda q: _corr_block(Z, M, q, min_overlap = min_overlap or 2)
+        
+    base, match, cor = [], [], []
+    for start in range(0, IDs.size, block_size):
+        q = IDs[start:start + block_size]
+        block = rows_of(q)
+        block[np.arange(q.size), q] = np.nan                                                 ##never propose a feature itself
+        r, c = np.nonzero((block >= threshold) & (block < 1))
+        base.append(q[r])
+        match.append(c)
+        cor.append(block[r, c])
+        
+    base = np.concatenate(base) if base else np.empty(0, dtype = np.int64)
+    match = np.concatenate(match) if match else np.empty(0, dtype = np.int64)
+    cor = np.concatenate(cor).astype(np.float64) if cor else np.empty(0)
+    
+#%% annotate mass differences by interval lookup in the sorted reference mass differences
     
-#%% identify highly correlated features
-
-    featnow = cormat.iloc[:,ID]
-    featnow = featnow[featnow >= threshold] 
-    featnow = featnow[featnow < 1]       
-    res["match_IDs"] = featnow.index
-    res["cor"] = featnow.values
+    mz = np.asarray(masses, dtype = float)
+    mass_diff = np.abs(mz[match] - mz[base])
     
-    massnow = masses[ID]
-    featmasses = masses[featnow.index]
-    featmassdiff = abs(featmasses - massnow)
-    res["mass_diff"] = featmassdiff.values
+    rules = AnnotationIndex.from_frame(annotations, mzcol = "mass_diff", labelcol = "annotation", 
+                                       mass_error = mass_error, unit = "Da")
+    annotation = rules.annotate(mass_diff)
     
-    for a in range(len(annotations)):
-       idsi = res[(np.isclose(res["mass_diff"], annotations.loc[a, "mass_diff"]))]
-       res.loc[idsi.index, "annotation"] = annotations.loc[a, "annotation"]
+    res = pd.DataFrame({'ID': base,
+                        'match_IDs': labels[match],
+                        'cor': cor,
+                        'mass_diff': mass_diff,
+                        'annotation': pd.Series(annotation, dtype = object)})
     
+    if not batch:
+        res = res.drop('ID', axis = 1)
   
     return res
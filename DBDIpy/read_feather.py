@@ -0,0 +1,153 @@
+def read_feather(path, columns = None, rows = None, metadata = False, memory_map = True):
+
+    """Reads an aligned feature table from a Feather (Arrow IPC) file.
+    The file is memory-mapped and only the requested columns and rows are loaded. Numeric
+    columns of uncompressed files without missing values in the Arrow sense, as written
+    by export_to_feather(), are returned as read-only zero-copy views of the mapped file,
+    so that opening a large table is nearly instant and pages are read from disk only
+    when identify_adducts() or plot_adducts() access them.
+
+    Parameters
+    ----------
+    path : str or os.PathLike
+           Name of the file to read, e.g. written by export_to_feather().
+
+    columns : list, optional
+              Labels of the columns to load, e.g. ["mean"] or a subset of scans.
+              Default is None, which loads all columns of the feature table.
+
+    rows : slice or array-like of int, optional
+           Positions of the features to load. Contiguous slices stay zero-copy,
+           other selections are copied. Default is None, which loads all features.
+
+    metadata : bool, optional
+               Also return the metadata columns written by export_to_feather().
+               Default is False.
+
+    memory_map : bool, optional
+                 Memory-map the file instead of reading it into memory first. Default is True.
+
+    Returns
+    -------
+    A pd.DataFrame of the features indexed by column "ID" if present. If metadata is
+    True, a tuple of the feature table and a pd.DataFrame of the metadata with the same index.
+
+    Examples
+    --------
+    >>> specs_imputed, annotation_metadata = read_feather("specs_imputed.feather", metadata = True)
+    >>> mz = read_feather("specs_imputed.feather", columns = ["mean"])
+
+    See Also
+    --------
+    DBDIpy.export_to_feather() : Writes feature tables for memory-mapped import.
+
+    """
+
+    import json
+    import os
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.feather
+
+    path = os.fspath(path)
+    table = None
+    try:
+        with pa.memory_map(path) if memory_map else pa.OSFile(path) as source:
+            schema = pa.ipc.open_file(source).schema
+    except pa.ArrowInvalid:                                                                  ##Feather V1 files, e.g. the demo dataset, are read once
+        table = pyarrow.feather.read_table(path, memory_map = memory_map)
+        schema = table.schema
+    info = (schema.metadata or {}).get(b"dbdipy")
+
+    ##map labels to field names, files of other origin hold the feature table only
+    if info is not None:
+        info = json.loads(info)
+        fields = [f for f in schema.names if f != "ID"]
+        n_columns = len(info["columns"])
+        table_fields = dict(zip([_label(c) for c in info["columns"]], fields[:n_columns]))
+        meta_fields = dict(zip([_label(c) for c in info["metadata"]], fields[n_columns:]))
+        index_name = info["index"]
+    else:
+        table_fields = {f: f for f in schema.names if f != "ID"}
+        meta_fields = {}
+        index_name = "ID" if "ID" in schema.names else None
+
+    if columns is None:
+        columns = list(table_fields)
+
+    if not isinstance(columns, (list, tuple, pd.Index)):
+        raise TypeError("Argument columns should be a list of column labels.")
+
+    missing = [c for c in columns if _label(c) not in table_fields]
+    if missing:
+        raise KeyError(f"Columns {missing} are missing from the feature table.")
+
+    load = [table_fields[_label(c)] for c in columns]
+    if metadata:
+        load += list(meta_fields.values())
+    if "ID" in schema.names:
+        load = ["ID"] + load
+
+    if table is None:
+        table = pyarrow.feather.read_table(path, columns = load, memory_map = memory_map)
+    else:
+        table = table.select(load)
+
+    ##select features, slices are zero-copy
+    if rows is None:
+        positions = slice(0, table.num_rows)
+    elif isinstance(rows, slice):
+        positions = range(table.num_rows)[rows]
+        if positions.step == 1:
+            table = table.slice(positions.start, len(positions))
+            positions = slice(positions.start, positions.stop)
+        else:
+            table = table.take(np.asarray(positions, dtype = np.int64))
+    else:
+        positions = np.asarray(rows)
+        if positions.dtype.kind not in "iu" or positions.ndim != 1:
+            raise TypeError("Argument rows should be a slice or a list of integer positions.")
+        if positions.size and (positions.min() < -table.num_rows or positions.max() >= table.num_rows):
+            raise IndexError(f"Row positions are out of range for {table.num_rows} features.")
+        positions = positions % max(table.num_rows, 1)
+        table = table.take(positions)
+
+    if "ID" in schema.names:
+        index = pd.Index(_column(table, "ID"), name = index_name)
+    else:
+        if isinstance(positions, slice):
+            index = pd.RangeIndex(positions.start, positions.start + table.num_rows)
+        else:
+            index = pd.Index(positions)
+
+    df = pd.DataFrame({c: _column(table, table_fields[_label(c)]) for c in columns},
+                      index = index, columns = list(columns), copy = False)
+
+    if not metadata:
+        return df
+
+    meta = pd.DataFrame({c: _column(table, f) for c, f in meta_fields.items()},
+                        index = index, columns = list(meta_fields), copy = False)
+
+    return df, meta
+
+
+def _label(label):
+
+    """Hashable key of a column label, e.g. 5 and np.int64(5) coincide."""
+
+    import numpy as np
+
+    return label.item() if isinstance(label, np.generic) else label
+
+
+def _column(table, name):
+
+    """NumPy array of a column, a view of the Arrow buffer if possible."""
+
+    column = table.column(name)
+    if column.num_chunks == 1:
+        return column.chunk(0).to_numpy(zero_copy_only = False)
+
+    return column.combine_chunks().to_numpy(zero_copy_only = False)
@@ -0,0 +1,183 @@
+def read_mgf(path, mmap = False):
+
+    """Reads the peak lists of a .mgf-file.
+    Parses MS1 scans given as BEGIN IONS / peak lines / END IONS blocks straight into one
+    array of m/z values and one of intensities plus the offset of every scan, without
+    creating a matchms.Spectrum per scan. The file is processed in chunks of lines: lines
+    are classified by their first byte after leading whitespace in one vectorized pass and
+    the peak lines of a chunk are converted to numbers by a single call of np.fromstring.
+    TITLE lines are kept, other metadata lines are skipped.
+
+    Parameters
+    ----------
+    path : str or os.PathLike
+           Name of the .mgf-file. Files ending with ".gz" are decompressed.
+
+    mmap : bool, optional
+           Memory-map the file instead of reading it into memory first. Temporary arrays
+           of the parser are bounded by the chunk size, not by the size of the file.
+           Default is False.
+
+    Returns
+    -------
+    A DBDIpy.PeakList holding the peaks of every scan in order of the file. It can be
+    passed to align_spectra() in place of a list of matchms.Spectrum.
+
+    Examples
+    --------
+    >>> peaks = read_mgf("example_dataset.mgf")
+    >>> specs_aligned = align_spectra(peaks)
+
+    See Also
+    --------
+    matchms.importing.load_from_mgf() : Import including all metadata.
+    DBDIpy.export_to_mgf() : Writes tabular data to .mgf-files.
+
+    """
+
+    import gzip
+    import mmap as mmap_module
+    import os
+    import numpy as np
+
+    if os.fspath(path).endswith(".gz"):
+        if mmap:
+            raise ValueError("Memory mapping is not available for gzip-compressed files.")
+        with gzip.open(path, "rb") as handle:
+            return _parse_mgf(np.frombuffer(handle.read(), dtype = np.uint8))
+
+    with open(path, "rb") as handle:
+        if not mmap or os.fstat(handle.fileno()).st_size == 0:                               ##empty files cannot be mapped
+            return _parse_mgf(np.frombuffer(handle.read(), dtype = np.uint8))
+
+        mapped = mmap_module.mmap(handle.fileno(), 0, access = mmap_module.ACCESS_READ)
+
+    try:
+        return _parse_mgf(np.frombuffer(mapped, dtype = np.uint8))
+    finally:
+        mapped.close()
+
+
+def _parse_mgf(buf, chunk_size = 1 << 24):
+
+    """PeakList from the bytes buf of a .mgf-file.
+    buf is parsed in chunks of about chunk_size bytes ending at line breaks, so that the
+    temporary arrays of the vectorized parser scale with the chunk and not with the file.
+
+    """
+
+    import numpy as np
+    from DBDIpy.peak_list import PeakList
+
+    titles, counts, values = [], [], []
+    depth = 0                                                                                ##BEGIN IONS minus END IONS before the chunk
+
+    start = 0
+    while start < buf.size:
+        stop = _line_end(buf, start + chunk_size)
+        chunk = buf[start:stop]
+        first_scan = len(titles)
+
+        starts, length, first = _classify_lines(chunk)
+        lines = lambda l: bytes(chunk[starts[l]:starts[l] + length[l]]).strip()
+
+        begin = np.zeros(starts.size, dtype = bool)
+        end = np.zeros(starts.size, dtype = bool)
+        begin[[l for l in np.flatnonzero(first == ord("B")) if lines(l) == b"BEGIN IONS"]] = True
+        end[[l for l in np.flatnonzero(first == ord("E")) if lines(l) == b"END IONS"]] = True
+
+        inside = depth + np.cumsum(begin) - np.cumsum(end) == 1                             ##between BEGIN IONS and END IONS
+        scan = first_scan + np.cumsum(begin) - 1
+        depth += int(begin.sum()) - int(end.sum())
+        peak = inside & (((first >= ord("0")) & (first <= ord("9"))) | np.isin(first, list(b"+-.")))
+
+        ##titles of all scans
+        titles.extend([None] * int(begin.sum()))
+        for l in np.flatnonzero((first == ord("T")) & inside):
+            text = lines(l)
+            if text.startswith(b"TITLE="):
+                titles[scan[l]] = text[6:].decode("utf-8", errors = "replace")
+
+        values.append(_parse_peaks(chunk, peak, length, lines))
+
+        ##peaks per scan, the first scan may continue from the previous chunk
+        c = np.bincount(scan[peak] - first_scan + 1, minlength = len(titles) - first_scan + 1)
+        counts.append((first_scan - 1, c))
+
+        start = stop
+
+    n_peaks = np.zeros(len(titles), dtype = np.int64)
+    for lo, c in counts:
+        if lo < 0:                                                                           ##no scan before the first chunk
+            lo, c = 0, c[1:]
+        n_peaks[lo:lo + c.size] += c
+
+    offsets = np.concatenate([[0], np.cumsum(n_peaks)])
+    values = np.concatenate(values) if values else np.empty(0)
+
+    return PeakList(values[0::2], values[1::2], offsets, titles = titles)
+
+
+def _line_end(buf, pos, window = 1 << 16):
+
+    """Position after the first line break at or behind pos, or the end of buf."""
+
+    import numpy as np
+
+    while pos < buf.size:
+        hit = np.flatnonzero(buf[pos:pos + window] == ord("\n"))
+        if hit.size:
+            return pos + int(hit[0]) + 1
+        pos += window
+
+    return buf.size
+
+
+def _classify_lines(chunk):
+
+    """Start, length and first byte after leading whitespace of every line of chunk."""
+
+    import numpy as np
+
+    newline = np.flatnonzero(chunk == ord("\n"))
+    starts = np.concatenate([[0], newline + 1])
+    length = np.concatenate([newline, [chunk.size]]) - starts
+
+    ##skip leading whitespace, only indented lines are advanced
+    whitespace = np.zeros(256, dtype = bool)
+    whitespace[list(b" \t\r\f\v")] = True
+    pos, stop = starts.copy(), starts + length
+    todo = np.flatnonzero(pos < stop)
+    todo = todo[whitespace[chunk[pos[todo]]]]
+    while todo.size:
+        pos[todo] += 1
+        todo = todo[pos[todo] < stop[todo]]
+        todo = todo[whitespace[chunk[pos[todo]]]]
+
+    first = np.full(starts.size, ord(" "), dtype = np.uint8)                                  ##blank lines
+    text = pos < stop
+    first[text] = chunk[pos[text]]
+
+    return starts, length, first
+
+
+def _parse_peaks(chunk, peak, length, lines):
+
+    """m/z values and intensities of the peak lines of chunk, interleaved."""
+
+    import numpy as np
+
+    ##blank all bytes outside of peak lines and parse the remainder at once
+    keep = np.repeat(peak, length + 1)[:chunk.size]
+    try:
+        values = np.fromstring(np.where(keep, chunk, np.uint8(ord(" "))).tobytes(), sep = " ")
+    except ValueError:                                                                       ##non-numeric columns, e.g. charges
+        values = np.empty(0)
+
+    n_lines = int(peak.sum())
+    if values.size != 2 * n_lines:                                                           ##lines with more columns
+        values = np.array([lines(l).split()[:2] for l in np.flatnonzero(peak)], dtype = np.float64).ravel()
+        if values.size != 2 * n_lines:
+            raise ValueError("Peak lines should hold an m/z value and an intensity.")
+
+    return values
@@ -0,0 +1,292 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+_FORMAT = 2                                                                                  ##bump if the layout of cached files changes
+
+
+class ResultCache:
+
+    """Persistent on-disk cache of alignment and imputation results.
+    Results of align_spectra() and impute_intensities() are stored as uncompressed Feather
+    files keyed by a fingerprint of the input data and all function parameters, so that
+    repeated runs of a pipeline, e.g. sweeps over the parameters of identify_adducts(),
+    load the aligned and imputed tables from disk instead of computing them again.
+    Results of other DBDIpy versions are not reused. If the cache exceeds max_size bytes,
+    the least recently used results are deleted.
+
+    Stored tables are returned as read-only zero-copy views of the memory-mapped file like
+    read_feather(), whether they were just computed or loaded from an earlier run, so the
+    computed table does not stay in memory next to the file. Call .copy() on a result
+    before modifying it in place. Results that are not cached, e.g. of impute_intensities()
+    with random_state = None, are returned as computed.
+
+    Parameters
+    ----------
+    directory : str or os.PathLike
+                Folder holding the cached results. It is created if necessary.
+
+    max_size : int, optional
+               Upper bound of the total size of all cached files in bytes.
+               Default is 2 GB.
+
+    Examples
+    --------
+    >>> cache = ResultCache("dbdipy_cache")
+    >>> specs_aligned = cache.align_spectra(spectrums, ppm_window = 2)
+    >>> specs_imputed = cache.impute_intensities(specs_aligned.drop("mean", axis = 1), random_state = 212)
+
+    See Also
+    --------
+    DBDIpy.align_spectra(), DBDIpy.impute_intensities()
+
+    """
+
+    def __init__(self, directory, max_size = 2 * 1024 ** 3):
+
+        if isinstance(max_size, bool) or not isinstance(max_size, (int, float)) or max_size < 0:
+            raise ValueError("Argument max_size should be a non-negative number of bytes.")
+
+        self.directory = os.fspath(directory)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.directory, exist_ok = True)
+
+        ##sizes of the cached files in order of use, the directory is listed only once
+        entries = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".feather")]
+        self._entries = OrderedDict((path, os.path.getsize(path)) for path in sorted(entries, key = os.path.getmtime))
+        self._size = sum(self._entries.values())
+
+    def __repr__(self):
+        return f"ResultCache('{self.directory}', {len(self)} results, {self.size / 1e6:.1f} MB)"
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        """Total size of all cached results in bytes."""
+        return self._size
+
+    def clear(self):
+
+        """Deletes all cached results."""
+
+        while self._entries:
+            self._remove(next(iter(self._entries)))
+        self.hits = 0
+        self.misses = 0
+
+    def align_spectra(self, spec, **kwargs):
+
+        """Cached DBDIpy.align_spectra().
+        The fingerprint is built scan by scan. Generators of spectra are packed into a
+        DBDIpy.PeakList on the way, which keeps only the peak arrays instead of a list of
+        matchms.Spectrum, and are aligned from it on a cache miss.
+
+        """
+
+        from DBDIpy.align_spectra import align_spectra
+        from DBDIpy.peak_list import PeakList
+
+        if not isinstance(spec, (list, tuple, PeakList)):
+            spec = PeakList.from_spectra(spec)
+
+        return self._cached(align_spectra, spec, _fingerprint_spectra(spec), kwargs)
+
+    def impute_intensities(self, df, **kwargs):
+
+        """Cached DBDIpy.impute_intensities().
+        Results with random_state = None are not reproducible and are computed without caching.
+
+        """
+
+        from DBDIpy.impute_intensities import impute_intensities
+
+        seed = kwargs.get("random_state")
+        if isinstance(seed, bool) or not isinstance(seed, (int, np.integer)):
+            return impute_intensities(df, **kwargs)
+
+        return self._cached(impute_intensities, df, _fingerprint_table(df), kwargs)
+
+    def _cached(self, func, data, fingerprint, kwargs):
+
+        """Loads the result of func(data, **kwargs) from disk or computes and stores it."""
+
+        import inspect
+
+        bound = inspect.signature(func).bind(data, **kwargs)                                 ##explicit and default parameters hash alike
+        bound.apply_defaults()
+        params = {name: repr(value) for name, value in bound.arguments.items()
+                  if name not in ("spec", "df", "n_jobs")}                                  ##worker count does not change the result
+
+        key = [_version(), func.__name__, fingerprint, params]
+        key = hashlib.sha256(json.dumps(key, sort_keys = True).encode()).hexdigest()
+        path = os.path.join(self.directory, key + ".feather")
+
+        if os.path.exists(path):
+            self.hits += 1
+            os.utime(path)                                                                   ##mark as recently used across sessions
+            self._add(path)
+            return _read_result(path)
+
+        self.misses += 1
+        res = func(data, **kwargs)
+
+        if not _write_result(res, path):
+            return res
+
+        self._add(path)
+        self._evict(keep = path)
+
+        return _read_result(path)                                                            ##same read-only view as on a hit
+
+    def _add(self, path):
+
+        """Registers path as most recently used result, e.g. after writing it."""
+
+        self._size -= self._entries.pop(path, 0)
+        self._entries[path] = os.path.getsize(path)
+        self._size += self._entries[path]
+
+    def _remove(self, path):
+
+        """Deletes a cached result, which may have been deleted by another process already."""
+
+        self._size -= self._entries.pop(path)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self, keep = None):
+
+        """Deletes least recently used results until the cache fits into max_size."""
+
+        for path in list(self._entries):
+            if self._size <= self.max_size:
+                break
+            if path != keep:
+                self._remove(path)
+
+
+def _version():
+
+    """Version of DBDIpy and of the cache format, part of every key."""
+
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return [version("DBDIpy"), _FORMAT]
+    except PackageNotFoundError:
+        return [None, _FORMAT]
+
+
+def _fingerprint_spectra(spec):
+
+    """SHA-256 of the peaks of a list of matchms.Spectrum or a DBDIpy.PeakList."""
+
+    from DBDIpy.peak_list import PeakList
+
+    sha = hashlib.sha256()
+
+    if isinstance(spec, PeakList):
+        for s in range(spec.n_scans):
+            mz, intensities = spec.scan(s)
+            order = np.argsort(mz, kind = "stable")                                          ##peaks of a scan hash as in matchms
+            sha.update(np.int64(mz.size).tobytes() + mz[order].tobytes() + intensities[order].tobytes())
+        return sha.hexdigest()
+
+    for spectrum in spec:
+        mz = np.asarray(spectrum.peaks.mz, dtype = np.float64)
+        intensities = np.asarray(spectrum.peaks.intensities, dtype = np.float64)
+        sha.update(np.int64(mz.size).tobytes() + mz.tobytes() + intensities.tobytes())
+
+    return sha.hexdigest()
+
+
+def _fingerprint_table(df):
+
+    """SHA-256 of the values, labels and dtypes of a pd.DataFrame or DBDIpy.SparseSpectra."""
+
+    from DBDIpy.sparse_spectra import SparseSpectra
+
+    sha = hashlib.sha256()
+
+    if isinstance(df, SparseSpectra):
+        X = df.intensities
+        for part in (X.data, X.indices, X.indptr, np.asarray(X.shape), df.mz if df.mz is not None else np.empty(0)):
+            sha.update(np.ascontiguousarray(part).tobytes())
+        sha.update(repr((df.index, df.columns, str(X.dtype))).encode())
+        return "sparse" + sha.hexdigest()
+
+    sha.update(pd.util.hash_pandas_object(df, index = True).to_numpy().tobytes())
+    sha.update(repr((list(df.columns), [str(t) for t in df.dtypes])).encode())
+
+    return sha.hexdigest()
+
+
+def _write_result(res, path):
+
+    """Writes a pd.DataFrame or DBDIpy.SparseSpectra as uncompressed Feather file.
+    Tables are written by export_to_feather(). Returns False if the result cannot be
+    stored, e.g. for column labels that are neither strings nor numbers.
+
+    """
+
+    import pyarrow as pa
+    import pyarrow.feather
+    from DBDIpy.export_to_feather import export_to_feather
+    from DBDIpy.sparse_spectra import SparseSpectra
+
+    fd, tmp = tempfile.mkstemp(suffix = ".tmp", dir = os.path.dirname(path))              ##unique name for concurrent writers
+    os.close(fd)
+
+    try:
+        if isinstance(res, SparseSpectra):
+            coo = res.intensities.tocoo()
+            meta = {"mz": None if res.mz is None else res.mz.tolist(),
+                    "index": list(res.index), "columns": list(res.columns), "shape": list(coo.shape)}
+            table = pa.table({"row": coo.row.astype(np.int64), "col": coo.col.astype(np.int64), "value": coo.data},
+                             metadata = {"dbdipy.sparse": json.dumps(meta)})
+            pyarrow.feather.write_feather(table, tmp, compression = "uncompressed")          ##uncompressed files can be memory-mapped
+        else:
+            export_to_feather(res, tmp)
+    except (TypeError, ValueError, pa.ArrowException):
+        os.remove(tmp)
+        return False
+
+    os.replace(tmp, path)
+
+    return True
+
+
+def _read_result(path):
+
+    """Reads a result written by _write_result() memory-mapped."""
+
+    import pyarrow as pa
+    import pyarrow.feather
+    import scipy.sparse
+    from DBDIpy.read_feather import read_feather
+    from DBDIpy.sparse_spectra import SparseSpectra
+
+    with pa.memory_map(path) as source:
+        meta = pa.ipc.open_file(source).schema.metadata or {}
+
+    if b"dbdipy.sparse" in meta:
+        table = pyarrow.feather.read_table(path, memory_map = True)
+        meta = json.loads(meta[b"dbdipy.sparse"])
+        intensities = scipy.sparse.csr_matrix((table.column("value").to_numpy(),
+                                               (table.column("row").to_numpy(), table.column("col").to_numpy())),
+                                              shape = tuple(meta["shape"]))
+        return SparseSpectra(meta["mz"], intensities, index = meta["index"], columns = meta["columns"])
+
+    return read_feather(path)
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+
+class SparseSpectra:
+
+    """Sparse representation of aligned mass spectrometric features.
+    Aligned DBDI data are mostly empty as features are detected in few scans only.
+    SparseSpectra keeps the detected intensities as a scipy.sparse CSR matrix of
+    features x scans together with the mean m/z of every feature. Stored entries are
+    detected signals, entries which are not stored correspond to nan in the dense
+    DataFrame returned by DBDIpy.align_spectra().
+
+    impute_intensities(), identify_adducts() and export_to_spectra() accept
+    SparseSpectra directly.
+
+    Parameters
+    ----------
+    mz : array-like or None
+         Mean m/z value of every feature. May be None for tables without mass information.
+
+    intensities : scipy.sparse matrix
+                  Detected intensities arranged as features x scans.
+
+    index : list, optional
+            Feature IDs. Default is "ID1", "ID2", ...
+
+    columns : list, optional
+              Scan names. Default is "scan1", "scan2", ...
+
+    See Also
+    --------
+    DBDIpy.align_spectra() : Returns SparseSpectra with sparse = True.
+
+    """
+
+    def __init__(self, mz, intensities, index = None, columns = None):
+
+        import scipy.sparse
+
+        if not scipy.sparse.issparse(intensities):
+            raise TypeError("Argument for intensities should be a scipy.sparse matrix.")
+
+        self.intensities = scipy.sparse.csr_matrix(intensities)
+        self.intensities.sort_indices()
+
+        n_feat, n_scans = self.intensities.shape
+
+        self.mz = None if mz is None else np.asarray(mz, dtype = np.float64)
+        if self.mz is not None and self.mz.size != n_feat:
+            raise ValueError("Incompatible dimensions of mass list and number of features.")
+
+        self.index = list(index) if index is not None else ["ID" + str(x) for x in range(1, n_feat + 1)]
+        self.columns = list(columns) if columns is not None else [f"scan{s+1}" for s in range(n_scans)]
+
+        if len(self.index) != n_feat or len(self.columns) != n_scans:
+            raise ValueError("Incompatible dimensions of labels and intensity matrix.")
+
+    def __repr__(self):
+        return (f"SparseSpectra({self.shape[0]} features x {self.shape[1]} scans, "
+                f"{self.intensities.nnz} detected signals)")
+
+    @property
+    def shape(self):
+        """Number of features and scans."""
+        return self.intensities.shape
+
+    @classmethod
+    def from_frame(cls, df, mzcol = "mean"):
+
+        """Builds SparseSpectra from a DataFrame of aligned features.
+        Non-missing entries of df are stored, nan entries are dropped.
+        mzcol names the column holding m/z values; use None if df only contains intensities.
+
+        """
+
+        import scipy.sparse
+
+        if not isinstance(df, pd.DataFrame):
+            raise TypeError("Argument for df should be of instance pandas.DataFrame.")
+
+        mz = None
+        if mzcol is not None:
+            mz = df[mzcol].to_numpy(dtype = np.float64)
+            df = df.drop(mzcol, axis = 1)
+
+        values = df.to_numpy()
+        rows, cols = np.nonzero(~np.isnan(values))
+        intensities = scipy.sparse.csr_matrix((values[rows, cols], (rows, cols)), shape = values.shape)
+
+        return cls(mz, intensities, index = df.index, columns = df.columns)
+
+    def intensity_array(self):
+
+        """Dense NumPy array of intensities with nan for features absent in a scan."""
+
+        coo = self.intensities.tocoo()
+        values = np.full(self.shape, np.nan, dtype = self.intensities.dtype)
+        values[coo.row, coo.col] = coo.data
+
+        return values
+
+    def to_frame(self, mzcol = "mean"):
+
+        """Dense DataFrame in the layout of DBDIpy.align_spectra().
+        The m/z values are inserted as first column named mzcol if available.
+
+        """
+
+        df = pd.DataFrame(self.intensity_array(), index = self.index, columns = self.columns)
+        if self.mz is not None and mzcol is not None:
+            df.insert(0, mzcol, self.mz)
+
+        return df
@@ -0,0 +1,262 @@
+import numpy as np
+import pandas as pd
+
+
+class SpectraAligner:
+
+    """Incremental feature building from a stream of spectra.
+    Aligns the peaks of mass spectrometric scans one scan at a time into a table of features.
+    Spectra can be consumed from any iterable, e.g. the generator returned by
+    matchms.importing.load_from_mgf(), so that alignment overlaps with parsing and
+    no list of matchms.Spectrum objects needs to be held in memory.
+    A snapshot of the aligned table can be taken at any point.
+
+    Intensities are written into a preallocated NumPy matrix with one contiguous row per
+    scan which grows geometrically, so the cost per scan does not depend on the number
+    of scans aligned before. Mean m/z values are kept as running sums and counts.
+
+    Parameters
+    ----------
+    ppm_window : float, optional
+                 Window for mass alignment in ppm. Default is 2 ppm.
+                 The window scales with the mass of a feature (m/z x ppm_window x 1e-6).
+
+    dtype : str or np.dtype, {"float64", "float32"}, optional
+            Data type of the stored intensities. "float32" halves the memory
+            footprint of the feature table. Mean m/z values are always float64.
+
+    sparse : bool, optional
+             Store intensities as coordinate triplets instead of a dense matrix.
+             Recommended for wide runs where most features are absent in most scans.
+
+    mz_window : float, optional
+                Absolute window for mass alignment in Da. Overrides ppm_window if given.
+
+    Examples
+    --------
+    >>> aligner = SpectraAligner(ppm_window = 2)
+    >>> aligner.extend(load_from_mgf("example_dataset.mgf"))
+    >>> specs_aligned = aligner.to_frame()
+
+    See Also
+    --------
+    DBDIpy.align_spectra() : Alignment of a complete list of spectra.
+
+    """
+
+    def __init__(self, ppm_window = 2, dtype = "float64", sparse = False, mz_window = None):
+
+        if isinstance(ppm_window, bool) or not isinstance(ppm_window, (int, float)):
+            raise TypeError("Argument for ppm_window should be numeric.")
+
+        if mz_window is not None and (isinstance(mz_window, bool) or not isinstance(mz_window, (int, float))):
+            raise TypeError("Argument for mz_window should be numeric.")
+
+        if np.dtype(dtype) not in (np.float32, np.float64):
+            raise ValueError("Invalid dtype. Choose from 'float32' or 'float64'.")
+
+        self.ppm_window = ppm_window
+        self.mz_window = mz_window
+        self.dtype = np.dtype(dtype)
+        self.sparse = sparse
+
+        self._n_feat = 0
+        self._n_scans = 0
+
+        ##feature buffers, indexed by feature id in order of creation
+        self._sums = np.zeros(1024)                                                          ##running sum of matched m/z
+        self._counts = np.zeros(1024, dtype = np.int64)                                      ##number of matched peaks
+
+        ##sorted view of the features
+        self._means = np.empty(0)                                                            ##mean m/z, sorted ascending
+        self._order = np.empty(0, dtype = np.int64)                                          ##feature ids sorted by mean m/z
+        self._tols = np.empty(0)                                                             ##alignment window of every feature
+
+        ##intensity buffers
+        if self.sparse:
+            self._nnz = 0
+            self._coo_rows = np.empty(16384, dtype = np.int64)
+            self._coo_cols = np.empty(16384, dtype = np.int64)
+            self._coo_vals = np.empty(16384, dtype = self.dtype)
+        else:
+            self._table = np.full((64, 1024), np.nan, dtype = self.dtype)                   ##scans x features
+
+    @property
+    def n_scans(self):
+        """Number of scans aligned so far."""
+        return self._n_scans
+
+    @property
+    def n_features(self):
+        """Number of features detected so far."""
+        return self._n_feat
+
+    @property
+    def mz(self):
+        """Mean m/z of all features detected so far in ascending order."""
+        return self._means.copy()
+
+    def _reserve(self, n_feat, n_peaks):
+
+        """Grows the buffers geometrically to hold n_feat features and one more scan."""
+
+        if n_feat > self._sums.size:
+            cap = max(n_feat, 2 * self._sums.size)
+            self._sums = np.concatenate([self._sums, np.zeros(cap - self._sums.size)])
+            self._counts = np.concatenate([self._counts, np.zeros(cap - self._counts.size, dtype = np.int64)])
+
+        if self.sparse:
+            if self._nnz + n_peaks > self._coo_vals.size:
+                cap = max(self._nnz + n_peaks, 2 * self._coo_vals.size)
+                self._coo_rows = np.resize(self._coo_rows, cap)
+                self._coo_cols = np.resize(self._coo_cols, cap)
+                self._coo_vals = np.resize(self._coo_vals, cap)
+            return
+
+        n_rows, n_cols = self._table.shape
+        if self._n_scans + 1 > n_rows or n_feat > n_cols:
+            rows = 2 * n_rows if self._n_scans + 1 > n_rows else n_rows
+            cols = max(n_feat, 2 * n_cols) if n_feat > n_cols else n_cols
+            table = np.full((rows, cols), np.nan, dtype = self.dtype)
+            table[:self._n_scans, :self._n_feat] = self._table[:self._n_scans, :self._n_feat]
+            self._table = table
+
+    def add(self, spectrum):
+
+        """Aligns a single matchms.Spectrum as the next scan."""
+
+        import matchms
+
+        if not isinstance(spectrum, matchms.Spectrum):
+            raise TypeError("Spectra should be of instance matchms.Spectrum.")
+
+        self.add_peaks(spectrum.peaks.mz, spectrum.peaks.intensities)
+
+    def add_peaks(self, mz, intensities):
+
+        """Aligns the next scan given as arrays of m/z values and intensities."""
+
+        from DBDIpy.align_spectra import _match_peaks, _window
+
+        mz_s = np.asarray(mz, dtype = np.float64)
+        int_s = np.asarray(intensities, dtype = np.float64)
+
+        if mz_s.shape != int_s.shape:
+            raise ValueError("Incompatible dimensions of m/z values and intensities.")
+
+        hit = _match_peaks(self._means, mz_s, self._tols)
+        matched = hit >= 0
+
+        new_mz = mz_s[~matched]
+        self._reserve(self._n_feat + new_mz.size, mz_s.size)
+
+        ##case 1: existing features
+        pos = hit[matched]
+        fid = self._order[pos]
+        self._sums[fid] += mz_s[matched]                                                     ##matches are unique per feature
+        self._counts[fid] += 1
+        self._means[pos] = self._sums[fid] / self._counts[fid]                               ##running mean m/z
+        self._tols[pos] = _window(self._means[pos], self.ppm_window, self.mz_window)
+
+        if pos.size > 0:                                                                     ##restore order if a mean passed its neighbour
+            lo = self._means[np.maximum(pos - 1, 0)]
+            hi = self._means[np.minimum(pos + 1, self._means.size - 1)]
+            if np.any(lo > self._means[pos]) or np.any(hi < self._means[pos]):
+                resort = np.argsort(self._means, kind = "stable")
+                self._means, self._order = self._means[resort], self._order[resort]
+                self._tols = self._tols[resort]
+
+        ##case 2: add new features
+        new_ids = np.arange(self._n_feat, self._n_feat + new_mz.size)
+        self._sums[new_ids] = new_mz
+        self._counts[new_ids] = 1
+        self._n_feat += new_mz.size
+
+        if new_mz.size > 0:
+            srt = np.argsort(new_mz, kind = "stable")
+            ins = np.searchsorted(self._means, new_mz[srt], side = "right")
+            self._means = np.insert(self._means, ins, new_mz[srt])
+            self._order = np.insert(self._order, ins, new_ids[srt])
+            self._tols = np.insert(self._tols, ins, _window(new_mz[srt], self.ppm_window, self.mz_window))
+
+        ##write intensities of the scan
+        fids = np.concatenate([fid, new_ids])
+        vals = np.concatenate([int_s[matched], int_s[~matched]])
+
+        if self.sparse:
+            self._coo_rows[self._nnz:self._nnz + fids.size] = fids
+            self._coo_cols[self._nnz:self._nnz + fids.size] = self._n_scans
+            self._coo_vals[self._nnz:self._nnz + fids.size] = vals
+            self._nnz += fids.size
+        else:
+            self._table[self._n_scans, fids] = vals
+
+        self._n_scans += 1
+
+    def extend(self, spectra, progress = True):
+
+        """Aligns all spectra of an iterable, e.g. a generator from matchms.importing,
+        or all scans of a DBDIpy.PeakList."""
+
+        from tqdm import tqdm
+        from DBDIpy.peak_list import PeakList
+
+        if isinstance(spectra, PeakList):
+            for mz, intensities in tqdm(spectra, desc = 'progress', total = len(spectra), disable = not progress):
+                self.add_peaks(mz, intensities)
+            return self
+
+        for spectrum in tqdm(spectra, desc = 'progress', disable = not progress):
+            self.add(spectrum)
+
+        return self
+
+    def to_frame(self):
+
+        """Snapshot of the current alignment.
+        Returns a pd.DataFrame with a "mean" m/z column followed by one intensity column
+        per scan aligned so far, indexed by feature IDs in order of increasing mass.
+        Absence of a signal in a scan is filled with nan.
+
+        """
+
+        if self.sparse:
+            table = np.full((self._n_scans, self._n_feat), np.nan, dtype = self.dtype)
+            table[self._coo_cols[:self._nnz], self._coo_rows[:self._nnz]] = self._coo_vals[:self._nnz]
+        else:
+            table = self._table[:self._n_scans, :self._n_feat]
+
+        table = table[:, self._order]                                                        ##one copy into feature order
+
+        aldf = pd.DataFrame(table.T, columns = [f"scan{s+1}" for s in range(self._n_scans)])
+        aldf.insert(0, "mean", self._means.copy())
+        aldf.index = ["ID" + str(x) for x in range(1, aldf.shape[0] + 1)]
+
+        return aldf
+
+    def to_sparse(self):
+
+        """Snapshot of the current alignment as DBDIpy.SparseSpectra.
+        Only detected signals are stored, which avoids building the dense table.
+
+        """
+
+        import scipy.sparse
+        from DBDIpy.sparse_spectra import SparseSpectra
+
+        rank = np.empty(self._n_feat, dtype = np.int64)
+        rank[self._order] = np.arange(self._n_feat)                                          ##feature id -> row in mass order
+
+        if self.sparse:
+            rows = rank[self._coo_rows[:self._nnz]]
+            cols = self._coo_cols[:self._nnz]
+            vals = self._coo_vals[:self._nnz]
+        else:
+            table = self._table[:self._n_scans, :self._n_feat]
+            cols, fids = np.nonzero(~np.isnan(table))
+            rows, vals = rank[fids], table[cols, fids]
+
+        intensities = scipy.sparse.csr_matrix((vals, (rows, cols)), shape = (self._n_feat, self._n_scans),
+                                              dtype = self.dtype)
+
+        return SparseSpectra(self._means.copy(), intensities)
@@ -0,0 +1,48 @@
+import pytest
+import matchms
+import pandas as pd
+import numpy as np
+
+
+def _correlated_xic(n_feat = 50, n_scans = 40, seed = 212):
+    ##groups of correlated XIC with integer intensities to provoke tied ranks
+    rng = np.random.default_rng(seed)
+    profiles = rng.uniform(1e4, 1e6, (5, n_scans))
+    xic = profiles[rng.integers(0, 5, n_feat)] * rng.uniform(0.5, 2, (n_feat, 1))
+    xic = xic + rng.normal(0, 5e4, xic.shape)
+    return pd.DataFrame(np.round(xic, -4), index = ["ID" + str(x) for x in range(1, n_feat + 1)])
+
+def _aligned_table(n_feat = 200, n_scans = 30, missing = 0.6, intensity = (1e4, 1e8), mz = (100, 1000), seed = 212):
+    ##table as returned by align_spectra(): sorted "mean" m/z column followed by scans with missing values
+    rng = np.random.default_rng(seed)
+    table = pd.DataFrame(rng.uniform(*intensity, size = (n_feat, n_scans)), index = ["ID" + str(x) for x in range(1, n_feat + 1)],
+                         columns = [f"scan{s+1}" for s in range(n_scans)])
+    table = table.mask(rng.random(table.shape) < missing)
+    table.insert(0, "mean", np.sort(rng.uniform(*mz, n_feat)))
+    return table
+
+def _synthetic_spectra(n_scans = 30, features = 60, n_peaks = 40, jitter = 0, seed = 212):
+    ##every scan detects n_peaks of the features, given as m/z values or as their number drawn from 100-500
+    rng = np.random.default_rng(seed)
+    if np.isscalar(features):
+        features = np.sort(rng.uniform(100, 500, features))
+    spectrums = []
+    for i in range(n_scans):
+        present = np.sort(rng.choice(len(features), n_peaks, replace = False))
+        mz = features[present] + rng.uniform(-jitter, jitter, n_peaks) if jitter else features[present]
+        spectrums.append(matchms.Spectrum(mz = mz, intensities = rng.uniform(1e4, 1e6, n_peaks), metadata={}))
+    return spectrums
+
+
+#%% shared test data
+@pytest.fixture
+def correlated_xic():
+    return _correlated_xic
+
+@pytest.fixture
+def aligned_table():
+    return _aligned_table
+
+@pytest.fixture
+def synthetic_spectra():
+    return _synthetic_spectra
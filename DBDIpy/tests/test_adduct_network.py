@@ -0,0 +1,77 @@
+import DBDIpy as dbdi
+import pytest
+import pandas as pd
+import numpy as np
+
+
+def oxygen_series(n_series = 10, n_noise = 30, n_scans = 30, seed = 212):
+    ##compounds with O, O2 and O3 adducts, every second one with O only, among uncorrelated features
+    rng = np.random.default_rng(seed)
+    mz, xic = [], []
+    for s in range(n_series):
+        profile = rng.uniform(1e4, 1e6, n_scans)
+        shifts = (0, 15.994915, 31.98983, 47.984745) if s % 2 == 0 else (0, 15.994915)
+        base = 150 + 40 * s + rng.uniform(0, 1)
+        for shift in shifts:
+            mz.append(base + shift)
+            xic.append(profile * rng.uniform(0.5, 2) + rng.normal(0, 5e3, n_scans))
+    mz.extend(rng.uniform(100, 600, n_noise))
+    xic.extend(rng.uniform(1e4, 1e6, (n_noise, n_scans)))
+    xic = pd.DataFrame(np.vstack(xic), index = ["ID" + str(x) for x in range(1, len(mz) + 1)])
+    return xic, pd.Series(mz)
+
+
+#%%trigger input errors
+def test_input_errors():
+    with pytest.raises(ValueError):
+        dbdi.AdductNetwork([0, 1], [1], [0, 0], ["O"], 3)
+    with pytest.raises(IndexError):
+        dbdi.AdductNetwork([0], [3], [0], ["O"], 3)
+    with pytest.raises(IndexError):
+        dbdi.AdductNetwork([0], [1], [1], ["O"], 3)
+    with pytest.raises(ValueError):
+        dbdi.AdductNetwork([0], [1], [0], ["O"], 3, index = ["a", "b"])
+    with pytest.raises(TypeError):
+        dbdi.AdductNetwork.from_adducts([], pd.RangeIndex(3))
+    network = dbdi.AdductNetwork([0], [1], [0], ["O"], 3)
+    with pytest.raises(KeyError):
+        network.with_motives(["O", "O2"])
+    with pytest.raises(IndexError):
+        network.component(3)
+
+
+#%% queries
+def test_network():
+    network = dbdi.AdductNetwork([0, 0, 1, 4, 4], [1, 2, 3, 5, 6], [0, 1, 0, 0, 1], ["O", "O2"], 8)
+    assert network.n_edges == 5 and len(network) == 8
+    np.testing.assert_array_equal(network.with_motives(["O", "O2"]), [0, 4])
+    np.testing.assert_array_equal(network.with_motives("O"), [0, 1, 4])
+    np.testing.assert_array_equal(network.component(3), [0, 1, 2, 3])
+    np.testing.assert_array_equal(network.component(7), [7])
+    np.testing.assert_array_equal(network.neighbours(0), [1, 2])
+    assert [list(c) for c in network.components()] == [[0, 1, 2, 3], [4, 5, 6]]
+    assert len(network.components(min_size = 1)) == 3
+    assert network.adjacency.shape == (8, 8)
+    assert (network.adjacency != network.adjacency.T).nnz == 0
+
+def test_identify_adducts_network():
+    xic, mz = oxygen_series()
+    o3 = pd.DataFrame({'deltamz': [47.984745], 'motive': ["O3"]})
+    res = dbdi.identify_adducts(xic, masses = mz, method = "pearson", custom_adducts = o3)
+    network = dbdi.identify_adducts(xic, masses = mz, method = "pearson", custom_adducts = o3, network = True)
+    assert isinstance(network, dbdi.AdductNetwork)
+    assert network.motives == ["O", "O2", "H2O", "O3"]
+    
+    three_adducts = np.intersect1d(network.adducts["O"]["base_index"],
+                                   np.intersect1d(network.adducts["O2"]["base_index"], network.adducts["O3"]["base_index"]))
+    np.testing.assert_array_equal(network.with_motives(["O", "O2", "O3"]), three_adducts)
+    assert three_adducts.size == 5
+    
+    sizes = sorted(c.size for c in network.components())
+    assert sizes == [2] * 5 + [4] * 5
+    for motive in res:
+        pd.testing.assert_frame_equal(res[motive], network.adducts[motive])
+    
+    edges = network.to_frame()
+    assert edges.shape[0] == sum(len(r) for r in network.adducts.values())
+    np.testing.assert_array_equal(edges["match_label"], xic.index[edges["match_index"]])
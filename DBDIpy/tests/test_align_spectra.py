@@ -1,3 +1,4 @@
+import os
 import matchms
 import numpy as np
 import DBDIpy as dbdi
@@ -17,6 +18,11 @@ def test_input_format():
             spectrums.append(spectrum) 
         dbdi.align_spectra(spectrums, ppm_window = "X")
         
+def test_input_engine():
+    with pytest.raises(ValueError):
+        spectrums = [matchms.Spectrum(mz = np.linspace(1, 9, 10), intensities = np.random.rand(10), metadata={})]
+        dbdi.align_spectra(spectrums, engine = "trash")
+        
 #%% test output of function
 def test_align_spectra(): 
     
@@ -33,4 +39,139 @@ def test_align_spectra():
     assert specs_aligned.shape[1]-1 == len(spectrums)
     assert all(specs_aligned.index.str.contains('ID'))
     assert all(specs_aligned.columns.str.contains('scan') |specs_aligned.columns.str.contains('mean'))
-    assert specs_aligned["mean"].is_monotonic_increasing    
\ No newline at end of file
+    assert specs_aligned["mean"].is_monotonic_increasing    
+
+#%% compare alignment engines
+def test_engines_synthetic(synthetic_spectra):
+    
+    spectrums = synthetic_spectra()
+        
+    res_pandas = dbdi.align_spectra(spectrums, ppm_window = 2, engine = "pandas")
+    res_numpy = dbdi.align_spectra(spectrums, ppm_window = 2, engine = "numpy")
+    
+    pd.testing.assert_frame_equal(res_pandas, res_numpy)
+
+def test_engines_noisy():
+    
+    rng = np.random.default_rng(212)
+    features = 100 + np.cumsum(rng.uniform(0.05, 5, 60))
+    spectrums = []
+    for i in range(25):
+        present = np.flatnonzero(rng.random(60) < 0.7)
+        mz = features[present] * (1 + rng.uniform(-1.9e-6, 1.9e-6, present.size))         ##jitter up to the window
+        spectrums.append(matchms.Spectrum(mz = mz, intensities = rng.uniform(1e4, 1e6, present.size), metadata={}))
+    
+    ##peak inside the window of the feature mean but outside its own window, two peaks claiming one feature
+    spectrums.append(matchms.Spectrum(mz = np.array([1000.0]), intensities = np.array([1.0]), metadata={}))
+    spectrums.append(matchms.Spectrum(mz = np.array([1000.0 - 0.001999998]), intensities = np.array([2.0]), metadata={}))
+    spectrums.append(matchms.Spectrum(mz = np.array([999.9995, 1000.0012]), intensities = np.array([3.0, 4.0]), metadata={}))
+    
+    for merge in (False, True):
+        res_pandas = dbdi.align_spectra(spectrums, ppm_window = 2, engine = "pandas", merge = merge)
+        res_numpy = dbdi.align_spectra(spectrums, ppm_window = 2, engine = "numpy", merge = merge)
+        pd.testing.assert_frame_equal(res_pandas, res_numpy)
+    
+    res = dbdi.align_spectra(spectrums, ppm_window = 2, merge = False)
+    assert list(res.loc[res["mean"].between(999.99, 1000.01), "scan27"].dropna()) == [2.0]
+
+def test_engines_example_data():
+    
+    from matchms.importing import load_from_mgf
+    
+    demo_mgf = os.path.join(os.path.dirname(__file__), "..", "..", "data", "example_dataset.mgf")
+    spectrums = list(load_from_mgf(demo_mgf))[:15]
+    
+    res_pandas = dbdi.align_spectra(spectrums, engine = "pandas")
+    res_numpy = dbdi.align_spectra(spectrums, engine = "numpy")
+    
+    pd.testing.assert_frame_equal(res_pandas, res_numpy)
+
+def test_engines_float32():
+    
+    from matchms.importing import load_from_mgf
+    
+    demo_mgf = os.path.join(os.path.dirname(__file__), "..", "..", "data", "example_dataset.mgf")
+    spectrums = list(load_from_mgf(demo_mgf))[:5]
+    
+    res_pandas = dbdi.align_spectra(spectrums, engine = "pandas", dtype = "float32")
+    res_numpy = dbdi.align_spectra(spectrums, engine = "numpy", dtype = "float32")
+    
+    assert res_pandas["mean"].dtype == np.float64
+    assert (res_pandas.dtypes.iloc[1:] == np.float32).all()
+    pd.testing.assert_frame_equal(res_pandas, res_numpy)
+
+def test_parallel_alignment(synthetic_spectra):
+    
+    from matchms.importing import load_from_mgf
+    
+    spectrums = synthetic_spectra(n_scans = 40, features = 400, n_peaks = 250, jitter = 5e-7)
+    
+    res_serial = dbdi.align_spectra(spectrums, ppm_window = 2)
+    res_parallel = dbdi.align_spectra(spectrums, ppm_window = 2, n_jobs = 3)
+    pd.testing.assert_frame_equal(res_serial, res_parallel)
+    
+    demo_mgf = os.path.join(os.path.dirname(__file__), "..", "..", "data", "example_dataset.mgf")
+    res_serial = dbdi.align_spectra(load_from_mgf(demo_mgf), sparse = True)
+    res_parallel = dbdi.align_spectra(load_from_mgf(demo_mgf), sparse = True, n_jobs = 4)
+    pd.testing.assert_frame_equal(res_serial.to_frame(), res_parallel.to_frame())
+    
+    ##drifting peaks without gaps wider than the window around the median m/z
+    rng = np.random.default_rng(212)
+    spectrums = []
+    for i in range(80):
+        mz = np.array([200.0 + 1e-4 * (i % 2), 500.0 * (1 + 1.5e-6 * i), 800.0 + 1e-4 * (i % 2)])
+        spectrums.append(matchms.Spectrum(mz = mz, intensities = rng.uniform(1e4, 1e6, 3), metadata={}))
+    for merge in (False, True):
+        res_serial = dbdi.align_spectra(spectrums, ppm_window = 2, merge = merge)
+        pd.testing.assert_frame_equal(res_serial, dbdi.align_spectra(spectrums, ppm_window = 2, merge = merge, n_jobs = 2))
+        pd.testing.assert_frame_equal(res_serial, dbdi.align_spectra(spectrums, ppm_window = 2, merge = merge, n_jobs = 3))
+    
+    from DBDIpy.align_spectra import _slab_cuts
+    cuts = _slab_cuts(dbdi.PeakList.from_spectra(spectrums).mz, 2, 2, None)
+    assert cuts.size == 1 and (cuts[0] < 500 or cuts[0] > 500.06)                          ##cut outside the drifting peaks
+    
+    with pytest.raises(ValueError):
+        dbdi.align_spectra(spectrums, n_jobs = 0)
+    with pytest.raises(ValueError):
+        dbdi.align_spectra(spectrums, engine = "pandas", n_jobs = 2)
+
+#%% test mass windows
+def test_relative_ppm_window():
+    
+    rng = np.random.default_rng(212)
+    spectrums = []
+    for i in range(20):
+        mz = np.array([200.0, 500.0, 900.0]) * (1 + rng.uniform(-0.8e-6, 0.8e-6, 3))      ##+-0.8 ppm scatter
+        spectrums.append(matchms.Spectrum(mz = mz, intensities = rng.uniform(1e4, 1e6, 3), metadata={}))
+    
+    res_ppm = dbdi.align_spectra(spectrums, ppm_window = 2)
+    res_abs = dbdi.align_spectra(spectrums, mz_window = 2e-6, merge = False)
+    
+    assert res_ppm.shape == (3, 21)
+    assert not res_ppm.isnull().values.any()
+    assert res_abs.shape[0] > 3
+    pd.testing.assert_frame_equal(res_ppm, dbdi.align_spectra(spectrums, ppm_window = 2, engine = "pandas"))
+    pd.testing.assert_frame_equal(res_ppm, dbdi.align_spectra_b(spectrums, ppm_window = 2))
+    
+    with pytest.raises(TypeError):
+        dbdi.align_spectra(spectrums, mz_window = "X")
+
+def test_merge_drifting_features():
+    
+    mzs = [[500.0], [500.0015], [500.0009], [500.0003], [500.0006]]
+    spectrums = [matchms.Spectrum(mz = np.array(mz), intensities = np.array([1.0 + i]), metadata={}) 
+                 for i, mz in enumerate(mzs)]
+    
+    res_unmerged = dbdi.align_spectra(spectrums, ppm_window = 2, merge = False)
+    res_merged = dbdi.align_spectra(spectrums, ppm_window = 2)
+    
+    assert res_unmerged.shape[0] == 2
+    assert res_merged.shape[0] == 1
+    assert np.isclose(res_merged["mean"].iloc[0], np.mean(mzs))
+    assert list(res_merged.iloc[0, 1:]) == [1.0, 2.0, 3.0, 4.0, 5.0]
+    pd.testing.assert_frame_equal(res_merged, dbdi.align_spectra(spectrums, ppm_window = 2, n_jobs = 2))
+    pd.testing.assert_frame_equal(res_merged, dbdi.align_spectra_b(spectrums, ppm_window = 2))
+    
+    ##features detected in the same scan are kept apart
+    spectrums.append(matchms.Spectrum(mz = np.array([500.0, 500.0012]), intensities = np.array([6.0, 7.0]), metadata={}))
+    assert dbdi.align_spectra(spectrums, ppm_window = 2).shape[0] == 2
@@ -0,0 +1,44 @@
+import os
+import matchms
+import numpy as np
+import DBDIpy as dbdi
+import pandas as pd
+import pytest
+
+#%%trigger input errors
+def test_input_format():
+    with pytest.raises(TypeError):
+        spectrums = pd.DataFrame(np.random.randint(100, 1000000, size = (100, 100)))        
+        dbdi.align_spectra_b(spectrums, ppm_window = 0.2)
+    
+    with pytest.raises(TypeError):  
+        spectrums = [matchms.Spectrum(mz = np.linspace(1, 9, 10), intensities = np.random.rand(10), metadata={})]
+        dbdi.align_spectra_b(spectrums, ppm_window = "X")
+
+#%% test output of function
+def test_align_spectra_b_synthetic(synthetic_spectra): 
+    
+    features = np.linspace(100, 500, 80)
+    spectrums = synthetic_spectra(n_scans = 40, features = features, n_peaks = 50, jitter = 1e-7)
+    
+    specs_aligned = dbdi.align_spectra_b(spectrums, ppm_window = 2)
+    
+    assert isinstance(specs_aligned, pd.DataFrame)
+    assert specs_aligned.shape == (80, 41)
+    assert all(specs_aligned.index.str.contains('ID'))
+    assert specs_aligned["mean"].is_monotonic_increasing
+    assert np.allclose(specs_aligned["mean"], features, atol = 1e-6)
+    pd.testing.assert_frame_equal(specs_aligned, dbdi.align_spectra(spectrums, ppm_window = 2))
+
+def test_align_spectra_b_example_data():
+    
+    from matchms.importing import load_from_mgf
+    
+    demo_mgf = os.path.join(os.path.dirname(__file__), "..", "..", "data", "example_dataset.mgf")
+    spectrums = list(load_from_mgf(demo_mgf))
+    
+    specs_aligned = dbdi.align_spectra_b(spectrums)
+    
+    pd.testing.assert_frame_equal(specs_aligned, dbdi.align_spectra(spectrums))
+    pd.testing.assert_frame_equal(dbdi.align_spectra_b(spectrums[:15]),
+                                  dbdi.align_spectra(spectrums[:15], engine = "pandas"))
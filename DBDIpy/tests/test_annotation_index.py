@@ -0,0 +1,52 @@
+import DBDIpy as dbdi
+import pytest
+import pandas as pd
+import numpy as np
+
+
+#%%trigger input errors
+def test_input_errors():
+    with pytest.raises(ValueError):
+        dbdi.AnnotationIndex([15.994915, 18.010565], ["O"])
+    with pytest.raises(TypeError):
+        dbdi.AnnotationIndex([15.994915], ["O"], mass_error = "2")
+    with pytest.raises(ValueError):
+        dbdi.AnnotationIndex([15.994915], ["O"], unit = "mDa")
+    with pytest.raises(TypeError):
+        dbdi.AnnotationIndex.from_frame({"deltamz": [15.994915], "motive": ["O"]})
+
+
+#%% compare lookup with scanning all rules
+def test_lookup():
+    rng = np.random.default_rng(212)
+    deltamz = rng.uniform(1, 100, 300)
+    deltamz[:20] = deltamz[20:40] + rng.uniform(-1e-4, 1e-4, 20)                   ##overlapping rules
+    mzdiff = np.concatenate([rng.uniform(0, 110, 5000), deltamz[rng.integers(0, 300, 2000)] + rng.normal(0, 1e-4, 2000)])
+    
+    for mass_error, unit in ((2, "ppm"), (5, "ppm"), (0.001, "Da")):
+        rules = dbdi.AnnotationIndex(deltamz, np.arange(300), mass_error = mass_error, unit = unit)
+        pos, rule = rules.lookup(mzdiff)
+        
+        tol = deltamz * mass_error * 1e-6 if unit == "ppm" else mass_error
+        hit = (mzdiff[:, None] >= (deltamz - tol)[None, :]) & (mzdiff[:, None] <= (deltamz + tol)[None, :])
+        ref_pos, ref_rule = np.nonzero(hit)
+        np.testing.assert_array_equal(pos, ref_pos)
+        np.testing.assert_array_equal(rule, ref_rule)
+
+def test_annotate():
+    rules = dbdi.AnnotationIndex([15.994915, 18.010565, 18.0115], ["O", "H2O", "NH4-like"], mass_error = 0.001, unit = "Da")
+    res = rules.annotate([15.9952, 18.0106, 3.0, 18.0124])
+    assert list(res[[0, 1, 3]]) == ["O", "H2O; NH4-like", "NH4-like"]
+    assert np.isnan(res[2])
+    assert len(rules) == 3
+
+
+#%% overlapping rules in identify_adducts
+def test_identify_adducts_overlapping_rules():
+    rng = np.random.default_rng(212)
+    xic = pd.DataFrame(np.vstack([rng.uniform(1e4, 1e6, 30)] * 2) * [[1], [2]] + rng.uniform(0, 1e5, (2, 30)))
+    masses = pd.Series([200.0, 215.994915])
+    custom = pd.DataFrame({'deltamz': [15.99492], 'motive': ["O-like"]})
+    res = dbdi.identify_adducts(xic, masses = masses, custom_adducts = custom, mass_error = 2)
+    assert res["O"].shape[0] == 1 and res["O-like"].shape[0] == 1
+    assert res["O2"].shape[0] == 0 and res["H2O"].shape[0] == 0
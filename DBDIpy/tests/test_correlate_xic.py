@@ -0,0 +1,96 @@
+import DBDIpy as dbdi
+import pytest
+import pandas as pd
+import numpy as np
+
+
+#%%trigger input errors
+def test_input_errors(correlated_xic):
+    xic = correlated_xic()
+    with pytest.raises(TypeError):
+        dbdi.correlate_xic(xic.to_numpy())
+    with pytest.raises(ValueError):
+        dbdi.correlate_xic(xic, method = "trash")
+    with pytest.raises(ValueError):
+        dbdi.correlate_xic(xic, dtype = "int64")
+    with pytest.raises(ValueError):
+        next(dbdi.correlate_xic_blocks(xic, method = "kendall"))
+    with pytest.raises(ValueError):
+        next(dbdi.correlate_xic_blocks(xic, block_size = 0))
+
+
+#%% compare with pandas
+def test_correlate_xic(correlated_xic):
+    xic = correlated_xic()
+    for method in ("spearman", "pearson", "kendall"):
+        res = dbdi.correlate_xic(xic, method = method)
+        pd.testing.assert_frame_equal(res, xic.T.corr(method = method), check_exact = False, atol = 1e-12)
+    
+    res32 = dbdi.correlate_xic(xic, dtype = "float32")
+    assert res32.to_numpy().dtype == np.float32
+    np.testing.assert_allclose(res32.to_numpy(), xic.T.corr(method = "spearman").to_numpy(), atol = 1e-5)
+
+def test_correlate_xic_blocks(correlated_xic):
+    xic = correlated_xic()
+    blocks = list(dbdi.correlate_xic_blocks(xic, method = "pearson", block_size = 16))
+    assert [b.shape for b in blocks] == [(16, 50), (16, 50), (16, 50), (2, 50)]
+    pd.testing.assert_frame_equal(pd.concat(blocks), dbdi.correlate_xic(xic, method = "pearson"))
+
+def test_correlate_xic_sparse(correlated_xic):
+    xic = correlated_xic()
+    dense = dbdi.correlate_xic(xic).to_numpy().copy()
+    np.fill_diagonal(dense, np.nan)
+    for block_size in (1, 16, 1024):
+        res = dbdi.correlate_xic_sparse(xic, threshold = 0.8, block_size = block_size)
+        assert res.shape == (50, 50)
+        assert (res != res.T).nnz == 0
+        assert res.nnz == np.count_nonzero(dense > 0.8)
+        np.testing.assert_allclose(res.toarray()[dense > 0.8], dense[dense > 0.8])
+    with pytest.raises(ValueError):
+        dbdi.correlate_xic_sparse(xic, method = "kendall")
+
+#%% missing values
+def test_correlate_xic_overlap(correlated_xic):
+    xic = correlated_xic()
+    rng = np.random.default_rng(212)
+    xic = xic.mask(rng.random(xic.shape) < 0.3)
+    xic.iloc[0, 5:] = np.nan                                                              ##overlaps of at most 5 scans
+    
+    res = dbdi.correlate_xic(xic, method = "pearson", min_overlap = 6)
+    pd.testing.assert_frame_equal(res, xic.T.corr(method = "pearson", min_periods = 6), check_exact = False, atol = 1e-10)
+    assert res.iloc[0].isnull().all()
+    
+    blocks = pd.concat(dbdi.correlate_xic_blocks(xic, method = "pearson", block_size = 16, min_overlap = 6))
+    pd.testing.assert_frame_equal(blocks, res)
+    
+    dense = res.to_numpy().copy()
+    np.fill_diagonal(dense, np.nan)
+    sparse = dbdi.correlate_xic_sparse(xic, method = "pearson", threshold = 0.8, block_size = 7, min_overlap = 6)
+    assert sparse.nnz == np.count_nonzero(dense > 0.8)
+    np.testing.assert_allclose(sparse.toarray()[dense > 0.8], dense[dense > 0.8])
+    
+    with pytest.raises(ValueError):
+        dbdi.correlate_xic(xic, min_overlap = 0)
+
+def test_spearman_overlap(correlated_xic):
+    xic = correlated_xic()
+    rng = np.random.default_rng(212)
+    xic = xic.mask(rng.random(xic.shape) < 0.3)
+    
+    ##ranks would depend on the scans shared by every pair, rejected by all entry points alike
+    with pytest.raises(ValueError):
+        dbdi.correlate_xic(xic, method = "spearman", min_overlap = 6)
+    with pytest.raises(ValueError):
+        next(dbdi.correlate_xic_blocks(xic, method = "spearman"))
+    with pytest.raises(ValueError):
+        dbdi.correlate_xic_sparse(xic, method = "spearman")
+    with pytest.raises(ValueError):
+        dbdi.CorrelationIndex(xic, method = "spearman", min_overlap = 6)
+    with pytest.raises(ValueError):
+        dbdi.identify_adducts(xic, masses = pd.Series(np.linspace(100, 500, xic.shape[0])), min_overlap = 6)
+    with pytest.raises(ValueError):
+        dbdi.propose_adducts(0, xic, pd.Series(np.linspace(100, 500, xic.shape[0])), method = "spearman",
+                             min_overlap = 6)
+    
+    res = dbdi.correlate_xic(xic, method = "kendall", min_overlap = 6)
+    pd.testing.assert_frame_equal(res, xic.T.corr(method = "kendall", min_periods = 6))
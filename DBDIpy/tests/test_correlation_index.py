@@ -0,0 +1,65 @@
+import DBDIpy as dbdi
+import pytest
+import pandas as pd
+import numpy as np
+
+
+#%%trigger input errors
+def test_input_errors(correlated_xic):
+    xic = correlated_xic(n_feat = 40, n_scans = 30)
+    with pytest.raises(TypeError):
+        dbdi.CorrelationIndex(xic.to_numpy())
+    with pytest.raises(ValueError):
+        dbdi.CorrelationIndex(xic, method = "kendall")
+    with pytest.raises(ValueError):
+        dbdi.CorrelationIndex(xic, cache_size = -1)
+    with pytest.raises(ValueError):
+        dbdi.CorrelationIndex(xic.mask(xic > 9e5))
+    
+    index = dbdi.CorrelationIndex(xic)
+    with pytest.raises(IndexError):
+        index.row(40)
+    with pytest.raises(TypeError):
+        index.row("ID1")
+
+
+#%% test queries
+def test_rows(correlated_xic):
+    xic = correlated_xic(n_feat = 40, n_scans = 30)
+    index = dbdi.CorrelationIndex(xic, method = "spearman")
+    cormat = xic.T.corr(method = "spearman")
+    
+    pd.testing.assert_frame_equal(index.rows([3, 7, 3]), cormat.iloc[[3, 7, 3]])
+    pd.testing.assert_series_equal(index.row(-1), cormat.iloc[-1])
+    
+    neighbours = index.neighbours(5, threshold = 0.8)
+    ref = cormat.iloc[5]
+    pd.testing.assert_series_equal(neighbours, ref[(ref >= 0.8) & (ref < 1)])
+
+def test_cache(correlated_xic):
+    xic = correlated_xic(n_feat = 40, n_scans = 30)
+    index = dbdi.CorrelationIndex(xic, cache_size = 2)
+    index.rows([0, 1])
+    index.row(0)
+    assert (index.hits, index.misses) == (1, 2)
+    index.row(2)                                                    ##evicts row 1, least recently used
+    index.row(0)
+    assert (index.hits, index.misses) == (2, 3)
+    index.row(1)
+    assert (index.hits, index.misses) == (2, 4)
+    
+    index.update(xic * np.arange(1, 31))
+    assert (index.hits, index.misses) == (0, 0)
+    pd.testing.assert_series_equal(index.row(0), (xic * np.arange(1, 31)).T.corr().iloc[0])
+
+def test_propose_adducts_index(correlated_xic):
+    xic = correlated_xic(n_feat = 40, n_scans = 30)
+    masses = pd.Series(np.random.default_rng(212).uniform(100, 500, 40))
+    index = dbdi.CorrelationIndex(xic, method = "pearson")
+    for ID in (0, 5, 17):
+        res = dbdi.propose_adducts(ID, xic.reset_index(drop = True), masses, threshold = 0.8)
+        res_index = dbdi.propose_adducts(ID, index, masses, threshold = 0.8)
+        np.testing.assert_array_equal(res_index["match_IDs"], xic.index[res["match_IDs"]])
+        np.testing.assert_allclose(res_index["cor"], res["cor"])
+    with pytest.raises(ValueError):
+        dbdi.propose_adducts(0, index, masses, method = "spearman", threshold = 0.8)
@@ -0,0 +1,43 @@
+import gzip
+import DBDIpy as dbdi
+import pytest
+import numpy as np
+from matchms.importing import load_from_mgf
+
+
+#%%trigger input errors
+def test_input_errors(tmp_path, aligned_table):
+    aligned_spectra = aligned_table()
+    with pytest.raises(ValueError):
+        dbdi.export_to_mgf(aligned_spectra, tmp_path / "test.mgf", compress = "zip")
+    with pytest.raises(ValueError):
+        dbdi.export_to_mgf(aligned_spectra, tmp_path / "test.mgf", chunk_size = 0)
+    with pytest.raises(ValueError):
+        dbdi.export_to_mgf(aligned_spectra, tmp_path / "test.mgf", fmt = "%f")
+
+
+#%% compare with export_to_spectra
+def test_export_mgf(tmp_path, aligned_table):
+    aligned_spectra = aligned_table()
+    exp = dbdi.export_to_spectra(aligned_spectra)
+    
+    for name, chunk_size in (("test.mgf", 7), ("test.mgf.gz", 256)):
+        n = dbdi.export_to_mgf(aligned_spectra, tmp_path / name, chunk_size = chunk_size)
+        assert n == 30
+        if name.endswith(".gz"):
+            with gzip.open(tmp_path / name, "rt") as handle:
+                imported = list(load_from_mgf(handle))
+        else:
+            imported = list(load_from_mgf(str(tmp_path / name)))
+        
+        assert len(imported) == 30
+        for e, i, c in zip(exp, imported, aligned_spectra.columns[1:]):
+            assert i.get("title") == c
+            np.testing.assert_allclose(i.peaks.mz, e.peaks.mz, atol = 1e-6)
+            np.testing.assert_allclose(i.peaks.intensities, e.peaks.intensities, rtol = 1e-7)
+
+def test_export_mgf_sparse(tmp_path, aligned_table):
+    aligned_spectra = aligned_table()
+    dbdi.export_to_mgf(aligned_spectra, tmp_path / "dense.mgf")
+    dbdi.export_to_mgf(dbdi.SparseSpectra.from_frame(aligned_spectra), tmp_path / "sparse.mgf")
+    assert (tmp_path / "dense.mgf").read_text() == (tmp_path / "sparse.mgf").read_text()
@@ -36,3 +36,28 @@ def test_check_for_nan():
     
     for e in range(len(exp)):
         assert not all(np.isnan(exp[e].peaks.mz))
+
+def test_input_unchanged():
+    aligned_spectra = pd.DataFrame(np.random.randint(40, 999, size = (100, 10)), columns = ["mz"] + list(range(9)))
+    reference = aligned_spectra.copy()
+    dbdi.export_to_spectra(aligned_spectra, mzcol = 0)
+    pd.testing.assert_frame_equal(aligned_spectra, reference)
+
+#%% generator mode
+def test_export_lazy(aligned_table):
+    aligned_spectra = aligned_table(n_feat = 100, n_scans = 20, missing = 0.5, intensity = (1e4, 1e6), mz = (100, 500))
+    aligned_spectra.insert(3, "mean", aligned_spectra.pop("mean").to_numpy()[::-1])             ##unsorted m/z inside the table
+    aligned_spectra.iloc[7, 3] = np.nan
+    
+    exp = dbdi.export_to_spectra(aligned_spectra, mzcol = 3)
+    lazy = dbdi.export_to_spectra(aligned_spectra, mzcol = 3, lazy = True)
+    assert not isinstance(lazy, list)
+    lazy = list(lazy)
+    assert len(exp) == len(lazy) == 20
+    
+    ref = aligned_spectra.drop("ID8").sort_values("mean")
+    for e, l, c in zip(exp, lazy, ref.drop("mean", axis = 1).columns):
+        detected = ref[c].notnull().to_numpy()
+        np.testing.assert_array_equal(e.peaks.mz, ref["mean"].to_numpy()[detected])
+        np.testing.assert_array_equal(e.peaks.intensities, ref[c].to_numpy()[detected])
+        assert e == l
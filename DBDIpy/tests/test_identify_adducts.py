@@ -87,4 +87,111 @@ def test_impute_outputn():
     assert isinstance(list(res_adductsearch.values())[0], pd.DataFrame)
     assert all(list(res_adductsearch.values())[0]["corr"] > trtest)
     assert all((list(res_adductsearch.values())[0]["mzdiff"] <= 15.994915 + 15.994915 * ertest * 1e-6) & 
-               (list(res_adductsearch.values())[0]["mzdiff"] >= 15.994915 - 15.994915 * ertest * 1e-6))
\ No newline at end of file
+               (list(res_adductsearch.values())[0]["mzdiff"] >= 15.994915 - 15.994915 * ertest * 1e-6))
+
+#%% compare search modes
+def adduct_xic(n_feat = 40, n_scans = 30, seed = 212):
+    ##features with correlated +O and +H2O partners and uncorrelated noise features
+    rng = np.random.default_rng(seed)
+    mz = np.sort(rng.uniform(100, 600, n_feat))
+    base = rng.uniform(1e4, 1e6, (n_feat, n_scans))
+    partners = base[:n_feat // 2] * 3 + rng.uniform(0, 1e4, (n_feat // 2, n_scans))
+    mz = np.concatenate([mz, mz[:n_feat // 4] + 15.994915, mz[n_feat // 4:n_feat // 2] + 18.010565])
+    xic = pd.DataFrame(np.vstack([base, partners]), index = ["ID" + str(x) for x in range(1, mz.size + 1)])
+    perm = rng.permutation(mz.size)
+    return xic.iloc[perm], pd.Series(mz[perm])
+
+def test_input_search():
+    xic, mz = adduct_xic()
+    with pytest.raises(ValueError):
+        dbdi.identify_adducts(xic, masses = mz, search = "trash")
+
+def test_search_modes():
+    xic, mz = adduct_xic()
+    for method in ("spearman", "pearson", "kendall"):
+        res_mass = dbdi.identify_adducts(xic, masses = mz, method = method, search = "mass")
+        res_corr = dbdi.identify_adducts(xic, masses = mz, method = method, search = "correlation")
+        assert list(res_mass.keys()) == list(res_corr.keys())
+        for motive in res_corr:
+            pd.testing.assert_frame_equal(res_mass[motive], res_corr[motive])
+    
+    res_mass = dbdi.identify_adducts(xic, masses = mz, method = "pearson")
+    assert res_mass["O"].shape[0] == 10
+    assert res_mass["H2O"].shape[0] == 10
+    for motive in res_mass:
+        res = res_mass[motive]
+        assert (res["base_mz"] <= res["match_mz"]).all()
+        assert not res.duplicated(["base_index", "match_index"]).any()
+        np.testing.assert_array_equal(mz.iloc[res["base_index"]], res["base_mz"])
+        np.testing.assert_array_equal(mz.iloc[xic.index.get_indexer(res["match_index"])], res["match_mz"])
+
+def test_correlation_tiles():
+    xic, mz = adduct_xic()
+    res = dbdi.identify_adducts(xic, masses = mz, search = "correlation")
+    for block_size in (1, 7, 1000):
+        res_tiled = dbdi.identify_adducts(xic, masses = mz, search = "correlation", block_size = block_size)
+        for motive in res:
+            pd.testing.assert_frame_equal(res[motive], res_tiled[motive])
+    with pytest.raises(ValueError):
+        dbdi.identify_adducts(xic, masses = mz, block_size = 0)
+
+def test_overlap():
+    xic, mz = adduct_xic()
+    xic_missing = xic.mask(np.random.default_rng(212).random(xic.shape) < 0.2)
+    with pytest.raises(ValueError):
+        dbdi.identify_adducts(xic_missing, masses = mz)
+    with pytest.raises(ValueError):
+        dbdi.identify_adducts(xic_missing, masses = mz, min_overlap = 1)
+    for search in ("mass", "correlation"):
+        with pytest.raises(ValueError):
+            dbdi.identify_adducts(xic_missing, masses = mz, search = search, min_overlap = 10)
+    for method in ("pearson", "kendall"):
+        res_mass = dbdi.identify_adducts(xic_missing, masses = mz, method = method, min_overlap = 10)
+        res_corr = dbdi.identify_adducts(xic_missing, masses = mz, method = method, search = "correlation",
+                                         min_overlap = 10)
+        for motive in res_corr:
+            pd.testing.assert_frame_equal(res_mass[motive], res_corr[motive])
+    
+    res_mass = dbdi.identify_adducts(xic_missing, masses = mz, method = "pearson", min_overlap = 10)
+    assert res_mass["O"].shape[0] == 10
+    assert res_mass["H2O"].shape[0] == 10
+    
+    res = dbdi.identify_adducts(xic, masses = mz, min_overlap = 10)
+    res_ref = dbdi.identify_adducts(xic, masses = mz)
+    for motive in res:
+        pd.testing.assert_frame_equal(res[motive], res_ref[motive])
+
+def test_approximate():
+    xic, mz = adduct_xic()
+    for method in ("spearman", "pearson"):
+        res = dbdi.identify_adducts(xic, masses = mz, method = method)
+        res_approx = dbdi.identify_adducts(xic, masses = mz, method = method, search = "approximate",
+                                           recall = 0.999, random_state = 212)
+        for motive in res:
+            pd.testing.assert_frame_equal(res[motive], res_approx[motive])
+            assert res_approx[motive].attrs["recall"] >= 0.999
+    
+    res_low = dbdi.identify_adducts(xic, masses = mz, search = "approximate", recall = 0.5, random_state = 212)
+    assert 0.5 <= res_low["O"].attrs["recall"] < res_approx["O"].attrs["recall"]
+    
+    with pytest.raises(ValueError):
+        dbdi.identify_adducts(xic, masses = mz, search = "approximate", method = "kendall")
+    with pytest.raises(ValueError):
+        dbdi.identify_adducts(xic, masses = mz, search = "approximate", min_overlap = 10)
+    with pytest.raises(ValueError):
+        dbdi.identify_adducts(xic, masses = mz, search = "approximate", recall = 1)
+
+def test_approximate_without_candidates():
+    rng = np.random.default_rng(212)
+    mz = pd.Series([100.0, 100.0 + 15.994915, 100.0 + 31.98983])
+    
+    ##no bucket holds two features
+    xic = pd.DataFrame(rng.uniform(1e4, 1e6, size = (3, 20)))
+    res = dbdi.identify_adducts(xic, masses = mz, search = "approximate", threshold = 0.99, recall = 0.5, 
+                                random_state = 1)
+    assert all(len(res[motive]) == 0 for motive in res)
+    
+    ##constant XIC have no correlation
+    xic = pd.DataFrame(np.ones((3, 20)))
+    res = dbdi.identify_adducts(xic, masses = mz, method = "pearson", search = "approximate", random_state = 1)
+    assert all(len(res[motive]) == 0 for motive in res)
@@ -14,6 +14,11 @@ def test_input_format_method():
     with pytest.raises(ValueError):
         dummy = pd.DataFrame(np.random.randint(40, 999, size = (100, 100)))
         dbdi.impute_intensities(dummy, method = "trash")
+        
+def test_input_format_engine():
+    with pytest.raises(ValueError):
+        dummy = pd.DataFrame(np.random.randint(40, 999, size = (100, 100)))
+        dbdi.impute_intensities(dummy, method = "linear", engine = "trash")
 
 
 #%% test output of function 
@@ -24,4 +29,100 @@ def test_impute_outputn():
     imputed = dbdi.impute_intensities(testdata, method = "linear")
     
     assert not testdata.isnull().values.any()
-    assert imputed.shape == raw.shape
\ No newline at end of file
+    assert imputed.shape == raw.shape
+
+
+#%% compare imputation engines
+def sparse_xic(n_feat = 200, n_scans = 60, seed = 212):
+    rng = np.random.default_rng(seed)
+    xic = pd.DataFrame(rng.uniform(1e4, 1e6, size = (n_feat, n_scans)),
+                       index = ["ID" + str(i + 1) for i in range(n_feat)],
+                       columns = ["scan" + str(s + 1) for s in range(n_scans)])
+    xic = xic.mask(rng.random(xic.shape) < 0.4)
+    xic.iloc[0, :] = np.nan
+    xic.iloc[0, 5] = 5e4
+    return xic
+
+def test_impute_engines():
+    
+    xic = sparse_xic()
+    raw = xic.copy()
+    res_numpy = dbdi.impute_intensities(xic, method = "linear", engine = "numpy")
+    res_pandas = dbdi.impute_intensities(xic, method = "linear", engine = "pandas")
+    
+    pd.testing.assert_frame_equal(xic, raw)
+    assert not res_numpy.isnull().values.any()
+    assert res_numpy.shape == raw.shape
+    assert all(res_numpy.dtypes == np.float64)
+    
+    ##detected values are kept, gaps within the signal region are interpolated equally
+    values = raw.to_numpy()
+    detected = ~np.isnan(values)
+    first = np.argmax(detected, axis = 1)
+    last = values.shape[1] - 1 - np.argmax(detected[:, ::-1], axis = 1)
+    inside = (np.arange(values.shape[1]) >= first[:, None]) & (np.arange(values.shape[1]) <= last[:, None])
+    np.testing.assert_allclose(res_numpy.to_numpy()[inside], res_pandas.to_numpy()[inside])
+    np.testing.assert_array_equal(res_numpy.to_numpy()[detected], values[detected])
+    
+    ##baseline around the row minimum
+    s_min = np.array([res_numpy.iloc[i, inside[i]].min() for i in range(len(first))])
+    baseline = np.where(~inside, res_numpy.to_numpy(), np.nan)
+    assert np.all((np.nanmin(baseline, axis = 1) >= np.round(s_min * 0.99, 2)) | np.all(inside, axis = 1))
+    assert np.all((np.nanmax(baseline, axis = 1) <= np.round(s_min * 1.01, 2)) | np.all(inside, axis = 1))
+    
+def test_impute_methods():
+    
+    xic = sparse_xic(n_feat = 30)
+    detected = ~np.isnan(xic.to_numpy())
+    for method in ("nearest", "pad", "quadratic"):
+        res_numpy = dbdi.impute_intensities(xic, method = method, engine = "numpy")
+        assert not res_numpy.isnull().values.any()
+        np.testing.assert_array_equal(res_numpy.to_numpy()[detected], xic.to_numpy()[detected])
+        
+    res_numpy = dbdi.impute_intensities(xic, method = "quadratic", engine = "numpy")
+    res_pandas = dbdi.impute_intensities(xic, method = "quadratic", engine = "pandas")
+    first = np.argmax(detected, axis = 1)
+    last = xic.shape[1] - 1 - np.argmax(detected[:, ::-1], axis = 1)
+    inside = (np.arange(xic.shape[1]) >= first[:, None]) & (np.arange(xic.shape[1]) <= last[:, None])
+    np.testing.assert_allclose(res_numpy.to_numpy()[inside], res_pandas.to_numpy()[inside])
+
+#%% reproducible baseline noise
+def test_input_random_state():
+    with pytest.raises(TypeError):
+        dbdi.impute_intensities(sparse_xic(), random_state = "seed")
+    with pytest.raises(ValueError):
+        dbdi.impute_intensities(sparse_xic(), n_jobs = 0)
+    with pytest.raises(ValueError):
+        dbdi.impute_intensities(sparse_xic(), chunk_size = 0)
+
+def test_seeded_imputation():
+    
+    xic = sparse_xic()
+    res = dbdi.impute_intensities(xic, random_state = 212, chunk_size = 64)
+    
+    pd.testing.assert_frame_equal(res, dbdi.impute_intensities(xic, random_state = 212, chunk_size = 64))
+    pd.testing.assert_frame_equal(res, dbdi.impute_intensities(xic, random_state = 212, chunk_size = 64, n_jobs = 2))
+    pd.testing.assert_frame_equal(res, dbdi.impute_intensities(xic, random_state = np.random.SeedSequence(212), chunk_size = 64))
+    assert not res.equals(dbdi.impute_intensities(xic, random_state = 213, chunk_size = 64))
+    
+    rng = np.random.default_rng(212)
+    assert not dbdi.impute_intensities(xic, random_state = rng).equals(dbdi.impute_intensities(xic, random_state = rng))
+    
+    pd.testing.assert_frame_equal(dbdi.impute_intensities(xic, engine = "pandas", random_state = 212),
+                                  dbdi.impute_intensities(xic, engine = "pandas", random_state = 212))
+
+#%% numeric dtypes
+def test_impute_dtype():
+    
+    xic = sparse_xic(n_feat = 30)
+    with pytest.raises(ValueError):
+        dbdi.impute_intensities(xic, dtype = "int64")
+    
+    for engine in ("numpy", "pandas"):
+        assert (dbdi.impute_intensities(xic, engine = engine).dtypes == np.float64).all()
+        assert (dbdi.impute_intensities(xic.astype(np.float32), engine = engine).dtypes == np.float32).all()
+        assert (dbdi.impute_intensities(xic, engine = engine, dtype = "float32").dtypes == np.float32).all()
+    
+    res32 = dbdi.impute_intensities(xic.astype(np.float32), random_state = 212)
+    res64 = dbdi.impute_intensities(xic, random_state = 212)
+    np.testing.assert_allclose(res32.to_numpy(), res64.to_numpy(), rtol = 1e-5)
@@ -27,3 +27,99 @@ def test_proposals_output():
                                         mass_error = 0.005)
     
     assert not testproposal.isnull()
+
+def test_proposals_correlation():
+    rng = np.random.default_rng(212)
+    profile = rng.uniform(1e4, 1e6, 30)
+    testdata = pd.DataFrame(np.vstack([profile * rng.uniform(0.5, 2, (10, 1)) + rng.normal(0, 1e4, (10, 30)),
+                                       rng.uniform(1e4, 1e6, (10, 30))]))
+    masses = pd.Series(rng.uniform(100, 500, 20))
+    for method in ("pearson", "spearman", "kendall"):
+        testproposal = dbdi.propose_adducts(ID = 0, df = testdata, masses = masses,
+                                            method = method, threshold = 0.5, mass_error = 0.005)
+        ref = testdata.T.corr(method = method).iloc[:, 0]
+        ref = ref[(ref >= 0.5) & (ref < 1)]
+        np.testing.assert_array_equal(testproposal["match_IDs"], ref.index)
+        np.testing.assert_allclose(testproposal["cor"], ref.values)
+
+#%% batch proposals
+def adduct_table(seed = 212):
+    ##10 features sharing one profile with +O and +H2O partners among 20 unrelated features
+    rng = np.random.default_rng(seed)
+    profile = rng.uniform(1e4, 1e6, 30)
+    testdata = pd.DataFrame(np.vstack([profile * rng.uniform(0.5, 2, (10, 1)) + rng.normal(0, 1e4, (10, 30)),
+                                       rng.uniform(1e4, 1e6, (20, 30))]),
+                            index = ["ID" + str(x) for x in range(1, 31)])
+    masses = rng.uniform(100, 500, 30)
+    masses[1] = masses[0] + 15.994915 + 0.001
+    masses[2] = masses[0] + 18.010565 - 0.002
+    return testdata, pd.Series(masses)
+
+def test_batch_input():
+    testdata, masses = adduct_table()
+    with pytest.raises(TypeError):
+        dbdi.propose_adducts("some", testdata, masses)
+    with pytest.raises(TypeError):
+        dbdi.propose_adducts([0.5, 1.5], testdata, masses)
+    with pytest.raises(IndexError):
+        dbdi.propose_adducts([0, 30], testdata, masses)
+    with pytest.raises(ValueError):
+        dbdi.propose_adducts(0, testdata, masses[:10])
+    pd.testing.assert_frame_equal(dbdi.propose_adducts(np.int64(0), testdata, masses),
+                                  dbdi.propose_adducts(0, testdata, masses))
+
+def test_batch_proposals():
+    testdata, masses = adduct_table()
+    
+    res = dbdi.propose_adducts([0, 3, 12], testdata, masses, threshold = 0.8, block_size = 2)
+    assert list(res.columns) == ["ID", "match_IDs", "cor", "mass_diff", "annotation"]
+    single = pd.concat([dbdi.propose_adducts(ID, testdata, masses, threshold = 0.8) for ID in (0, 3, 12)],
+                       ignore_index = True)
+    pd.testing.assert_frame_equal(res.drop("ID", axis = 1), single)
+    np.testing.assert_array_equal(res["ID"], np.repeat([0, 3, 12], [9, 9, 0]))
+    
+    res_all = dbdi.propose_adducts("all", testdata, masses, threshold = 0.8)
+    assert res_all.shape[0] == 10 * 9
+    pd.testing.assert_frame_equal(res_all, dbdi.propose_adducts(np.arange(30), testdata, masses, threshold = 0.8))
+
+def test_annotation():
+    testdata, masses = adduct_table()
+    res = dbdi.propose_adducts(0, testdata, masses, threshold = 0.8).set_index("match_IDs")
+    assert res.loc["ID2", "annotation"] == "[M+O+H]+"
+    assert res.loc["ID3", "annotation"] == "[M-H2O+H]+"
+    assert res["annotation"].isnull().sum() == 7
+    
+    res = dbdi.propose_adducts(0, testdata, masses, threshold = 0.8, mass_error = 0.0015).set_index("match_IDs")
+    assert res.loc["ID2", "annotation"] == "[M+O+H]+"
+    assert pd.isnull(res.loc["ID3", "annotation"])
+
+def test_annotation_tolerance():
+    ##ID2 is 1 mDa off +O: annotated just inside mass_error, not just outside
+    testdata, masses = adduct_table()
+    inside = dbdi.propose_adducts(0, testdata, masses, threshold = 0.8, mass_error = 0.001 + 1e-6).set_index("match_IDs")
+    outside = dbdi.propose_adducts(0, testdata, masses, threshold = 0.8, mass_error = 0.001 - 1e-6).set_index("match_IDs")
+    assert inside.loc["ID2", "annotation"] == "[M+O+H]+"
+    assert pd.isnull(outside.loc["ID2", "annotation"])
+
+    ##overlapping references are all listed, custom adducts last
+    custom = pd.DataFrame({'mass_diff': [15.9960, 17.0], 'annotation': ["custom1", "custom2"]})
+    res = dbdi.propose_adducts(0, testdata, masses, threshold = 0.8, custom_adducts = custom).set_index("match_IDs")
+    assert res.loc["ID2", "annotation"] == "[M+O+H]+; custom1"
+    assert res.loc["ID3", "annotation"] == "[M-H2O+H]+"
+
+    res = dbdi.propose_adducts(0, testdata, masses, threshold = 0.8, mass_error = 0.0005, custom_adducts = custom).set_index("match_IDs")
+    assert res.loc["ID2", "annotation"] == "custom1"
+
+def test_overlap():
+    testdata, masses = adduct_table()
+    testdata = testdata.mask(np.random.default_rng(212).random(testdata.shape) < 0.2)
+    with pytest.raises(ValueError):
+        dbdi.propose_adducts(0, testdata, masses)
+    res = dbdi.propose_adducts(0, testdata, masses, threshold = 0.8, min_overlap = 10)
+    ref = testdata.T.corr(method = "pearson", min_periods = 10).iloc[:, 0]
+    ref = ref[(ref >= 0.8) & (ref < 1)]
+    np.testing.assert_array_equal(res["match_IDs"], ref.index)
+    np.testing.assert_allclose(res["cor"], ref.values)
+    
+    index = dbdi.CorrelationIndex(testdata, min_overlap = 10)
+    pd.testing.assert_frame_equal(dbdi.propose_adducts(0, index, masses, threshold = 0.8), res)
@@ -0,0 +1,89 @@
+import os
+import DBDIpy as dbdi
+import pytest
+import pandas as pd
+import numpy as np
+
+demo_path = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+
+@pytest.fixture
+def table(aligned_table):
+    return aligned_table(n_feat = 50, n_scans = 10, missing = 0.3, intensity = (1e3, 1e6), mz = (100, 500))
+
+
+#%%trigger input errors
+def test_input_errors(tmp_path, table):
+    df = table
+    with pytest.raises(TypeError):
+        dbdi.export_to_feather(df.to_numpy(), tmp_path / "test.feather")
+    with pytest.raises(ValueError):
+        dbdi.export_to_feather(df, tmp_path / "test.feather", metadata = pd.DataFrame({"mol_formula": ["C"]}))
+    with pytest.raises(ValueError):
+        dbdi.export_to_feather(df, tmp_path / "test.feather", metadata = pd.DataFrame({"mean": np.zeros(50)}))
+    dbdi.export_to_feather(df, tmp_path / "test.feather")
+    with pytest.raises(KeyError):
+        dbdi.read_feather(tmp_path / "test.feather", columns = ["mol_formula"])
+    with pytest.raises(TypeError):
+        dbdi.read_feather(tmp_path / "test.feather", rows = [0.5])
+    with pytest.raises(IndexError):
+        dbdi.read_feather(tmp_path / "test.feather", rows = [50])
+
+
+#%%test for correct output
+def test_roundtrip(tmp_path, table):
+    df = table.set_axis(np.arange(100, 150)).set_axis(["mean"] + list(range(10)), axis = 1)      ##non-string labels
+    meta = pd.DataFrame({"ID": df.index, "mol_formula": [f"C{i}H{2 * i}O" for i in range(50)],
+                         "ThMass.Ion": df["mean"].to_numpy()})
+    assert dbdi.export_to_feather(df, tmp_path / "test.feather", metadata = meta) == 50
+
+    res = dbdi.read_feather(tmp_path / "test.feather")
+    pd.testing.assert_frame_equal(res, df)
+
+    res, res_meta = dbdi.read_feather(tmp_path / "test.feather", metadata = True)
+    pd.testing.assert_frame_equal(res_meta, meta.drop(columns = "ID").set_index(df.index))
+
+def test_zero_copy(tmp_path, table):
+    df = table
+    dbdi.export_to_feather(df, tmp_path / "test.feather")
+    res = dbdi.read_feather(tmp_path / "test.feather")
+    values = res["scan3"].to_numpy()
+    assert not values.flags.writeable                                                        ##view of the mapped file
+    assert np.isnan(values).sum() == df["scan3"].isnull().sum()
+
+    sub = dbdi.read_feather(tmp_path / "test.feather", rows = slice(10, 20))
+    assert not sub["scan3"].to_numpy().flags.writeable
+
+def test_select(tmp_path, table):
+    df = table
+    dbdi.export_to_feather(df, tmp_path / "test.feather")
+
+    res = dbdi.read_feather(tmp_path / "test.feather", columns = ["mean", "scan4"], rows = slice(10, 20))
+    pd.testing.assert_frame_equal(res, df.iloc[10:20][["mean", "scan4"]])
+
+    res = dbdi.read_feather(tmp_path / "test.feather", rows = [5, 1, -1])
+    pd.testing.assert_frame_equal(res, df.iloc[[5, 1, -1]])
+
+    res = dbdi.read_feather(tmp_path / "test.feather", rows = slice(None, None, 7))
+    pd.testing.assert_frame_equal(res, df.iloc[::7])
+
+def test_sparse(tmp_path, table):
+    df = table
+    dbdi.export_to_feather(dbdi.SparseSpectra.from_frame(df), tmp_path / "test.feather")
+    res = dbdi.read_feather(tmp_path / "test.feather")
+    np.testing.assert_array_equal(res.to_numpy(), df.to_numpy())
+
+def test_read_demo():
+    import warnings
+    with warnings.catch_warnings(record = True) as caught:                                   ##demo files are Feather V1, deprecated by pyarrow >= 25
+        warnings.simplefilter("always")
+        res = dbdi.read_feather(os.path.join(demo_path, "example_dataset.feather"))
+        assert len([w for w in caught if issubclass(w.category, DeprecationWarning)]) <= 1   ##the file is read once
+        assert res.shape == (500, 88)
+        assert res.index.name == "ID"
+        
+        expected = pd.read_feather(os.path.join(demo_path, "example_dataset.feather")).set_index("ID")
+        pd.testing.assert_frame_equal(res, expected)
+        
+        res = dbdi.read_feather(os.path.join(demo_path, "example_metadata.feather"), columns = ["mol_formula"],
+                                rows = slice(0, 5))
+    assert res.shape == (5, 1)
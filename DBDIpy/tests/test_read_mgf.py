@@ -0,0 +1,91 @@
+import os
+import DBDIpy as dbdi
+import pytest
+import pandas as pd
+import numpy as np
+from matchms.importing import load_from_mgf
+
+demo_mgf = os.path.join(os.path.dirname(__file__), "..", "..", "data", "example_dataset.mgf")
+
+
+#%%trigger input errors
+def test_input_errors(tmp_path):
+    with pytest.raises(ValueError):
+        dbdi.PeakList([1.0, 2.0], [1.0], [0, 1])
+    with pytest.raises(ValueError):
+        dbdi.PeakList([1.0, 2.0], [1.0, 2.0], [0, 1])
+    with pytest.raises(ValueError):
+        dbdi.PeakList([1.0, 2.0], [1.0, 2.0], [0, 2], titles = ["a", "b"])
+    (tmp_path / "broken.mgf").write_text("BEGIN IONS\n100.0\nEND IONS\n")
+    with pytest.raises(ValueError):
+        dbdi.read_mgf(tmp_path / "broken.mgf")
+    with pytest.raises(ValueError):
+        dbdi.read_mgf(tmp_path / "test.mgf.gz", mmap = True)
+
+
+#%% compare with matchms
+def test_read_mgf():
+    spectrums = list(load_from_mgf(demo_mgf))
+    for mmap in (False, True):
+        peaks = dbdi.read_mgf(demo_mgf, mmap = mmap)
+        assert len(peaks) == len(spectrums) == 88
+        assert peaks.n_peaks == sum(len(s.peaks.mz) for s in spectrums)
+        for spectrum, p in zip(spectrums, peaks.to_spectra()):
+            np.testing.assert_array_equal(spectrum.peaks.mz, p.peaks.mz)
+            np.testing.assert_array_equal(spectrum.peaks.intensities, p.peaks.intensities)
+    
+    from_spectra = dbdi.PeakList.from_spectra(spectrums)
+    np.testing.assert_array_equal(from_spectra.offsets, peaks.offsets)
+
+def test_read_mgf_format(tmp_path):
+    (tmp_path / "test.mgf").write_text("# comment\n"
+                                       "BEGIN IONS\r\nTITLE=first scan\r\nRTINSECONDS=1.5\r\n100.5 20\r\n99.5 1e3\r\nEND IONS\r\n\r\n"
+                                       "BEGIN IONS\nEND IONS\n"
+                                       "BEGIN IONS\nPEPMASS=500\n200.25 3.5 1+\n300 4\nEND IONS")
+    peaks = dbdi.read_mgf(tmp_path / "test.mgf")
+    assert peaks.n_scans == 3
+    assert peaks.titles == ["first scan", None, None]
+    np.testing.assert_array_equal(peaks.offsets, [0, 2, 2, 4])
+    np.testing.assert_array_equal(peaks.mz, [100.5, 99.5, 200.25, 300])
+    np.testing.assert_array_equal(peaks.intensities, [20, 1e3, 3.5, 4])
+    np.testing.assert_array_equal(peaks.to_spectra()[0].peaks.mz, [99.5, 100.5])
+
+    (tmp_path / "indented.mgf").write_text("BEGIN IONS\n  TITLE=indented\n  100.5 20\n\t200 3\n END IONS\n")
+    peaks = dbdi.read_mgf(tmp_path / "indented.mgf")
+    assert peaks.titles == ["indented"]
+    np.testing.assert_array_equal(peaks.mz, [100.5, 200])
+    np.testing.assert_array_equal(peaks.intensities, [20, 3])
+
+def test_read_mgf_chunks():
+    from DBDIpy.read_mgf import _parse_mgf
+    with open(demo_mgf, "rb") as handle:
+        buf = np.frombuffer(handle.read(), dtype = np.uint8)
+    peaks = _parse_mgf(buf)
+    for chunk_size in (64, 1000):
+        chunked = _parse_mgf(buf, chunk_size = chunk_size)
+        assert chunked.titles == peaks.titles
+        np.testing.assert_array_equal(chunked.offsets, peaks.offsets)
+        np.testing.assert_array_equal(chunked.mz, peaks.mz)
+        np.testing.assert_array_equal(chunked.intensities, peaks.intensities)
+
+def test_roundtrip(tmp_path, aligned_table):
+    aligned_spectra = aligned_table(n_feat = 100, n_scans = 10, missing = 0.5)
+    dbdi.export_to_mgf(aligned_spectra, tmp_path / "test.mgf.gz", fmt = "%r %r")
+    peaks = dbdi.read_mgf(tmp_path / "test.mgf.gz")
+    assert peaks.titles == list(aligned_spectra.columns[1:])
+    
+    realigned = dbdi.align_spectra(peaks, merge = False)
+    np.testing.assert_allclose(realigned["mean"], aligned_spectra["mean"], rtol = 1e-14)
+    np.testing.assert_array_equal(realigned.iloc[:, 1:].to_numpy(), aligned_spectra.iloc[:, 1:].to_numpy())
+
+
+#%% alignment of peak lists
+def test_align_peak_list():
+    spectrums = list(load_from_mgf(demo_mgf))
+    peaks = dbdi.read_mgf(demo_mgf)
+    pd.testing.assert_frame_equal(dbdi.align_spectra(peaks), dbdi.align_spectra(spectrums))
+    pd.testing.assert_frame_equal(dbdi.align_spectra(peaks, n_jobs = 2, sparse = True).to_frame(),
+                                  dbdi.align_spectra(spectrums, n_jobs = 2, sparse = True).to_frame())
+    small = dbdi.PeakList.from_spectra(spectrums[:5])
+    pd.testing.assert_frame_equal(dbdi.align_spectra(small, engine = "pandas"),
+                                  dbdi.align_spectra(spectrums[:5], engine = "pandas"))
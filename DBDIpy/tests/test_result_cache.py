@@ -0,0 +1,87 @@
+import os
+import DBDIpy as dbdi
+import pytest
+import pandas as pd
+import numpy as np
+from matchms.importing import load_from_mgf
+
+demo_mgf = os.path.join(os.path.dirname(__file__), "..", "..", "data", "example_dataset.mgf")
+
+
+#%%trigger input errors
+def test_input_errors(tmp_path):
+    with pytest.raises(ValueError):
+        dbdi.ResultCache(tmp_path, max_size = -1)
+
+
+#%% cached results equal computed results
+def test_cache_alignment(tmp_path):
+    spectrums = list(load_from_mgf(demo_mgf))[:30]
+    cache = dbdi.ResultCache(tmp_path)
+    
+    res = cache.align_spectra(spectrums)
+    assert (cache.hits, cache.misses, len(cache)) == (0, 1, 1)
+    assert not res["scan1"].to_numpy().flags.writeable                                 ##misses are read back like hits
+    pd.testing.assert_frame_equal(res, dbdi.align_spectra(spectrums))
+    pd.testing.assert_frame_equal(cache.align_spectra(spectrums, ppm_window = 2), res)
+    pd.testing.assert_frame_equal(dbdi.ResultCache(tmp_path).align_spectra(iter(spectrums)), res)
+    assert (cache.hits, cache.misses) == (1, 1)
+    pd.testing.assert_frame_equal(cache.align_spectra(spectrums, n_jobs = 2), res)                 ##same key as n_jobs = 1
+    assert cache.hits == 2
+    
+    cache.align_spectra(spectrums, ppm_window = 5)
+    cache.align_spectra(spectrums[:29])
+    assert (cache.hits, cache.misses, len(cache)) == (2, 3, 3)
+    
+    res_sparse = cache.align_spectra(spectrums, sparse = True, dtype = "float32")
+    cached = cache.align_spectra(spectrums, sparse = True, dtype = "float32")
+    assert cache.hits == 3
+    assert isinstance(cached, dbdi.SparseSpectra)
+    pd.testing.assert_frame_equal(cached.to_frame(), res_sparse.to_frame())
+    
+    cache.clear()
+    assert len(cache) == 0 and cache.size == 0
+
+def test_cache_imputation(tmp_path, aligned_table):
+    xic = aligned_table(n_feat = 50, n_scans = 20, missing = 0.3, intensity = (1e4, 1e6)).drop(columns = "mean")
+    cache = dbdi.ResultCache(tmp_path)
+    
+    res = cache.impute_intensities(xic, random_state = 212)
+    pd.testing.assert_frame_equal(cache.impute_intensities(xic, random_state = 212), res)
+    pd.testing.assert_frame_equal(res, dbdi.impute_intensities(xic, random_state = 212))
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert not cache.impute_intensities(xic, random_state = 212)["scan1"].to_numpy().flags.writeable  ##view of the mapped file
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in cache._entries)      ##no temporary files left
+    
+    cache.impute_intensities(xic)                                                      ##not reproducible, not cached
+    cache.impute_intensities(xic, random_state = 1)
+    xic.iloc[0, 0] = 1.0
+    cache.impute_intensities(xic, random_state = 212)
+    assert (cache.hits, cache.misses, len(cache)) == (2, 3, 3)
+
+def test_cache_version(tmp_path, monkeypatch, aligned_table):
+    import DBDIpy.result_cache
+    xic = aligned_table(n_feat = 20, n_scans = 10, missing = 0, intensity = (1e4, 1e6)).drop(columns = "mean")
+    cache = dbdi.ResultCache(tmp_path)
+    cache.impute_intensities(xic, random_state = 0)
+    monkeypatch.setattr(DBDIpy.result_cache, "_FORMAT", DBDIpy.result_cache._FORMAT + 1)
+    cache.impute_intensities(xic, random_state = 0)
+    assert (cache.hits, cache.misses, len(cache)) == (0, 2, 2)
+
+def test_cache_eviction(tmp_path, aligned_table):
+    xic = aligned_table(n_feat = 200, n_scans = 50, missing = 0, intensity = (1e4, 1e6)).drop(columns = "mean")
+    cache = dbdi.ResultCache(tmp_path)
+    cache.impute_intensities(xic, random_state = 0)
+    entry = cache.size
+    
+    cache = dbdi.ResultCache(tmp_path, max_size = 2.5 * entry)
+    for seed in (1, 0, 2):                                                             ##seed 0 is used again before 2 is stored
+        cache.impute_intensities(xic, random_state = seed)
+    assert len(cache) == 2 and cache.hits == 1
+    cache.impute_intensities(xic, random_state = 0)
+    cache.impute_intensities(xic, random_state = 2)
+    assert cache.hits == 3
+    cache.impute_intensities(xic, random_state = 1)
+    assert cache.misses == 3
+    assert cache.size == sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path))
+    assert dbdi.ResultCache(tmp_path).size == cache.size
@@ -0,0 +1,69 @@
+import numpy as np
+import DBDIpy as dbdi
+import pandas as pd
+import pytest
+import scipy.sparse
+
+
+#%%trigger input errors
+def test_input_format():
+    with pytest.raises(TypeError):
+        dbdi.SparseSpectra(np.arange(10), np.random.rand(10, 5))
+        
+    with pytest.raises(ValueError):
+        dbdi.SparseSpectra(np.arange(9), scipy.sparse.random(10, 5, density = 0.2, format = "csr"))
+        
+    with pytest.raises(TypeError):
+        dbdi.SparseSpectra.from_frame(np.random.rand(10, 5))
+
+#%% test output of function
+def test_roundtrip(synthetic_spectra):
+    
+    specs_aligned = dbdi.align_spectra(synthetic_spectra())
+    sparse = dbdi.SparseSpectra.from_frame(specs_aligned)
+    
+    assert sparse.shape == (specs_aligned.shape[0], specs_aligned.shape[1] - 1)
+    assert sparse.intensities.nnz == specs_aligned.iloc[:, 1:].notna().values.sum()
+    pd.testing.assert_frame_equal(sparse.to_frame(), specs_aligned)
+
+def test_align_spectra_sparse(synthetic_spectra):
+    
+    spectrums = synthetic_spectra()
+    specs_aligned = dbdi.align_spectra(spectrums)
+    
+    for engine in ("numpy", "pandas"):
+        sparse = dbdi.align_spectra(spectrums, engine = engine, sparse = True)
+        assert isinstance(sparse, dbdi.SparseSpectra)
+        assert scipy.sparse.issparse(sparse.intensities)
+        pd.testing.assert_frame_equal(sparse.to_frame(), specs_aligned)
+    
+    aligner = dbdi.SpectraAligner(sparse = True).extend(spectrums)
+    pd.testing.assert_frame_equal(aligner.to_sparse().to_frame(), specs_aligned)
+
+def test_pipeline_sparse(synthetic_spectra):
+    
+    spectrums = synthetic_spectra()
+    specs_aligned = dbdi.align_spectra(spectrums)
+    sparse = dbdi.align_spectra(spectrums, sparse = True)
+    
+    ##export without densifying
+    exp_sparse = dbdi.export_to_spectra(sparse)
+    exp_dense = dbdi.export_to_spectra(specs_aligned.copy(), mzcol = 0)
+    assert len(exp_sparse) == len(spectrums)
+    for e in range(len(exp_sparse)):
+        assert np.array_equal(exp_sparse[e].peaks.mz, exp_dense[e].peaks.mz)
+        assert np.array_equal(exp_sparse[e].peaks.intensities, exp_dense[e].peaks.intensities)
+        assert np.allclose(exp_sparse[e].peaks.mz, spectrums[e].peaks.mz)
+    
+    ##imputation of sparse input
+    imputed = dbdi.impute_intensities(sparse)
+    assert isinstance(imputed, pd.DataFrame)
+    assert imputed.shape == sparse.shape
+    
+    ##adduct search on complete sparse input takes m/z from SparseSpectra
+    complete = dbdi.SparseSpectra(sparse.mz, scipy.sparse.csr_matrix(np.random.rand(sparse.shape[0], 20) + 1))
+    res = dbdi.identify_adducts(complete, threshold = 0.5)
+    assert isinstance(res, dict)
+    
+    with pytest.raises(ValueError):
+        dbdi.identify_adducts(sparse)
@@ -0,0 +1,89 @@
+import os
+import matchms
+import numpy as np
+import DBDIpy as dbdi
+import pandas as pd
+import pytest
+from matchms.importing import load_from_mgf
+
+demo_mgf = os.path.join(os.path.dirname(__file__), "..", "..", "data", "example_dataset.mgf")
+
+#%%trigger input errors
+def test_input_format():
+    with pytest.raises(TypeError):
+        dbdi.SpectraAligner(ppm_window = "X")
+    
+    with pytest.raises(TypeError):
+        aligner = dbdi.SpectraAligner()
+        aligner.add(pd.DataFrame(np.random.rand(10, 2)))
+        
+    with pytest.raises(ValueError):
+        aligner = dbdi.SpectraAligner()
+        aligner.add_peaks(np.linspace(1, 9, 10), np.random.rand(9))
+
+#%% test output of function
+def test_streaming_snapshots():
+    
+    spectrums = list(load_from_mgf(demo_mgf))
+    aligner = dbdi.SpectraAligner(ppm_window = 2)
+    
+    for s, spectrum in enumerate(load_from_mgf(demo_mgf)):
+        aligner.add(spectrum)
+        if s == 9:
+            pd.testing.assert_frame_equal(aligner.to_frame(), dbdi.align_spectra(spectrums[:10]))
+            
+    assert aligner.n_scans == len(spectrums)
+    pd.testing.assert_frame_equal(aligner.to_frame(), dbdi.align_spectra(spectrums))
+    
+def test_align_spectra_generator():
+    
+    specs_aligned = dbdi.align_spectra(load_from_mgf(demo_mgf), ppm_window = 2)
+    aligner = dbdi.SpectraAligner(ppm_window = 2).extend(load_from_mgf(demo_mgf))
+    
+    assert specs_aligned.shape[1] - 1 == aligner.n_scans
+    pd.testing.assert_frame_equal(specs_aligned, aligner.to_frame())
+    pd.testing.assert_frame_equal(specs_aligned, dbdi.align_spectra_b(list(load_from_mgf(demo_mgf))))
+    
+def test_empty_snapshot():
+    
+    aligner = dbdi.SpectraAligner()
+    
+    assert aligner.to_frame().shape == (0, 1)
+    
+def test_input_dtype():
+    with pytest.raises(ValueError):
+        dbdi.SpectraAligner(dtype = "int64")
+
+#%% test preallocated storage
+def test_storage_growth(synthetic_spectra):
+    
+    features = np.linspace(100, 1000, 3000)
+    aligner_dense = dbdi.SpectraAligner()
+    aligner_sparse = dbdi.SpectraAligner(sparse = True)
+    aligner_single = dbdi.SpectraAligner(dtype = "float32")
+    
+    for spectrum in synthetic_spectra(n_scans = 150, features = features, n_peaks = 400):     ##exceeds initial capacity of scans and features
+        for aligner in (aligner_dense, aligner_sparse, aligner_single):
+            aligner.add_peaks(spectrum.peaks.mz, spectrum.peaks.intensities)
+    
+    res_dense = aligner_dense.to_frame()
+    res_single = aligner_single.to_frame()
+    
+    assert res_dense.shape[1] - 1 == 150
+    assert res_dense.notna().values[:, 1:].sum() == 150 * 400
+    assert np.allclose(res_dense["mean"], features, rtol = 0, atol = 1e-9)
+    pd.testing.assert_frame_equal(res_dense, aligner_sparse.to_frame())
+    assert all(res_single.dtypes.iloc[1:] == np.float32)
+    assert res_single["mean"].dtype == np.float64
+    np.testing.assert_allclose(res_single.iloc[:, 1:].values, res_dense.iloc[:, 1:].values, rtol = 1e-6)
+    
+def test_mean_drift():
+    
+    aligner = dbdi.SpectraAligner(mz_window = 2e-6)
+    aligner.add_peaks([100.0, 100.0000035], [1.0, 2.0])
+    aligner.add_peaks([100.0000019], [3.0])                                       ##pulls the first feature above its neighbour
+    aligner.add_peaks([100.0000045], [4.0])
+    res = aligner.to_frame()
+    
+    assert res["mean"].is_monotonic_increasing
+    assert res.shape == (2, 4)
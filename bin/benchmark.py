@@ -0,0 +1,311 @@
+# runtime benchmarks of DBDIpy functions on the demo dataset and on synthetic data
+import os
+import time
+import tempfile
+import tracemalloc
+import logging
+import numpy as np
+import pandas as pd
+import DBDIpy as dbdi
+import matchms
+from matchms.importing import load_from_mgf
+from matchms.exporting import save_as_mgf
+
+logging.disable(logging.WARNING)                                                  #silence matchms metadata warnings
+
+demo_path = os.path.join(os.path.dirname(__file__), "..", "data")                 #path to demo dataset
+demo_mgf = os.path.join(demo_path, "example_dataset.mgf")
+
+
+def timeit(fun, *args, repeat = 3, **kwargs):
+    ##best of repeat runs in seconds
+    times = []
+    for r in range(repeat):
+        t0 = time.perf_counter()
+        fun(*args, **kwargs)
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def synthetic_spectra(n_scans, n_features, n_peaks, seed = 212):
+    ##spectra drawing n_peaks out of n_features m/z values per scan
+    rng = np.random.default_rng(seed)
+    features = np.sort(rng.uniform(100, 1000, n_features))
+    spectrums = []
+    for s in range(n_scans):
+        present = np.sort(rng.choice(n_features, n_peaks, replace = False))
+        spectrums.append(matchms.Spectrum(mz = features[present],
+                                          intensities = rng.uniform(1e4, 1e7, n_peaks),
+                                          metadata = {}))
+    return spectrums
+
+
+def export_per_column(df, mzcol = 0):
+    ##previous implementation with three DataFrame copies per scan
+    df = df.rename(columns = {df.columns[mzcol]: 'mean'}).sort_values('mean')
+    speclist = []
+    for s in range(df.shape[1]):
+        if s == mzcol:
+            continue
+        spec_s = df.iloc[:, [mzcol, s]].copy().dropna().reset_index(drop = True)
+        speclist.append(matchms.Spectrum(mz = spec_s.iloc[:, 0].to_numpy(dtype = float),
+                                         intensities = spec_s.iloc[:, 1].to_numpy(dtype = float)))
+    return speclist
+
+
+def main():
+    #%% alignment
+    spectrums = list(load_from_mgf(demo_mgf))
+
+    t_pandas = timeit(dbdi.align_spectra, spectrums[:20], engine = "pandas", repeat = 1)
+    t_numpy = timeit(dbdi.align_spectra, spectrums[:20], engine = "numpy")
+    t_b = timeit(dbdi.align_spectra_b, spectrums[:20])
+    print(f"align_spectra, demo data (20 scans):  pandas {t_pandas:8.3f} s | numpy {t_numpy:8.3f} s | align_spectra_b {t_b:8.3f} s")
+    print(f"    speed-up of align_spectra_b over pandas engine: {t_pandas / t_b:8.0f}x")
+
+    t_numpy = timeit(dbdi.align_spectra, spectrums, engine = "numpy")
+    t_b = timeit(dbdi.align_spectra_b, spectrums)
+    print(f"align_spectra, demo data ({len(spectrums)} scans):  numpy {t_numpy:8.3f} s | align_spectra_b {t_b:8.3f} s")
+
+    spectrums = synthetic_spectra(2000, 5000, 1000)
+    t_numpy = timeit(dbdi.align_spectra, spectrums, engine = "numpy", repeat = 1)
+    t_b = timeit(dbdi.align_spectra_b, spectrums, repeat = 1)
+    print(f"align_spectra, synthetic (2000 scans x 5000 features):  numpy {t_numpy:8.3f} s | align_spectra_b {t_b:8.3f} s")
+
+    #%% scaling of the preallocated feature matrix with the number of scans
+    for n_scans in (2500, 5000, 10000):
+        aligner = dbdi.SpectraAligner(ppm_window = 2, dtype = "float32")
+        spectrums = synthetic_spectra(n_scans, 5000, 500)
+        t0 = time.perf_counter()
+        aligner.extend(spectrums, progress = False)
+        specs_aligned = aligner.to_frame()
+        t_align = time.perf_counter() - t0
+        print(f"SpectraAligner, {n_scans:5d} scans x 5000 features:  {t_align:8.3f} s | "
+              f"{specs_aligned.memory_usage(deep = True).sum() / 1e6:8.1f} MB")
+
+    #%% parallel alignment by m/z partitioning
+    spectrums = synthetic_spectra(4000, 20000, 2000)
+    t_serial = timeit(dbdi.align_spectra, spectrums, sparse = True, repeat = 1)
+    for n_jobs in (2, 4):
+        t_parallel = timeit(dbdi.align_spectra, spectrums, sparse = True, n_jobs = n_jobs, repeat = 1)
+        print(f"align_spectra, synthetic (4000 scans x 20000 features):  n_jobs = 1 {t_serial:8.3f} s | "
+              f"n_jobs = {n_jobs} {t_parallel:8.3f} s")
+
+    #%% imputation
+    rng = np.random.default_rng(212)
+    xic = pd.DataFrame(rng.uniform(1e4, 1e7, size = (10000, 200)))
+    xic = xic.mask(rng.random(xic.shape) < 0.5)
+
+    t_pandas = timeit(dbdi.impute_intensities, xic.iloc[:1000], engine = "pandas", repeat = 1) * 10
+    t_numpy = timeit(dbdi.impute_intensities, xic, engine = "numpy")
+    print(f"impute_intensities, 10000 features x 200 scans:  pandas {t_pandas:8.3f} s (extrapolated) | "
+          f"numpy {t_numpy:8.3f} s | speed-up {t_pandas / t_numpy:6.0f}x")
+
+    #%% numeric dtypes end to end
+    specs_aligned = dbdi.align_spectra(list(load_from_mgf(demo_mgf)))
+    xic = specs_aligned.drop("mean", axis = 1)
+
+    t_coerce = timeit(lambda: xic.astype(object).apply(lambda col: pd.to_numeric(col, errors = 'coerce')))
+    t_cast = timeit(lambda: xic.astype(object))
+    print(f"pd.to_numeric pass over the demo feature table removed:  {t_coerce - t_cast:8.3f} s per call")
+
+    for dtype in ("float64", "float32"):
+        t_impute = timeit(dbdi.impute_intensities, xic.astype(dtype))
+        imputed = dbdi.impute_intensities(xic.astype(dtype))
+        print(f"impute_intensities, demo data, {dtype}:  {t_impute:8.3f} s | "
+              f"{imputed.memory_usage(deep = True).sum() / 1e6:8.2f} MB")
+
+    #%% adduct search
+    rng = np.random.default_rng(212)
+    for n_feat in (1000, 4000):
+        xic = pd.DataFrame(rng.uniform(1e4, 1e7, size = (n_feat, 100)))
+        masses = pd.Series(np.sort(rng.uniform(100, 1000, n_feat)))
+        t_corr = timeit(dbdi.identify_adducts, xic, masses = masses, search = "correlation", repeat = 1)
+        t_mass = timeit(dbdi.identify_adducts, xic, masses = masses, search = "mass")
+        print(f"identify_adducts, {n_feat:5d} features x 100 scans:  correlation first {t_corr:8.3f} s | "
+              f"mass first {t_mass:8.3f} s")
+
+    xic = pd.DataFrame(np.outer(rng.uniform(1, 10, 2000), rng.uniform(1e4, 1e7, 100)) * rng.uniform(0.98, 1.02, (2000, 100)))
+    masses = pd.Series(np.sort(rng.uniform(100, 1000, 2000)))
+    t_corr = timeit(dbdi.identify_adducts, xic, masses = masses, search = "correlation", threshold = 0.9, repeat = 1)
+    cormat = xic.T.corr()
+    n_pairs = int(np.triu(cormat.to_numpy() > 0.9, k = 1).sum())
+    print(f"identify_adducts, 2000 correlated features:  {n_pairs} pairs above threshold extracted in {t_corr:8.3f} s")
+
+    #%% correlation engine
+    rng = np.random.default_rng(212)
+    xic = pd.DataFrame(rng.uniform(1e4, 1e7, size = (3000, 200)))
+    for method in ("pearson", "spearman"):
+        t_pandas = timeit(lambda: xic.T.corr(method = method), repeat = 1)
+        t_64 = timeit(dbdi.correlate_xic, xic, method = method)
+        t_32 = timeit(dbdi.correlate_xic, xic, method = method, dtype = "float32")
+        print(f"correlate_xic, {method}, 3000 features x 200 scans:  pandas {t_pandas:8.3f} s | "
+              f"float64 {t_64:8.3f} s | float32 {t_32:8.3f} s")
+
+    #%% thresholded sparse correlation
+    xic = pd.DataFrame(rng.uniform(1e4, 1e7, size = (10000, 100)))
+    for block_size in (256, 2048):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        cormat = dbdi.correlate_xic_sparse(xic, method = "pearson", threshold = 0.3, block_size = block_size)
+        t_sparse = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"correlate_xic_sparse, 10000 features, block_size = {block_size:4d}:  {t_sparse:8.3f} s | "
+              f"peak {peak / 1e6:8.1f} MB (dense matrix {xic.shape[0] ** 2 * 8 / 1e6:.0f} MB) | {cormat.nnz} hits")
+
+    #%% cached correlation index for repeated proposals
+    xic = pd.DataFrame(rng.uniform(1e4, 1e7, size = (3000, 200)))
+    masses = pd.Series(np.sort(rng.uniform(100, 1000, 3000)))
+    IDs = [int(x) for x in rng.choice(3000, 200, replace = False)]
+    t_df = timeit(lambda: [dbdi.propose_adducts(ID, xic, masses) for ID in IDs[:20]], repeat = 1) * 10
+    index = dbdi.CorrelationIndex(xic, method = "pearson")
+    t_index = timeit(lambda: [dbdi.propose_adducts(ID, index, masses) for ID in IDs], repeat = 1)
+    t_cached = timeit(lambda: [dbdi.propose_adducts(ID, index, masses) for ID in IDs], repeat = 1)
+    print(f"propose_adducts, 200 queries on 3000 features:  DataFrame {t_df:8.3f} s (extrapolated) | "
+          f"CorrelationIndex {t_index:8.3f} s | cached {t_cached:8.3f} s")
+
+    t_batch = timeit(dbdi.propose_adducts, IDs, xic, masses, repeat = 1)
+    t_all = timeit(dbdi.propose_adducts, "all", xic, masses, repeat = 1)
+    t_matmul = timeit(dbdi.correlate_xic, xic, method = "pearson", repeat = 1)
+    print(f"propose_adducts, batch of 200 IDs {t_batch:8.3f} s | untargeted screen of 3000 features {t_all:8.3f} s | "
+          f"one correlation matrix {t_matmul:8.3f} s")
+
+    #%% annotation index
+    deltamz = rng.uniform(1, 200, 500)
+    mzdiff = rng.uniform(0, 250, 1000000)
+    rules = dbdi.AnnotationIndex(deltamz, [f"rule{r}" for r in range(500)], mass_error = 5, unit = "ppm")
+    t_scan = timeit(lambda: [np.flatnonzero((mzdiff >= d - d * 5e-6) & (mzdiff <= d + d * 5e-6)) for d in deltamz], repeat = 1)
+    t_index = timeit(rules.lookup, mzdiff)
+    print(f"AnnotationIndex, 1e6 mass differences x 500 rules:  scan per rule {t_scan:8.3f} s | searchsorted {t_index:8.3f} s")
+
+    #%% correlation over detected scans without imputation
+    xic = pd.DataFrame(rng.uniform(1e4, 1e7, size = (3000, 200)))
+    xic = xic.mask(rng.random(xic.shape) < 0.3)
+    masses = pd.Series(np.sort(rng.uniform(100, 1000, 3000)))
+    t_impute = timeit(lambda: dbdi.identify_adducts(dbdi.impute_intensities(xic), masses = masses, method = "pearson"), repeat = 1)
+    t_overlap = timeit(dbdi.identify_adducts, xic, masses = masses, method = "pearson", min_overlap = 10, repeat = 1)
+    t_pandas = timeit(lambda: xic.T.corr(method = "pearson", min_periods = 10), repeat = 1)
+    t_masked = timeit(dbdi.correlate_xic, xic, method = "pearson", min_overlap = 10, repeat = 1)
+    print(f"identify_adducts, 3000 features x 200 scans with 30 % missing:  impute + search {t_impute:8.3f} s | "
+          f"min_overlap {t_overlap:8.3f} s")
+    print(f"correlate_xic with missing values:  pandas {t_pandas:8.3f} s | masked matrix products {t_masked:8.3f} s")
+
+    #%% adduct network
+    n_feat = 20000
+    base = rng.integers(0, n_feat, 30000)
+    match = rng.integers(0, n_feat, 30000)
+    motive = rng.integers(0, 3, 30000)
+    adducts = {m: pd.DataFrame({"base_index": base[motive == a], "match_index": match[motive == a],
+                                "corr": rng.uniform(0.9, 1, np.count_nonzero(motive == a))})
+               for a, m in enumerate(["O", "O2", "O3"])}
+    t_intersect = timeit(lambda: np.intersect1d(adducts["O"]["base_index"],
+                                                np.intersect1d(adducts["O2"]["base_index"], adducts["O3"]["base_index"])))
+    t_build = timeit(dbdi.AdductNetwork.from_adducts, adducts, pd.RangeIndex(n_feat))
+    network = dbdi.AdductNetwork.from_adducts(adducts, pd.RangeIndex(n_feat))
+    t_query = timeit(network.with_motives, ["O", "O2", "O3"])
+    t_components = timeit(lambda: dbdi.AdductNetwork.from_adducts(adducts, pd.RangeIndex(n_feat)).components())
+    print(f"AdductNetwork, {n_feat} features x 30000 pairs:  build {t_build * 1e3:8.2f} ms | motive query {t_query * 1e3:8.2f} ms "
+          f"(np.intersect1d {t_intersect * 1e3:8.2f} ms) | build + components {t_components * 1e3:8.2f} ms")
+
+    #%% approximate search by random-hyperplane hashing
+    n_feat = 20000
+    group = rng.integers(0, 2000, n_feat)                                              #compounds with O and O2 adducts
+    xic = pd.DataFrame(rng.uniform(1e4, 1e6, (2000, 100))[group] * rng.uniform(0.5, 2, (n_feat, 1))
+                       + rng.normal(0, 1e5, (n_feat, 100)))
+    masses = pd.Series(rng.uniform(100, 1000, 2000)[group] + 15.994915 * rng.integers(0, 3, n_feat))
+    t0 = time.perf_counter()
+    exact = dbdi.identify_adducts(xic, masses = masses, method = "pearson", search = "correlation")
+    t_exact = time.perf_counter() - t0
+    for recall in (0.9, 0.99):
+        t0 = time.perf_counter()
+        approx = dbdi.identify_adducts(xic, masses = masses, method = "pearson", search = "approximate",
+                                       recall = recall, random_state = 212)
+        t_approx = time.perf_counter() - t0
+        found = sum(len(approx[m]) for m in approx) / max(1, sum(len(exact[m]) for m in exact))
+        print(f"identify_adducts, {n_feat} features x 100 scans:  all pairs {t_exact:8.3f} s | approximate {t_approx:8.3f} s "
+              f"at recall = {recall} (expected {approx['O'].attrs['recall']:.3f}, measured {found:.3f})")
+
+    #%% export to spectra
+    xic = pd.DataFrame(rng.uniform(1e4, 1e7, size = (5000, 2000)))
+    xic = xic.mask(rng.random(xic.shape) < 0.7)
+    xic.insert(0, "mean", rng.uniform(100, 1000, 5000))
+    t_copies = timeit(export_per_column, xic, repeat = 1)
+    t_bulk = timeit(dbdi.export_to_spectra, xic, repeat = 1)
+    tracemalloc.start()
+    for spectrum in dbdi.export_to_spectra(xic, lazy = True):
+        pass
+    peak_lazy = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    tracemalloc.start()
+    speclist = dbdi.export_to_spectra(xic)
+    peak_list = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"export_to_spectra, 5000 features x 2000 scans:  per-column copies {t_copies:8.3f} s | bulk {t_bulk:8.3f} s | "
+          f"peak memory list {peak_list / 1e6:8.1f} MB, generator {peak_lazy / 1e6:8.1f} MB")
+
+    #%% streaming MGF writer
+    xic = pd.DataFrame(rng.uniform(1e4, 1e7, size = (5000, 500)))
+    xic = xic.mask(rng.random(xic.shape) < 0.7)
+    xic.insert(0, "mean", rng.uniform(100, 1000, 5000))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "benchmark.mgf")
+        def matchms_export():
+            if os.path.exists(path):
+                os.remove(path)
+            save_as_mgf(dbdi.export_to_spectra(xic), path)
+        t_matchms = timeit(matchms_export, repeat = 1)
+        t_native = timeit(dbdi.export_to_mgf, xic, path)
+        size = os.path.getsize(path)
+        t_gzip = timeit(dbdi.export_to_mgf, xic, path + ".gz")
+        size_gz = os.path.getsize(path + ".gz")
+    print(f"export to .mgf, 5000 features x 500 scans ({xic.iloc[:, 1:].notnull().values.sum()} peaks):  "
+          f"export_to_spectra + save_as_mgf {t_matchms:8.3f} s | export_to_mgf {t_native:8.3f} s ({size / 1e6:.1f} MB) | "
+          f"gzip {t_gzip:8.3f} s ({size_gz / 1e6:.1f} MB)")
+
+    #%% native MGF reader
+    xic = pd.DataFrame(rng.uniform(1e4, 1e7, size = (20000, 500)))
+    xic = xic.mask(rng.random(xic.shape) < 0.8)
+    xic.insert(0, "mean", rng.uniform(100, 1000, 20000))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "benchmark.mgf")
+        dbdi.export_to_mgf(xic, path)
+        t_matchms = timeit(lambda: list(load_from_mgf(path)), repeat = 1)
+        t_read = timeit(dbdi.read_mgf, path)
+        t_mmap = timeit(dbdi.read_mgf, path, mmap = True)
+        peaks = dbdi.read_mgf(path)
+        spectrums = list(load_from_mgf(path))
+        t_align_spectra = timeit(dbdi.align_spectra, spectrums, sparse = True, repeat = 1)
+        t_align_peaks = timeit(dbdi.align_spectra, peaks, sparse = True, repeat = 1)
+    print(f"read .mgf, 500 scans ({peaks.n_peaks} peaks):  load_from_mgf {t_matchms:8.3f} s | read_mgf {t_read:8.3f} s | "
+          f"mmap {t_mmap:8.3f} s")
+    print(f"align_spectra from matchms.Spectrum {t_align_spectra:8.3f} s | from PeakList {t_align_peaks:8.3f} s")
+
+    #%% on-disk result cache
+    spectrums = synthetic_spectra(2000, 5000, 1000)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = dbdi.ResultCache(tmp)
+        t_cold = timeit(lambda: cache.impute_intensities(cache.align_spectra(spectrums).drop("mean", axis = 1),
+                                                         random_state = 212), repeat = 1)
+        t_warm = timeit(lambda: cache.impute_intensities(cache.align_spectra(spectrums).drop("mean", axis = 1),
+                                                         random_state = 212))
+        print(f"ResultCache, align + impute 2000 scans x 5000 features:  computed {t_cold:8.3f} s | "
+              f"loaded {t_warm:8.3f} s ({cache.size / 1e6:.0f} MB on disk)")
+
+    #%% memory-mapped feature tables
+    xic = pd.DataFrame(rng.uniform(1e4, 1e7, size = (50000, 500)))
+    xic.insert(0, "mean", np.sort(rng.uniform(100, 1000, 50000)))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "benchmark.feather")
+        t_write = timeit(dbdi.export_to_feather, xic, path, repeat = 1)
+        t_pandas = timeit(pd.read_feather, path)
+        t_mapped = timeit(dbdi.read_feather, path)
+        t_columns = timeit(dbdi.read_feather, path, columns = ["mean", 0, 1])
+        t_rows = timeit(lambda: dbdi.read_feather(path, rows = slice(1000, 1100)).to_numpy().sum())
+        print(f"Feather, 50000 features x 500 scans ({os.path.getsize(path) / 1e6:.0f} MB):  export_to_feather {t_write:8.3f} s | "
+              f"pd.read_feather {t_pandas:8.3f} s | read_feather {t_mapped:8.3f} s | 3 columns {t_columns:8.3f} s | "
+              f"100 rows {t_rows:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()